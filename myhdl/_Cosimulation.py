@@ -26,6 +26,7 @@ import exceptions
 
 from myhdl._intbv import intbv
 from myhdl import _simulator, CosimulationError
+from myhdl._block import _contexts, _registerFrame
 
 _MAXLINE = 4096
 
@@ -47,6 +48,8 @@ class Cosimulation(object):
         
         """ Construct a cosimulation object. """
         
+        if _contexts:
+            _registerFrame()
         if _simulator._cosim:
             raise CosimulationError(_error.MultipleCosim)
         _simulator._cosim = 1
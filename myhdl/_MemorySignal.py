@@ -0,0 +1,317 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module that provides the MemorySignal class.
+
+This module provides the following objects:
+
+MemorySignal -- factory function to model a memory as a single object
+
+A memory signal behaves like a list of signals: mem[i] can be read, and
+mem[i].next can be assigned. However, the values are kept in a compact
+array instead of in a separate Signal object per element. Element
+signals are only created when required, by tracing or conversion.
+
+"""
+
+from array import array
+from copy import copy
+
+from myhdl._Signal import _Signal, _WaiterList
+from myhdl._simulator import _signals, _siglist
+from myhdl._intbv import intbv
+
+_unsignedCodes = ('B', 'H', 'I', 'L')
+_signedCodes = ('b', 'h', 'i', 'l')
+
+def _typecode(val):
+    """ Return the most compact array typecode for val, or None. """
+    if isinstance(val, bool):
+        return 'B'
+    if not isinstance(val, intbv) or not val._nrbits:
+        return None
+    if val._min is not None and val._min < 0:
+        codes = _signedCodes
+    else:
+        codes = _unsignedCodes
+    for code in codes:
+        if array(code).itemsize * 8 >= val._nrbits:
+            return code
+    return None
+
+
+def MemorySignal(val, depth, init=None):
+    """ Return a new memory signal.
+
+    val -- element value, that defines the element type and default value
+    depth -- number of elements
+    init -- optional sequence of initial element values
+
+    """
+    return _MemorySignal(val, depth, init)
+
+
+class _MemorySignal(object):
+
+    """ _MemorySignal class.
+
+    Methods:
+    isWritten -- check whether an address has been written
+    writtenAddresses -- return the addresses that have been written
+
+    """
+
+    __slots__ = ('_template', '_type', '_depth', '_nrbits', '_min', '_max',
+                 '_code', '_store', '_init', '_pending', '_written',
+                 '_scratch', '_eventWaiters', '_elements', '_name'
+                )
+
+    def __init__(self, val, depth, init=None):
+        if isinstance(val, _Signal):
+            val = val.val
+        if not isinstance(val, (bool, intbv)):
+            raise TypeError("MemorySignal element should be bool or intbv, got %s" %
+                            type(val))
+        if depth <= 0:
+            raise ValueError("MemorySignal depth should be > 0")
+        self._template = copy(val)
+        self._type = type(val)
+        self._depth = depth
+        if isinstance(val, bool):
+            self._nrbits = 1
+            self._min = self._max = None
+            self._scratch = None
+            default = int(val)
+        else:
+            self._nrbits = val._nrbits
+            self._min = val._min
+            self._max = val._max
+            self._scratch = copy(val)
+            default = val._val
+        self._code = _typecode(val)
+        self._pending = {}
+        self._written = bytearray(depth)
+        self._eventWaiters = _WaiterList()
+        self._elements = None
+        self._name = None
+        if init is None:
+            self._init = None
+        else:
+            if len(init) != depth:
+                raise ValueError("MemorySignal init should have %s elements" % depth)
+            self._init = [self._checkVal(v) for v in init]
+        self._store = self._makeStore(default)
+        _signals.append(self)
+
+    def _makeStore(self, default):
+        if self._init is not None:
+            data = self._init
+        else:
+            data = [default] * self._depth
+        if self._code is None:
+            return list(data)
+        return array(self._code, data)
+
+    def _checkVal(self, val):
+        if isinstance(val, _Signal):
+            val = val._val
+        if isinstance(val, intbv):
+            val = val._val
+        if self._type is bool:
+            if not val in (0, 1):
+                raise ValueError("Expected boolean value, got %s (%s)" % (repr(val), type(val)))
+            return int(val)
+        if not isinstance(val, (int, long)):
+            raise TypeError("Expected int or intbv, got %s" % type(val))
+        s = self._scratch
+        s._val = val
+        s._handleBounds()
+        return s._val
+
+    def _clear(self):
+        del self._eventWaiters[:]
+        self._pending.clear()
+        self._written = bytearray(self._depth)
+        if self._type is bool:
+            default = int(self._template)
+        else:
+            default = self._template._val
+        self._store = self._makeStore(default)
+
+    def _write(self, index, val):
+        pending = self._pending
+        if not pending:
+            _siglist.append(self)
+        pending[index] = self._checkVal(val)
+
+    def _update(self):
+        store, written = self._store, self._written
+        changed = []
+        for index, val in self._pending.iteritems():
+            written[index] = 1
+            if store[index] != val:
+                store[index] = val
+                changed.append(index)
+        self._pending.clear()
+        if not changed:
+            return []
+        elements = self._elements
+        if elements is not None:
+            for index in changed:
+                e = elements[index]
+                if e._tracing:
+                    e._printVcd()
+        waiters = self._eventWaiters[:]
+        del self._eventWaiters[:]
+        return waiters
+
+    def _value(self, index):
+        """ Return the current value of an element as a new object. """
+        v = self._store[index]
+        if self._type is bool:
+            return bool(v)
+        t = self._template
+        c = intbv.__new__(self._type)
+        c._val = v
+        c._min = t._min
+        c._max = t._max
+        c._nrbits = t._nrbits
+        return c
+
+    def _elementSignals(self):
+        """ Return a list of element signals, for tracing and conversion. """
+        if self._elements is None:
+            self._elements = [_MemoryElement(self, i) for i in range(self._depth)]
+        return self._elements
+
+    def __len__(self):
+        return self._depth
+
+    def __getitem__(self, index):
+        index = int(index)
+        if not -self._depth <= index < self._depth:
+            raise IndexError("MemorySignal index out of range")
+        if index < 0:
+            index += self._depth
+        w = intbv.__new__(_MemoryWord)
+        w._val = self._store[index]
+        w._min = self._min
+        w._max = self._max
+        w._nrbits = self._nrbits
+        w._mem = self
+        w._index = index
+        return w
+
+    def __iter__(self):
+        for i in range(self._depth):
+            yield self[i]
+
+    def __setitem__(self, index, val):
+        raise TypeError("MemorySignal object doesn't support item assignment")
+
+    def __hash__(self):
+        raise TypeError("MemorySignal objects are unhashable")
+
+    def __repr__(self):
+        return "MemorySignal(%r, %s)" % (self._template, self._depth)
+
+    def isWritten(self, index):
+        """ Return True if the element at index has been written. """
+        return bool(self._written[index])
+
+    def writtenAddresses(self):
+        """ Return a sorted list of the addresses that have been written. """
+        return [i for i, w in enumerate(self._written) if w]
+
+
+class _MemoryWord(intbv):
+
+    """ Value of a memory element, returned by indexing a memory signal.
+
+    It behaves as an intbv with the current value. Assigning to its 'next'
+    attribute schedules a write to the memory.
+
+    """
+
+    def _get_next(self):
+        raise AttributeError("MemorySignal element 'next' is write-only")
+    def _set_next(self, val):
+        self._mem._write(self._index, val)
+    next = property(_get_next, _set_next, None, "'next' access methods")
+
+    def _get_val(self):
+        return self._mem._value(self._index)
+    val = property(_get_val, None, None, "'val' access methods")
+
+
+class _MemoryElement(_Signal):
+
+    """ Signal view on a memory element.
+
+    Element signals are created for tracing and conversion, so that these
+    can handle a memory signal as a list of signals. The value is kept in
+    the memory store.
+
+    """
+
+    __slots__ = ('_mem', '_index')
+
+    def __init__(self, mem, index):
+        # no _Signal.__init__: the element is not registered as a signal
+        t = mem._template
+        self._mem = mem
+        self._index = index
+        self._min = mem._min
+        self._max = mem._max
+        self._nrbits = mem._nrbits
+        self._type = mem._type
+        self._name = self._read = self._driven = None
+        self._used = False
+        self._inList = False
+        self._numeric = True
+        self._code = ""
+        self._tracing = 0
+        self._slicesigs = []
+        self._eventWaiters = mem._eventWaiters
+        if mem._type is bool:
+            self._printVcd = self._printVcdBit
+        else:
+            self._printVcd = self._printVcdVec
+
+    def _get_val(self):
+        return self._mem._value(self._index)
+    _val = property(_get_val)
+    val = property(_get_val, None, None, "'val' access methods")
+
+    def _get_init(self):
+        if self._mem._init is None:
+            return copy(self._mem._template)
+        return self._mem._value(self._index)
+    _init = property(_get_init)
+
+    def _set_next(self, val):
+        self._mem._write(self._index, val)
+    next = property(_get_val, _set_next, None, "'next' access methods")
+    _next = property(_get_val)
+
+    def _clear(self):
+        pass
+
+    def _update(self):
+        return []
@@ -48,9 +48,9 @@ class _ShadowSignal(_Signal):
         
 class _SliceSignal(_ShadowSignal):
 
-    __slots__ = ('_sig', '_left', '_right')
+    __slots__ = ('_sig', '_left', '_right', '_mask')
 
-    def __init__(self, sig, left, right=None):
+    def __init__(self, sig, left, right=None, view=False):
         ### XXX error checks
         if right is None:
             _ShadowSignal.__init__(self, sig[left])
@@ -59,6 +59,14 @@ class _SliceSignal(_ShadowSignal):
         self._sig = sig
         self._left = left
         self._right = right
+        self._mask = None
+        if view and hasattr(sig, '_views'):
+            if right is None:
+                self._mask = 1
+            else:
+                self._mask = (1 << (left - right)) - 1
+            _addView(sig, self)
+            return
         if right is None:
             gen = self._genfuncIndex()
         else:
@@ -79,6 +87,18 @@ class _SliceSignal(_ShadowSignal):
             set_next(self, sig[left:right])
             yield sig
 
+    def _update(self):
+        if self._mask is not None:
+            # view: take the value from the parent
+            val = self._sig._val
+            if isinstance(val, intbv):
+                val = val._val
+            if self._right is None:
+                self._next = bool((val >> self._left) & 1)
+            else:
+                self._next._val = (val >> self._right) & self._mask
+        return _Signal._update(self)
+
     def _setName(self, hdl):
         if self._right is None:       
             if hdl == 'Verilog':
@@ -116,10 +136,14 @@ class _SliceSignal(_ShadowSignal):
 
 class ConcatSignal(_ShadowSignal):
 
-    __slots__ = ('_args',)
+    __slots__ = ('_args', '_parts')
 
-    def __init__(self, *args):
+    def __init__(self, *args, **kwargs):
         assert len(args) >= 2
+        view = kwargs.pop('view', False)
+        if kwargs:
+            raise TypeError("ConcatSignal: unexpected keyword argument %r" %
+                            kwargs.keys()[0])
         self._args = args
         ### XXX error checks
         nrbits = 0
@@ -132,6 +156,18 @@ class ConcatSignal(_ShadowSignal):
             ini[hi:lo] = a
             hi = lo
         _ShadowSignal.__init__(self, ini)
+        self._parts = None
+        if view and min([hasattr(a, '_views') for a in args]):
+            parts = []
+            hi = nrbits
+            for a in args:
+                lo = hi - len(a)
+                parts.append((a, lo, (1 << len(a)) - 1))
+                hi = lo
+            self._parts = parts
+            for a in args:
+                _addView(a, self)
+            return
         gen = self.genfunc()
         self._waiter = _SignalTupleWaiter(gen)
 
@@ -149,6 +185,16 @@ class ConcatSignal(_ShadowSignal):
             set_next(self, newval)
             yield args
 
+    def _update(self):
+        parts = self._parts
+        if parts is not None:
+            # view: take the value from the arguments
+            val = 0
+            for a, lo, mask in parts:
+                val |= (int(a._val) & mask) << lo
+            self._next._val = val
+        return _Signal._update(self)
+
     def _markRead(self):
         self._read = True
         for s in self._args:
@@ -184,6 +230,20 @@ class ConcatSignal(_ShadowSignal):
         return "\n".join(lines)
 
 
+def _addView(sig, view):
+    """ Register a view shadow signal to be updated along with sig.
+
+    A view has no waiter: when the value of sig changes, sig schedules
+    the view for update in the same delta cycle, after the signals that
+    were already scheduled. A view on several signals is updated once
+    they all have their new value.
+
+    """
+    if sig._views is None:
+        sig._views = []
+    sig._views.append(view)
+
+
 # Tristate signal
 
 
@@ -208,7 +268,8 @@ def TristateSignal(val):
 
 class _TristateSignal(_ShadowSignal):
 
-    __slots__ = ('_drivers', '_orival' )
+    __slots__ = ('_drivers', '_orival', '_actives', '_resolver', '_pending',
+                 '_contentions', 'onContention')
             
     def __init__(self, val):
         self._drivers = []
@@ -217,29 +278,44 @@ class _TristateSignal(_ShadowSignal):
         self._orival = deepcopy(val) # keep for drivers
         # reset signal values to None
         self._next = self._val = self._init = None
-        self._waiter = _SignalTupleWaiter(self._resolve())
+        # active drivers, by id
+        self._actives = {}
+        self._resolver = _TristateResolver(self)
+        self._pending = False
+        self._contentions = 0
+        self.onContention = None
 
     def driver(self):
         d = _TristateDriver(self)
         self._drivers.append(d)
         return d
 
+    def _clear(self):
+        _ShadowSignal._clear(self)
+        self._actives.clear()
+        self._pending = False
+
     def _resolve(self):
-        # set_next = _ShadowSignal._set_next
-        senslist = self._drivers
-        while 1:
-            yield senslist
-            res = None
-            for d in senslist:
-                if res is None:
-                    res = d._val
-                elif d._val is not None:
+        self._pending = False
+        actives = self._actives
+        if len(actives) == 1:
+            for d in actives.itervalues():
+                self._next = d._val
+        else:
+            self._next = None
+            if actives:
+                self._contentions += 1
+                if self.onContention is None:
                     warnings.warn("Bus contention", category=BusContentionWarning)
-                    res = None
-                    break
-            self._next = res
-            _siglist.append(self)
+                else:
+                    self.onContention(self, actives.values())
+        _siglist.append(self)
 
+    # support for the 'contentions' attribute
+    def _get_contentions(self):
+        return self._contentions
+    contentions = property(_get_contentions, None, None,
+                           "number of resolutions with bus contention")
 
     def toVerilog(self):
         lines = []
@@ -254,6 +330,24 @@ class _TristateSignal(_ShadowSignal):
         return "\n".join(lines)
 
 
+class _TristateResolver(object):
+
+    """ Waiter that resolves a tristate signal once per delta cycle.
+
+    Drivers schedule it from their _update when their value changes,
+    so that the signal is resolved one delta cycle after its drivers
+    without waiting on all of them.
+
+    """
+
+    __slots__ = ('sig',)
+
+    def __init__(self, sig):
+        self.sig = sig
+
+    def next(self, waiters, exc):
+        self.sig._resolve()
+
 
 class _TristateDriver(_Signal):
 
@@ -278,3 +372,18 @@ class _TristateDriver(_Signal):
          
     # redefine property because standard inheritance doesn't work for setter/getter functions
     next = property(_Signal._get_next, _set_next, None, "'next' access methods")
+
+    def _update(self):
+        val, next = self._val, self._next
+        if val == next:
+            return []
+        sig = self._sig
+        if val is None:
+            sig._actives[id(self)] = self
+        elif next is None:
+            del sig._actives[id(self)]
+        waiters = _Signal._update(self)
+        if not sig._pending:
+            sig._pending = True
+            waiters.append(sig._resolver)
+        return waiters
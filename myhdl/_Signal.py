@@ -34,6 +34,7 @@ import operator
 from myhdl import _simulator as sim
 from myhdl._simulator import _signals, _siglist, _futureEvents, now
 from myhdl._intbv import intbv
+from myhdl._modbv import modbv
 from myhdl._bin import bin
 # from myhdl._enum import EnumItemType
 
@@ -52,10 +53,7 @@ def _isListOfSigs(obj):
      
        
 class _WaiterList(list):
-
-    def purge(self):
-        if self:
-            self[:] = [w for w in self if not w.hasRun]
+    pass
 
 
 class _PosedgeWaiterList(_WaiterList):
@@ -90,6 +88,8 @@ def Signal(val=None, delay=None):
         if delay < 0:
             raise TypeError("Signal: delay should be >= 0")
         return _DelayedSignal(val, delay)
+    elif type(val) in (intbv, modbv) and val._nrbits and val._hasFullRange():
+        return _VectorSignal(val)
     else:
         return _Signal(val)
     
@@ -109,7 +109,7 @@ class _Signal(object):
                  '_setNextVal', '_copyVal2Next', '_printVcd', 
                  '_driven' ,'_read', '_name', '_used', '_inList',
                  '_waiter', 'toVHDL', 'toVerilog', '_slicesigs',
-                 '_numeric'
+                 '_numeric', '_views'
                 )
 
 
@@ -142,7 +142,7 @@ class _Signal(object):
             self._min = val._min
             self._max = val._max
             self._nrbits = val._nrbits
-            self._setNextVal = self._setNextIntbv
+            self._setNextVal = self._selectSetNextIntbv(val)
             if self._nrbits:
                 self._printVcd = self._printVcdVec
             else:
@@ -151,6 +151,7 @@ class _Signal(object):
             self._type = type(val)
             if isinstance(val, EnumItemType):
                 self._setNextVal = self._setNextNonmutable
+                self._printVcd = self._printVcdEnum
             else:
                 self._setNextVal = self._setNextMutable
             if hasattr(val, '_nrbits'):
@@ -160,6 +161,7 @@ class _Signal(object):
         self._negedgeWaiters = _NegedgeWaiterList(self)
         self._code = ""
         self._slicesigs = []
+        self._views = None
         self._tracing = 0
         _signals.append(self)
 
@@ -171,6 +173,10 @@ class _Signal(object):
         self._next = deepcopy(self._init)
         self._name = self._read = self._driven = None
         self._numeric = True
+        if self._views:
+            # always_comb waiters subscribe again in a new simulation
+            self._views[:] = [v for v in self._views
+                              if not isinstance(v, _CombWaiter)]
         for s in self._slicesigs:
             s._clear()
         
@@ -195,6 +201,8 @@ class _Signal(object):
                 self._val = deepcopy(next)
             if self._tracing:
                 self._printVcd()
+            if self._views:
+                _siglist.extend(self._views)
             return waiters
         else:
             return []
@@ -260,6 +268,30 @@ class _Signal(object):
     def _markUsed(self):
         self._used = True
 
+    # watch support
+    def watch(self, callback, cond=None):
+        """ Call callback(sig) on each change of the signal value.
+
+        cond -- optional predicate, called with the signal; the callback
+                is only called when it returns a true value
+
+        The watcher is a view of the signal: it is called directly in
+        the update phase, after the signals that were scheduled in the
+        delta cycle have their new value, without a generator. Signals
+        without watchers do not pay for it. The callback is meant for
+        checking and logging, and should not assign signals.
+
+        """
+        if self._views is None:
+            self._views = []
+        self._views.append(_Watcher(self, callback, cond))
+
+    def unwatch(self, callback):
+        """ Remove the watchers of the signal with callback. """
+        if self._views:
+            self._views[:] = [v for v in self._views if not
+                              (isinstance(v, _Watcher) and v.callback == callback)]
+
     # set next methods
     def _setNextBool(self, val):
         if not val in (0, 1):
@@ -281,8 +313,58 @@ class _Signal(object):
         self._next._val = val
         self._next._handleBounds()
 
+    def _selectSetNextIntbv(self, val):
+        # select the bounds handling for the next value, based on the
+        # bounds of the initial value; subclasses keep the generic one
+        min, max = val._min, val._max
+        if type(val) is intbv:
+            if min is None and max is None:
+                return self._setNextIntbvUnbounded
+            elif min is not None and max is not None:
+                return self._setNextIntbvBounded
+        elif type(val) is modbv:
+            if min is None and max is None:
+                return self._setNextIntbvUnbounded
+            elif val._hasFullRange():
+                if min == 0:
+                    return self._setNextModbvUnsigned
+                else:
+                    return self._setNextModbvSigned
+        return self._setNextIntbv
+
+    def _setNextIntbvUnbounded(self, val):
+        if isinstance(val, intbv):
+            val = val._val
+        elif not isinstance(val, (int, long)):
+            raise TypeError("Expected int or intbv, got %s" % type(val))
+        self._next._val = val
+
+    def _setNextIntbvBounded(self, val):
+        if isinstance(val, intbv):
+            val = val._val
+        elif not isinstance(val, (int, long)):
+            raise TypeError("Expected int or intbv, got %s" % type(val))
+        self._next._val = val
+        if val < self._min or val >= self._max:
+            self._next._handleBounds()
+
+    def _setNextModbvUnsigned(self, val):
+        if isinstance(val, intbv):
+            val = val._val
+        elif not isinstance(val, (int, long)):
+            raise TypeError("Expected int or intbv, got %s" % type(val))
+        self._next._val = val & (self._max - 1)
+
+    def _setNextModbvSigned(self, val):
+        if isinstance(val, intbv):
+            val = val._val
+        elif not isinstance(val, (int, long)):
+            raise TypeError("Expected int or intbv, got %s" % type(val))
+        max = self._max
+        self._next._val = ((val + max) & (max + max - 1)) - max
+
     def _setNextNonmutable(self, val):
-        if not isinstance(val, self._type):
+        if val.__class__ is not self._type and not isinstance(val, self._type):
             raise TypeError("Expected %s, got %s" % (self._type, type(val)))
         self._next = val    
         
@@ -294,6 +376,9 @@ class _Signal(object):
     # vcd print methods
     def _printVcdStr(self):
         print >> sim._tf, "s%s %s" % (str(self._val), self._code)
+
+    def _printVcdEnum(self):
+        print >> sim._tf, "s%s %s" % (self._val._name, self._code)
         
     def _printVcdHex(self):
         print >> sim._tf, "s%s %s" % (hex(self._val), self._code)
@@ -305,8 +390,8 @@ class _Signal(object):
         print >> sim._tf, "b%s %s" % (bin(self._val, self._nrbits), self._code)
 
     ### use call interface for shadow signals ###
-    def __call__(self, left, right=None):
-        s = _SliceSignal(self, left, right)
+    def __call__(self, left, right=None, view=False):
+        s = _SliceSignal(self, left, right, view)
         self._slicesigs.append(s)
         return s
 
@@ -529,6 +614,165 @@ class _Signal(object):
         self.toVerilog = toVerilog
 
 
+class _VectorSignal(_Signal):
+
+    """ Signal with a sized intbv or modbv value that has a full range.
+
+    The current and next values are stored as plain integers. The
+    intbv objects that the 'val' and 'next' attributes and slicing
+    return are constructed on demand.
+
+    """
+
+    __slots__ = ('_offset', '_mask', '_nextbv')
+
+    def __init__(self, val):
+        _Signal.__init__(self, val)
+        self._val = self._next = val._val
+        self._nextbv = None
+        # values are offset to the 0 .. 2**nrbits-1 range for checking
+        self._offset = -val._min
+        self._mask = val._max - val._min - 1
+        if type(val) is modbv:
+            if self._offset:
+                self._setNextVal = self._setNextWrapSigned
+            else:
+                self._setNextVal = self._setNextWrapUnsigned
+        else:
+            self._setNextVal = self._setNextChecked
+
+    def _clear(self):
+        _Signal._clear(self)
+        self._val = self._next = self._init._val
+        self._nextbv = None
+
+    def _update(self):
+        nextbv = self._nextbv
+        if nextbv is not None:
+            self._next = nextbv._val
+            self._nextbv = None
+        val, next = self._val, self._next
+        if val != next:
+            waiters = self._eventWaiters[:]
+            del self._eventWaiters[:]
+            if not val and next:
+                waiters.extend(self._posedgeWaiters[:])
+                del self._posedgeWaiters[:]
+            elif not next and val:
+                waiters.extend(self._negedgeWaiters[:])
+                del self._negedgeWaiters[:]
+            self._val = next
+            if self._tracing:
+                self._printVcd()
+            if self._views:
+                _siglist.extend(self._views)
+            return waiters
+        else:
+            return []
+
+    def _intbv(self, val):
+        # construct an intbv like the initial value, without checks
+        init = self._init
+        v = intbv.__new__(type(init))
+        v._val = val
+        v._min = init._min
+        v._max = init._max
+        v._nrbits = init._nrbits
+        return v
+
+    # support for the 'val' attribute
+    def _get_val(self):
+        return self._intbv(self._val)
+    val = property(_get_val, None, None, "'val' access methods")
+
+    # support for the 'next' attribute
+    def _get_next(self):
+        # the returned object can be modified in place, e.g. with
+        # slice assignment; its value is taken over at update time
+        nextbv = self._nextbv
+        if nextbv is None:
+            nextbv = self._nextbv = self._intbv(self._next)
+        _siglist.append(self)
+        return nextbv
+    def _set_next(self, val):
+        if isinstance(val, _Signal):
+            val = val._val
+        self._nextbv = None
+        self._setNextVal(val)
+        _siglist.append(self)
+    next = property(_get_next, _set_next, None, "'next' access methods")
+
+    # set next methods
+    def _setNextChecked(self, val):
+        if isinstance(val, intbv):
+            val = val._val
+        elif not isinstance(val, (int, long)):
+            raise TypeError("Expected int or intbv, got %s" % type(val))
+        if (val + self._offset) & ~self._mask:
+            # raises the intbv bounds error
+            intbv(val, min=self._min, max=self._max)
+        self._next = val
+
+    def _setNextWrapUnsigned(self, val):
+        if isinstance(val, intbv):
+            val = val._val
+        elif not isinstance(val, (int, long)):
+            raise TypeError("Expected int or intbv, got %s" % type(val))
+        self._next = val & self._mask
+
+    def _setNextWrapSigned(self, val):
+        if isinstance(val, intbv):
+            val = val._val
+        elif not isinstance(val, (int, long)):
+            raise TypeError("Expected int or intbv, got %s" % type(val))
+        offset = self._offset
+        self._next = ((val + offset) & self._mask) - offset
+
+    ### operators for which the result should be an intbv ###
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._intbv(self._val)[key]
+        return bool((self._val >> int(key)) & 1)
+
+    def __lshift__(self, other):
+        return intbv(long(self._val) << int(other))
+
+    def __rshift__(self, other):
+        return type(self._init)(self._val >> int(other))
+
+    def __and__(self, other):
+        return type(self._init)(self._val & int(other))
+    def __rand__(self, other):
+        return type(self._init)(other & self._val)
+
+    def __or__(self, other):
+        return type(self._init)(self._val | int(other))
+    def __ror__(self, other):
+        return type(self._init)(other | self._val)
+
+    def __xor__(self, other):
+        return type(self._init)(self._val ^ int(other))
+    def __rxor__(self, other):
+        return type(self._init)(other ^ self._val)
+
+    def __invert__(self):
+        if self._min >= 0:
+            return type(self._init)(~self._val & (1L << self._nrbits)-1)
+        return type(self._init)(~self._val)
+
+    # method lookup delegation, for the public intbv attributes
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError("%s object has no attribute %s" %
+                                 (type(self).__name__, attr))
+        return getattr(self._intbv(self._val), attr)
+
+    # representation
+    def __repr__(self):
+        return "Signal(" + repr(self._intbv(self._val)) + ")"
+
+
 class _DelayedSignal(_Signal):
     
     __slots__ = ('_nextZ', '_delay', '_timeStamp',
@@ -568,6 +812,8 @@ class _DelayedSignal(_Signal):
             self._val = copy(next)
             if self._tracing:
                 self._printVcd()
+            if self._views:
+                _siglist.extend(self._views)
             return waiters            
         else:
             return []
@@ -588,11 +834,29 @@ class _SignalWrap(object):
     def apply(self):
         return self.sig._apply(self.next, self.timeStamp)
 
+class _Watcher(object):
+
+    """ Signal watcher, scheduled as a view of its signal. """
+
+    __slots__ = ('sig', 'callback', 'cond')
+
+    def __init__(self, sig, callback, cond):
+        self.sig = sig
+        self.callback = callback
+        self.cond = cond
+
+    def _update(self):
+        sig = self.sig
+        if self.cond is None or self.cond(sig):
+            self.callback(sig)
+        return ()
+
+
 # for export
 SignalType = _Signal
 
 # avoid circular imports
 
 from myhdl._ShadowSignal import _SliceSignal
-from myhdl._Waiter import _SignalWaiter
+from myhdl._Waiter import _SignalWaiter, _CombWaiter
 from myhdl._enum import EnumItemType
@@ -25,11 +25,11 @@ import os
 from warnings import warn
 from types import GeneratorType
 
-from myhdl import Cosimulation, StopSimulation, _SuspendSimulation
+from myhdl import StopSimulation, _SuspendSimulation
 from myhdl import _simulator, SimulationError
 from myhdl._simulator import _signals, _siglist, _futureEvents
 from myhdl._Waiter import _Waiter, _inferWaiter, _SignalWaiter,_SignalTupleWaiter
-from myhdl._util import _flatten, _printExcInfo
+from myhdl._util import _flatten, _printExcInfo, _isCosimulation
 from myhdl._instance import _Instantiator
 from myhdl._ShadowSignal import _ShadowSignal
 
@@ -78,10 +78,13 @@ class Simulation(object):
             os.waitpid(cosim._child_pid, 0)
         if _simulator._tracing:
             _simulator._tracing = 0
+            _simulator._tracewaiter = None
             _simulator._tf.close()
         # clean up for potential new run with same signals
         for s in _signals:
             s._clear()
+        # waiter triggers in the cleared lists are no longer queued
+        _simulator._epoch += 1
         self._finished = True
             
         
@@ -111,7 +114,6 @@ class Simulation(object):
             schedule((maxTime, stop))
         cosim = self._cosim
         t = _simulator._time
-        actives = {}
         tracing = _simulator._tracing
         tracefile = _simulator._tf
         exc = []
@@ -122,6 +124,7 @@ class Simulation(object):
         while 1:
             try:
 
+                _simulator._delta += 1
                 for s in _siglist:
                     _extend(s._update())
                 del _siglist[:]
@@ -129,7 +132,7 @@ class Simulation(object):
                 while waiters:
                     waiter = _pop()
                     try:
-                        waiter.next(waiters, actives, exc)
+                        waiter.next(waiters, exc)
                     except StopIteration:
                         continue
 
@@ -141,10 +144,6 @@ class Simulation(object):
                 elif _siglist:
                     continue
 
-                if actives:
-                    for wl in actives.values():
-                        wl.purge()
-                    actives = {}
 
                 # at this point it is safe to potentially suspend a simulation
                 if exc:
@@ -209,7 +208,7 @@ def _makeWaiters(arglist):
             waiters.append(_inferWaiter(arg))
         elif isinstance(arg, _Instantiator):
             waiters.append(arg.waiter)
-        elif isinstance(arg, Cosimulation):
+        elif _isCosimulation(arg):
             if cosim is not None:
                 raise SimulationError(_error.MultipleCosim)
             cosim = arg
@@ -227,5 +226,8 @@ def _makeWaiters(arglist):
     for sig in _signals:
         if hasattr(sig, '_waiter'):
             waiters.append(sig._waiter)
+    # add waiter that controls the trace dump window
+    if _simulator._tracing and _simulator._tracewaiter is not None:
+        waiters.append(_simulator._tracewaiter)
     return waiters, cosim
         
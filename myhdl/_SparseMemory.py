@@ -0,0 +1,369 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" myhdl sparse memory module.
+
+This module provides the following myhdl objects:
+SparseMemory -- simulation model of a large, sparsely used memory
+
+The memory is divided in fixed-size pages. A page is only allocated
+when it is written, as an array of the most compact type that holds
+an element. Reading an address in an unallocated page returns the
+default value. Binary images are loaded and dumped through mmap, one
+page at a time.
+
+"""
+
+
+import os
+import sys
+import mmap
+from array import array
+from copy import copy
+
+from myhdl import SparseMemoryError
+from myhdl._intbv import intbv
+from myhdl._always import always
+from myhdl._always_seq import always_seq
+from myhdl._MemorySignal import _typecode
+
+class _error:
+    pass
+_error.Uninitialized = "Read from uninitialized address"
+_error.PageSize = "Page size should be a power of 2"
+_error.Range = "Address range exceeds memory depth"
+
+_bigEndian = sys.byteorder == 'big'
+
+
+class SparseMemory(object):
+
+    """ Sparse memory with page-level allocation.
+
+    Methods:
+    read -- return the value at an address
+    write -- write a value at an address
+    load -- load words from a binary file
+    dump -- dump words to a binary file
+    port -- return a clocked read/write process
+    residentPages -- return the numbers of the allocated pages
+    stats -- return a dictionary with access statistics
+    clearStats -- reset the access statistics
+
+    """
+
+    def __init__(self, val, depth, pagesize=4096, strict=False):
+        """ Construct a sparse memory.
+
+        val -- element value, that defines the element type and default value
+        depth -- number of elements
+        pagesize -- number of elements per page, a power of 2
+        strict -- if True, reading an unwritten address raises an error
+
+        """
+        if not isinstance(val, (bool, intbv)):
+            raise TypeError("SparseMemory element should be bool or intbv, got %s" %
+                            type(val))
+        if isinstance(val, intbv) and not val._nrbits:
+            raise ValueError("SparseMemory element should have a bit width")
+        if depth <= 0:
+            raise ValueError("SparseMemory depth should be > 0")
+        if pagesize <= 0 or pagesize & (pagesize-1):
+            raise SparseMemoryError(_error.PageSize, str(pagesize))
+        self.depth = depth
+        self.pagesize = pagesize
+        self.strict = strict
+        self._shift = pagesize.bit_length() - 1
+        self._mask = pagesize - 1
+        if isinstance(val, bool):
+            self._nrbits = 1
+            self._signed = False
+            self._scratch = None
+            self._default = int(val)
+        else:
+            self._nrbits = val._nrbits
+            self._signed = val._min is not None and val._min < 0
+            self._scratch = copy(val)
+            self._default = val._val
+        self._code = _typecode(val)
+        self._wordbytes = (self._nrbits + 7) // 8
+        self._pages = {}
+        self._valid = {}
+        self.clearStats()
+
+    def clearStats(self):
+        """ Reset the access statistics. """
+        self.reads = 0
+        self.writes = 0
+        self.misses = 0
+        self.faults = 0
+
+    def stats(self):
+        """ Return a dictionary with access statistics.
+
+        reads, writes -- number of read and write accesses
+        misses -- number of reads from an unallocated page
+        faults -- number of page allocations
+        pages -- number of resident pages
+        bytes -- approximate memory size of the resident pages
+
+        """
+        pages = len(self._pages)
+        itemsize = self._code and array(self._code).itemsize or 8
+        return dict(reads=self.reads, writes=self.writes,
+                    misses=self.misses, faults=self.faults,
+                    pages=pages, bytes=pages * self.pagesize * itemsize)
+
+    def residentPages(self):
+        """ Return a sorted list of the numbers of the allocated pages. """
+        return sorted(self._pages)
+
+    def _newPage(self, pageno):
+        self.faults += 1
+        data = [self._default] * self.pagesize
+        if self._code is None:
+            page = data
+        else:
+            page = array(self._code, data)
+        self._pages[pageno] = page
+        if self.strict:
+            self._valid[pageno] = bytearray(self.pagesize)
+        return page
+
+    def _checkAddr(self, addr):
+        if not 0 <= addr < self.depth:
+            raise IndexError("SparseMemory address %s out of range" % addr)
+
+    def _checkVal(self, val):
+        if isinstance(val, intbv):
+            val = val._val
+        s = self._scratch
+        if s is None:
+            if not val in (0, 1):
+                raise ValueError("Expected boolean value, got %s (%s)" % (repr(val), type(val)))
+            return int(val)
+        s._val = val
+        s._handleBounds()
+        return s._val
+
+    def read(self, addr):
+        """ Return the value at addr as an int. """
+        addr = int(addr)
+        self._checkAddr(addr)
+        self.reads += 1
+        pageno = addr >> self._shift
+        page = self._pages.get(pageno)
+        if page is None:
+            self.misses += 1
+            if self.strict:
+                raise SparseMemoryError(_error.Uninitialized, hex(addr))
+            return self._default
+        offset = addr & self._mask
+        if self.strict and not self._valid[pageno][offset]:
+            raise SparseMemoryError(_error.Uninitialized, hex(addr))
+        return page[offset]
+
+    def write(self, addr, val):
+        """ Write val at addr. """
+        addr = int(addr)
+        self._checkAddr(addr)
+        val = self._checkVal(val)
+        self.writes += 1
+        pageno = addr >> self._shift
+        page = self._pages.get(pageno)
+        if page is None:
+            page = self._newPage(pageno)
+        offset = addr & self._mask
+        page[offset] = val
+        if self.strict:
+            self._valid[pageno][offset] = 1
+
+    __getitem__ = read
+    __setitem__ = write
+
+    def __len__(self):
+        return self.depth
+
+    def port(self, clk, addr, din, dout, we, en=None, reset=None):
+        """ Return a process that accesses the memory on the rising clock edge.
+
+        When en is None or active, the process writes din at addr if we
+        is active, and reads addr into dout otherwise. When a reset
+        signal is specified, the process is an always_seq process that
+        resets dout.
+
+        """
+        read, write = self.read, self.write
+        if reset is None:
+            decorator = always(clk.posedge)
+        else:
+            decorator = always_seq(clk.posedge, reset=reset)
+        if en is None:
+            @decorator
+            def access():
+                if we:
+                    write(addr.val, din.val)
+                else:
+                    dout.next = read(addr.val)
+        else:
+            @decorator
+            def access():
+                if en:
+                    if we:
+                        write(addr.val, din.val)
+                    else:
+                        dout.next = read(addr.val)
+        return access
+
+    def _chunks(self, start, stop):
+        """ Yield (pageno, first offset, number of words) for an address range. """
+        addr = start
+        while addr < stop:
+            pageno = addr >> self._shift
+            offset = addr & self._mask
+            n = min(self.pagesize - offset, stop - addr)
+            yield pageno, offset, n
+            addr += n
+
+    def _fastPath(self):
+        # array contents can be copied as such if the word size matches
+        return self._code is not None and \
+               array(self._code).itemsize == self._wordbytes == self._nrbits // 8
+
+    def _decode(self, data):
+        if self._fastPath():
+            words = array(self._code)
+            words.fromstring(data)
+            if _bigEndian:
+                words.byteswap()
+            return words
+        n = self._wordbytes
+        mask = (1 << self._nrbits) - 1
+        sign = 1 << (self._nrbits - 1)
+        words = []
+        for i in range(0, len(data), n):
+            v = int(data[i:i+n][::-1].encode('hex'), 16) & mask
+            if self._signed and v & sign:
+                v -= 1 << self._nrbits
+            words.append(v)
+        if self._scratch is not None:
+            for v in words:
+                self._checkVal(v)
+        if self._code is not None:
+            return array(self._code, words)
+        return words
+
+    def _encode(self, words):
+        if self._fastPath():
+            words = array(self._code, words)
+            if _bigEndian:
+                words.byteswap()
+            return words.tostring()
+        n = self._wordbytes
+        mask = (1 << self._nrbits) - 1
+        fmt = "%%0%dx" % (2*n)
+        return "".join([(fmt % (v & mask)).decode('hex')[::-1] for v in words])
+
+    def load(self, path, base=0, offset=0, length=None):
+        """ Load words from a binary file.
+
+        Words are little-endian and take the smallest whole number of
+        bytes that holds an element.
+
+        path -- file name
+        base -- first memory address to load
+        offset -- byte offset in the file
+        length -- number of words to load, by default the rest of the file
+
+        Return the number of words loaded.
+
+        """
+        n = self._wordbytes
+        f = open(path, 'rb')
+        try:
+            size = os.fstat(f.fileno()).st_size
+            if length is None:
+                length = max(size - offset, 0) // n
+            if offset + length*n > size:
+                raise ValueError("File %s has less than %s words at offset %s" %
+                                 (path, length, offset))
+            if base < 0 or base + length > self.depth:
+                raise SparseMemoryError(_error.Range, "%s words at %s" % (length, hex(base)))
+            if not length:
+                return 0
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                # unallocated pages already read as zero
+                skipZero = self._default == 0 and not self.strict
+                pos = offset
+                for pageno, start, cnt in self._chunks(base, base + length):
+                    data = m[pos:pos+cnt*n]
+                    pos += cnt*n
+                    page = self._pages.get(pageno)
+                    if page is None:
+                        if skipZero and not data.strip('\0'):
+                            continue
+                        page = self._newPage(pageno)
+                    page[start:start+cnt] = self._decode(data)
+                    if self.strict:
+                        self._valid[pageno][start:start+cnt] = '\x01' * cnt
+            finally:
+                m.close()
+        finally:
+            f.close()
+        return length
+
+    def dump(self, path, start=0, stop=None):
+        """ Dump the words in an address range to a binary file.
+
+        path -- file name
+        start -- first memory address to dump
+        stop -- address after the last one to dump, by default the depth
+
+        """
+        if stop is None:
+            stop = self.depth
+        if not 0 <= start <= stop <= self.depth:
+            raise SparseMemoryError(_error.Range, "%s to %s" % (hex(start), hex(stop)))
+        n = self._wordbytes
+        size = (stop - start) * n
+        f = open(path, 'w+b')
+        try:
+            if not size:
+                return
+            # extending the file fills it with zeros
+            f.truncate(size)
+            m = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_WRITE)
+            try:
+                default = None
+                if self._default != 0:
+                    default = self._encode([self._default])
+                pos = 0
+                for pageno, offset, cnt in self._chunks(start, stop):
+                    page = self._pages.get(pageno)
+                    if page is not None:
+                        m[pos:pos+cnt*n] = self._encode(page[offset:offset+cnt])
+                    elif default is not None:
+                        m[pos:pos+cnt*n] = default * cnt
+                    pos += cnt*n
+                m.flush()
+            finally:
+                m.close()
+        finally:
+            f.close()
@@ -23,14 +23,14 @@
 from types import GeneratorType
 
 import ast
-import inspect
 import re
 
 
-from myhdl._util import _dedent
+from myhdl._sourcecache import sourceCache
 from myhdl._delay import delay
 from myhdl._join import join
 from myhdl._Signal import _Signal, _WaiterList, posedge, negedge
+from myhdl._MemorySignal import _MemorySignal
 from myhdl import _simulator
 from myhdl._simulator import _siglist, _futureEvents
 from myhdl._enum import enum
@@ -41,29 +41,24 @@ schedule = _futureEvents.append
 
 class _Waiter(object):
 
-    __slots__ = ('caller', 'generator', 'hasRun', 'nrTriggers', 'semaphore')
+    __slots__ = ('caller', 'generator', 'hasRun', 'semaphore',
+                 'generation', 'triggers')
     
     def __init__(self, generator, caller=None):
         self.caller = caller
         self.generator = generator
         self.hasRun = 0
-        self.nrTriggers = 1
         self.semaphore = 0
+        self.generation = 0
+        self.triggers = None
         
-    def next(self, waiters, actives, exc):
+    def next(self, waiters, exc):
 
         if self.hasRun:
             raise StopIteration
 
-        if self.semaphore:
-            self.semaphore -= 1
-            raise StopIteration
-        
-        if self.nrTriggers == 1:
-            clone = self
-        else:
-            self.hasRun = 1
-            clone = _Waiter(self.generator, self.caller)
+        # the triggers of the previous wait become stale
+        self.generation += 1
             
         try:
             clause = self.generator.next()
@@ -73,48 +68,123 @@ class _Waiter(object):
             raise # again
             
         if isinstance(clause, _WaiterList):
-            clauses = (clause,)
-        elif isinstance(clause, (tuple, list)):
-            clone.nrTriggers = len(clause)
-            if clause:
-                clauses = clause
-            else:
-                clauses = (None,)
+            clause.append(self)
+            return
+        isJoin = False
+        if isinstance(clause, (tuple, list)):
+            clauses = clause or (None,)
         elif isinstance(clause, join):
-            clone.semaphore = len(clause._args)-1
             clauses = clause._args
+            isJoin = True
         else:
             clauses = (clause,)
-            
-        nr = len(clauses)
+
+        if len(clauses) == 1:
+            self._wait(clauses[0], self, waiters, exc)
+            return
+        wls = []
         for clause in clauses:
             if isinstance(clause, _WaiterList):
-                clause.append(clone)
-                if nr > 1:
-                    actives[id(clause)] = clause
-            elif isinstance(clause, _Signal):
-                wl = clause._eventWaiters
-                wl.append(clone)
-                if nr > 1:
-                    actives[id(wl)] = wl
-            elif isinstance(clause, delay):
-                t = _simulator._time
-                schedule((t + clause._time, clone))
-            elif isinstance(clause, GeneratorType):
-                waiters.append(_Waiter(clause, clone))
-            elif isinstance(clause, _Instantiator):
-                waiters.append(_Waiter(clause.gen, clone))
-            elif isinstance(clause, join):
-                waiters.append(_Waiter(clause._generator(), clone))
-            elif clause is None:
-                waiters.append(clone)
-            elif isinstance(clause, Exception):
-                waiters.append(clone)
-                if not exc:
-                    exc.append(clause)
+                wls.append(clause)
+            elif isinstance(clause, (_Signal, _MemorySignal)):
+                wls.append(clause._eventWaiters)
             else:
-                raise TypeError("yield clause %s has type %s" %
-                                (repr(clause), type(clause)))
+                trigger = _Trigger(self, None)
+                trigger.generation = self.generation
+                self._wait(clause, trigger, waiters, exc)
+        if wls:
+            self._arm(wls)
+        if isJoin:
+            self.semaphore = len(clauses) - 1
+
+    def _wait(self, clause, target, waiters, exc):
+        if isinstance(clause, _WaiterList):
+            clause.append(target)
+        elif isinstance(clause, (_Signal, _MemorySignal)):
+            clause._eventWaiters.append(target)
+        elif isinstance(clause, delay):
+            t = _simulator._time
+            schedule((t + clause._time, target))
+        elif isinstance(clause, GeneratorType):
+            waiters.append(_Waiter(clause, target))
+        elif isinstance(clause, _Instantiator):
+            waiters.append(_Waiter(clause.gen, target))
+        elif isinstance(clause, join):
+            waiters.append(_Waiter(clause._generator(), target))
+        elif clause is None:
+            waiters.append(target)
+        elif isinstance(clause, Exception):
+            waiters.append(target)
+            if not exc:
+                exc.append(clause)
+        else:
+            raise TypeError("yield clause %s has type %s" %
+                            (repr(clause), type(clause)))
+
+    def _arm(self, wls):
+        """ Arm a trigger on each of the waiter lists wls.
+
+        Triggers are reused from wait to wait, keyed by waiter list. A
+        trigger is only appended to its list when it is not still there
+        from an earlier wait.
+
+        """
+        triggers = self.triggers
+        if triggers is None:
+            triggers = self.triggers = {}
+        generation = self.generation
+        epoch = _simulator._epoch
+        delta = _simulator._delta
+        for wl in wls:
+            trigger = triggers.get(id(wl))
+            if trigger is None:
+                trigger = triggers[id(wl)] = _Trigger(self, wl)
+            trigger.generation = generation
+            if trigger.queued != epoch:
+                wl.append(trigger)
+                trigger.queued = epoch
+                trigger.armed = 0
+            else:
+                trigger.armed = delta
+
+
+class _Trigger(_Waiter):
+
+    """ Trigger that resumes a waiter waiting on several clauses.
+
+    A trigger is armed with the generation of the wait. When the waiter
+    was resumed since, the trigger is stale and is skipped.
+
+    A trigger on a waiter list is queued in the list at most once. When
+    it is rearmed in the delta cycle in which the list fired, it is
+    still pending in the run list, and goes back to the waiter list
+    when it comes up.
+
+    """
+
+    __slots__ = ('waiter', 'wl', 'queued', 'armed')
+
+    def __init__(self, waiter, wl):
+        self.waiter = waiter
+        self.wl = wl
+        self.queued = 0
+        self.armed = 0
+        self.generation = 0
+
+    def next(self, waiters, exc):
+        waiter = self.waiter
+        if self.generation != waiter.generation:
+            self.queued = 0
+            raise StopIteration
+        if self.armed == _simulator._delta:
+            self.armed = 0
+            self.wl.append(self)
+            raise StopIteration
+        self.queued = 0
+        if waiter.semaphore:
+            waiter.semaphore -= 1
+            raise StopIteration
+        waiter.next(waiters, exc)
     
     
 class _DelayWaiter(_Waiter):
@@ -124,7 +194,7 @@ class _DelayWaiter(_Waiter):
     def __init__(self, generator):
         self.generator = generator
     
-    def next(self, waiters, actives, exc):
+    def next(self, waiters, exc):
         clause = self.generator.next()
         schedule((_simulator._time + clause._time, self))
         
@@ -137,28 +207,25 @@ class _EdgeWaiter(_Waiter):
         self.generator = generator
         self.hasRun = 0
     
-    def next(self, waiters, actives, exc):
+    def next(self, waiters, exc):
         clause = self.generator.next()
         clause.append(self)
         
     
 class _EdgeTupleWaiter(_Waiter):
     
-    __slots__ = ('generator', 'hasRun')
+    __slots__ = ('generator', 'hasRun', 'semaphore', 'generation', 'triggers')
     
     def __init__(self, generator):
         self.generator = generator
         self.hasRun = 0
+        self.semaphore = 0
+        self.generation = 0
+        self.triggers = None
 
-    def next(self, waiters, actives, exc):
-        if self.hasRun:
-            raise StopIteration
-        clauses = self.generator.next()
-        self.hasRun = 1
-        clone = _EdgeTupleWaiter(self.generator)
-        for clause in clauses:
-            clause.append(clone)
-            actives[id(clause)] = clause
+    def next(self, waiters, exc):
+        self.generation += 1
+        self._arm(self.generator.next())
             
             
 class _SignalWaiter(_Waiter):
@@ -169,30 +236,67 @@ class _SignalWaiter(_Waiter):
         self.generator = generator
         self.hasRun = 0
     
-    def next(self, waiters, actives, exc):
+    def next(self, waiters, exc):
         clause = self.generator.next()
         clause._eventWaiters.append(self)
         
 
 class _SignalTupleWaiter(_Waiter):
     
-    __slots__ = ('generator', 'hasRun')
+    __slots__ = ('generator', 'hasRun', 'semaphore', 'generation', 'triggers')
     
     def __init__(self, generator):
         self.generator = generator
         self.hasRun = 0
+        self.semaphore = 0
+        self.generation = 0
+        self.triggers = None
 
-    def next(self, waiters, actives, exc):
-        if self.hasRun:
-            raise StopIteration
+    def next(self, waiters, exc):
+        self.generation += 1
         clauses = self.generator.next()
-        self.hasRun = 1
-        clone = _SignalTupleWaiter(self.generator)
-        for clause in clauses:
-            wl = clause._eventWaiters
-            wl.append(clone)
-            actives[id(wl)] = wl
-            
+        self._arm([clause._eventWaiters for clause in clauses])
+
+
+
+class _CombWaiter(_Waiter):
+
+    """ Waiter with a fixed sensitivity list of signals, for always_comb.
+
+    Instead of waiting on the signals again after each run, the waiter
+    subscribes to them once, as a view: a signal whose value changes
+    schedules it for update, and the update returns it to run at most
+    once per delta cycle. The subscriptions are removed when a simulation
+    finishes, and made again when the waiter first runs in the next one.
+
+    """
+
+    __slots__ = ('generator', 'hasRun', 'senslist', 'epoch', 'delta')
+
+    def __init__(self, generator, senslist):
+        self.generator = generator
+        self.hasRun = 0
+        self.senslist = senslist
+        self.epoch = 0
+        self.delta = 0
+
+    def next(self, waiters, exc):
+        epoch = _simulator._epoch
+        if self.epoch != epoch:
+            for s in self.senslist:
+                if s._views is None:
+                    s._views = []
+                s._views.append(self)
+            self.epoch = epoch
+        self.generator.next()
+
+    def _update(self):
+        delta = _simulator._delta
+        if self.epoch == _simulator._epoch and self.delta != delta:
+            self.delta = delta
+            return [self]
+        return []
+
 
 #_kind = enum("SIGNAL_TUPLE", "EDGE_TUPLE", "SIGNAL", "EDGE", "DELAY", "UNDEFINED")
 class _kind(object):
@@ -206,13 +310,11 @@ class _kind(object):
 
 def _inferWaiter(gen):
     f = gen.gi_frame
-    s = inspect.getsource(f)
-    s = _dedent(s)
-    root = ast.parse(s)
-    root.symdict = f.f_globals.copy()
-    root.symdict.update(f.f_locals)
+    root = sourceCache._getTree(f)
+    symdict = f.f_globals.copy()
+    symdict.update(f.f_locals)
     # print ast.dump(root)
-    v = _YieldVisitor(root)
+    v = _YieldVisitor(symdict)
     v.visit(root)
     if v.kind == _kind.EDGE_TUPLE:
         return _EdgeTupleWaiter(gen)
@@ -231,60 +333,70 @@ def _inferWaiter(gen):
 
 class _YieldVisitor(ast.NodeVisitor):
 
-    def __init__(self, root):
+    """ Infer the kind of the yield statements of a generator.
+
+    The tree may be shared, so the kinds of the nodes are kept in the
+    kinds dict of the visitor, instead of as node attributes.
+
+    """
+
+    def __init__(self, symdict):
         self.kind = None
-        self.root = root
+        self.kinds = {}
+        self.symdict = symdict
 
     def visit_Yield(self, node):
         self.visit(node.value)
-        if not hasattr(node.value, 'kind'):
+        kind = self.kinds.get(node.value)
+        if kind is None:
             self.kind = _kind.UNDEFINED
         elif not self.kind:
-            self.kind = node.value.kind
-        elif self.kind != node.value.kind:
+            self.kind = kind
+        elif self.kind != kind:
             self.kind = _kind.UNDEFINED
 
     def visit_Tuple(self, node):
         kind = None
         for elt in node.elts:
             self.visit(elt)
-            if not hasattr(elt, 'kind'):
+            eltkind = self.kinds.get(elt)
+            if eltkind is None:
                 kind = _kind.UNDEFINED
             elif not kind:
-                kind = elt.kind
-            elif kind != elt.kind:
+                kind = eltkind
+            elif kind != eltkind:
                 kind = _kind.UNDEFINED
         if kind == _kind.SIGNAL:
-            node.kind = _kind.SIGNAL_TUPLE
+            self.kinds[node] = _kind.SIGNAL_TUPLE
         elif kind == _kind.EDGE:
-            node.kind = _kind.EDGE_TUPLE
+            self.kinds[node] = _kind.EDGE_TUPLE
         else:
-            node.kind = _kind.UNDEFINED
+            self.kinds[node] = _kind.UNDEFINED
 
     def visit_Call(self, node):
         fn = node.func
         if not isinstance(fn, ast.Name):
-            node.kind = _kind.UNDEFINED
+            self.kinds[node] = _kind.UNDEFINED
             return
         self.visit(fn)
-        node.kind = fn.kind
+        self.kinds[node] = self.kinds[fn]
 
     def visit_Name(self, node):
         n = node.id
-        node.kind = _kind.UNDEFINED
-        if n in self.root.symdict:
-            obj = self.root.symdict[n]
-            if isinstance(obj, _Signal):
-                node.kind = _kind.SIGNAL
+        self.kinds[node] = _kind.UNDEFINED
+        if n in self.symdict:
+            obj = self.symdict[n]
+            if isinstance(obj, (_Signal, _MemorySignal)):
+                self.kinds[node] = _kind.SIGNAL
             elif obj is delay:
-                node.kind = _kind.DELAY
+                self.kinds[node] = _kind.DELAY
             elif obj is posedge or obj is negedge:
-                node.kind = _kind.EDGE
+                self.kinds[node] = _kind.EDGE
 
     def visit_Attribute(self, node):
-        node.kind = _kind.UNDEFINED
+        self.kinds[node] = _kind.UNDEFINED
         if node.attr in ('posedge', 'negedge'):
-            node.kind = _kind.EDGE
+            self.kinds[node] = _kind.EDGE
 
         
 
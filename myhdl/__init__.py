@@ -27,6 +27,8 @@ Signal -- factory function to model hardware signals
 SignalType -- Signal base class
 ConcatSignal --  factory function that models a concatenation shadow signal
 TristateSignal -- factory function that models a tristate shadow signal
+MemorySignal -- factory function that models a memory as a single object
+SparseMemory -- class that models a large, sparsely used memory
 delay -- callable to model delay in a yield statement
 posedge -- callable to model a rising edge on a signal in a yield statement
 negedge -- callable to model a falling edge on a signal in a yield statement
@@ -44,8 +46,10 @@ always --
 always_comb -- decorator that returns an input-sensitive generator
 always_seq --
 ResetSignal --
+block -- decorator that marks a function as a level of hierarchy
 enum -- function that returns an enumeration type
 traceSignals -- function that enables signal tracing in a VCD file
+Waveform -- class that provides indexed queries on a VCD file
 toVerilog -- function that converts a design to Verilog
 
 """
@@ -90,6 +94,10 @@ class ToVerilogError(Error):
     pass
 class TraceSignalsError(Error):
     pass
+class WaveformError(Error):
+    pass
+class SparseMemoryError(Error):
+    pass
 class ConversionError(Error):
     pass
 class ToVerilogError(ConversionError):
@@ -119,21 +127,29 @@ from _join import join
 from _Signal import posedge, negedge, Signal, SignalType
 from _ShadowSignal import ConcatSignal
 from _ShadowSignal import TristateSignal
+from _MemorySignal import MemorySignal
 from _simulator import now
 from _delay import delay
-from _Cosimulation import Cosimulation
 from _Simulation import Simulation
 from _misc import instances, downrange
 from _always_comb import always_comb
 from _always_seq import always_seq, ResetSignal
 from _always import always
+from _SparseMemory import SparseMemory
 from _instance import instance
+from _block import block
 from _enum import enum, EnumType, EnumItemType
-from _traceSignals import traceSignals
-
-from myhdl import conversion
-from conversion import toVerilog
-from conversion import toVHDL
+from _tlog import tlog
+from _sourcecache import sourceCache
+
+# conversion, tracing and cosimulation are imported on first use
+from _lazy import _LazyObject
+Cosimulation = _LazyObject("myhdl._Cosimulation", "Cosimulation")
+traceSignals = _LazyObject("myhdl._traceSignals", "traceSignals")
+Waveform = _LazyObject("myhdl._waveform", "Waveform")
+conversion = _LazyObject("myhdl.conversion")
+toVerilog = _LazyObject("myhdl.conversion", "toVerilog")
+toVHDL = _LazyObject("myhdl.conversion", "toVHDL")
 
 from _tristate import Tristate
 
@@ -149,6 +165,8 @@ __all__ = ["bin",
            "SignalType",
            "ConcatSignal",
            "TristateSignal",
+           "MemorySignal",
+           "SparseMemory",
            "now",
            "delay",
            "downrange",
@@ -161,10 +179,14 @@ __all__ = ["bin",
            "always_seq",
            "ResetSignal",
            "always",
+           "block",
            "enum",
            "EnumType",
            "EnumItemType",
+           "tlog",
+           "sourceCache",
            "traceSignals",
+           "Waveform",
            "toVerilog",
            "toVHDL",
            "conversion",
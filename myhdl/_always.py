@@ -29,6 +29,7 @@ from myhdl._Signal import _Signal, _WaiterList, posedge, negedge
 from myhdl._Waiter import _Waiter, _SignalWaiter, _SignalTupleWaiter, \
                           _DelayWaiter, _EdgeWaiter, _EdgeTupleWaiter
 from myhdl._instance import _Instantiator
+from myhdl._block import _contexts, _registerFrame
 
 class _error:
     pass
@@ -39,6 +40,8 @@ _error.DecNrOfArgs = "decorator should have arguments"
 
 
 def always(*args):
+    if _contexts:
+        _registerFrame()
     for arg in args:
         if isinstance(arg, _Signal):
             arg._read = True
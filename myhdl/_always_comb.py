@@ -27,10 +27,14 @@ import ast
 
 from myhdl import AlwaysCombError
 from myhdl._Signal import _Signal, _isListOfSigs
-from myhdl._util import _isGenFunc, _dedent
+from myhdl._MemorySignal import _MemorySignal
+from myhdl._util import _isGenFunc
+from myhdl._sourcecache import sourceCache
 from myhdl._cell_deref import _cell_deref
-from myhdl._Waiter import _Waiter, _SignalWaiter, _SignalTupleWaiter
+from myhdl._Waiter import _Waiter, _SignalWaiter, _SignalTupleWaiter, \
+     _CombWaiter
 from myhdl._instance import _Instantiator
+from myhdl._block import _contexts, _registerFrame
 
 class _error:
     pass
@@ -48,6 +52,8 @@ def always_comb(func):
         raise AlwaysCombError(_error.ArgType)
     if func.func_code.co_argcount > 0:
         raise AlwaysCombError(_error.NrOfArgs)
+    if _contexts:
+        _registerFrame()
     varnames = func.func_code.co_varnames
     symdict = {}
     for n, v in func.func_globals.items():
@@ -106,7 +112,7 @@ class _SigNameVisitor(ast.NodeVisitor):
         if id not in self.symdict:
             return
         s = self.symdict[id]
-        if isinstance(s, _Signal) or _isListOfSigs(s):
+        if isinstance(s, (_Signal, _MemorySignal)) or _isListOfSigs(s):
             if self.context == INPUT:
                 self.inputs.add(id)
             elif self.context == OUTPUT:
@@ -182,9 +188,7 @@ class _AlwaysComb(_Instantiator):
     def __init__(self, func, symdict):
         self.func = func
         self.symdict = symdict
-        s = inspect.getsource(func)
-        s = _dedent(s)
-        tree = ast.parse(s)
+        tree = sourceCache._getTree(func)
         # print ast.dump(tree)
         v = _SigNameVisitor(symdict)
         v.visit(tree)
@@ -193,7 +197,7 @@ class _AlwaysComb(_Instantiator):
         senslist = []
         for n in self.inputs:
             s = self.symdict[n]
-            if isinstance(s, _Signal):
+            if isinstance(s, (_Signal, _MemorySignal)):
                 senslist.append(s)
             else: # list of sigs
                 senslist.extend(s)
@@ -202,10 +206,11 @@ class _AlwaysComb(_Instantiator):
         if len(self.senslist) == 0:
             raise AlwaysCombError(_error.EmptySensitivityList)
         if len(self.senslist) == 1:
-            W = _SignalWaiter
+            self.waiter = _SignalWaiter(self.gen)
+        elif min([hasattr(s, '_views') for s in self.senslist]):
+            self.waiter = _CombWaiter(self.gen, self.senslist)
         else:
-            W = _SignalTupleWaiter
-        self.waiter = W(self.gen)
+            self.waiter = _SignalTupleWaiter(self.gen)
 
 
 
@@ -21,17 +21,18 @@
 
 
 import sys
-import inspect
 from types import FunctionType
 import ast
 
 from myhdl import AlwaysError, intbv
-from myhdl._util import _isGenFunc, _dedent
+from myhdl._util import _isGenFunc
+from myhdl._sourcecache import sourceCache
 from myhdl._cell_deref import _cell_deref
 from myhdl._delay import delay
 from myhdl._Signal import _Signal, _WaiterList,_isListOfSigs
 from myhdl._Waiter import _Waiter, _EdgeWaiter, _EdgeTupleWaiter
 from myhdl._instance import _Instantiator
+from myhdl._block import _contexts, _registerFrame
 
 # evacuate this later
 AlwaysSeqError = AlwaysError
@@ -59,6 +60,8 @@ class ResetSignal(_Signal):
 
 
 def always_seq(edge, reset):
+    if _contexts:
+        _registerFrame()
     if not isinstance(edge, _WaiterList):
         raise AlwaysSeqError(_error.EdgeType)
     edge.sig._read = True
@@ -121,9 +124,7 @@ class _AlwaysSeq(_Instantiator):
         self.symdict = symdict
 
         # now infer outputs to be reset
-        s = inspect.getsource(func)
-        s = _dedent(s)
-        tree = ast.parse(s)
+        tree = sourceCache._getTree(func)
         # print ast.dump(tree)
         v = _SigNameVisitor(symdict)
         v.visit(tree)
@@ -0,0 +1,110 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the block decorator.
+
+A block function is a function that describes a level of hierarchy.
+When the top level function of a design is a block function, the
+hierarchy is extracted by the block functions themselves, instead of
+by a profile hook that intercepts every function call.
+
+"""
+
+
+import sys
+from types import FunctionType
+from functools import update_wrapper
+
+from myhdl import ExtractHierarchyError
+
+class _error:
+    pass
+_error.ArgType = "decorated object should be a classic function"
+
+
+# the hierarchy extractor of the ongoing elaboration, if it uses blocks
+_extractor = None
+# contexts of the block functions being called, innermost last
+_contexts = []
+
+
+class _Context(object):
+
+    __slots__ = ('code', 'frame')
+
+    def __init__(self, code):
+        self.code = code
+        self.frame = None
+
+
+def _registerFrame():
+    """ Record the frame of the innermost block function being called.
+
+    This is done by objects that are created in the block function, such
+    as instantiators and sub-blocks, while the frame is still alive.
+    The frame gives access to the local names of the block function once
+    it has returned.
+
+    """
+    ctx = _contexts[-1]
+    if ctx.frame is None:
+        code = ctx.code
+        f = sys._getframe(1)
+        while f is not None and f.f_code is not code:
+            f = f.f_back
+        ctx.frame = f
+
+
+def _makeWrapper(func):
+    def _block(*args, **kwargs):
+        extractor = _extractor
+        if extractor is None:
+            return func(*args, **kwargs)
+        if _contexts:
+            _registerFrame()
+        ctx = _Context(func.func_code)
+        _contexts.append(ctx)
+        try:
+            arg = func(*args, **kwargs)
+        finally:
+            del _contexts[-1]
+        extractor._blockReturn(_block, func, ctx.frame, arg, len(_contexts) + 1)
+        return arg
+    return _block
+
+# all block wrappers share this code object
+_wrapperCode = _makeWrapper(None).func_code
+
+
+def block(func):
+    if not isinstance(func, FunctionType):
+        raise ExtractHierarchyError(_error.ArgType)
+    wrapper = _makeWrapper(func)
+    update_wrapper(wrapper, func)
+    wrapper._blockFunc = func
+    return wrapper
+
+
+def _isBlock(obj):
+    return hasattr(obj, '_blockFunc')
+
+
+def _unwrap(func):
+    """ Return the function that a block wrapper decorates. """
+    return getattr(func, '_blockFunc', func)
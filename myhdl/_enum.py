@@ -73,6 +73,7 @@ def enum(*names, **kwargs):
             self._index = index
             self._name = name
             self._val = val
+            self._code = int(val, 2)
             self._nrbits = type._nrbits
             self._nritems = type._nritems
             self._type = type
@@ -83,7 +84,7 @@ def enum(*names, **kwargs):
         __str__ = __repr__
 
         def __hex__(self):
-            return hex(int(self._val, 2))
+            return hex(self._code)
 
         __str__ = __repr__
 
@@ -110,19 +111,30 @@ def enum(*names, **kwargs):
         
         __le__ = __ge__ = __lt__ = __gt__ = _notImplementedCompare
 
+        # items of the same enum are compared by identity; other
+        # operands, including signals other than plain ones, take the
+        # checked path
+
         def __eq__(self, other):
-            if isinstance(other, _Signal):
+            if other.__class__ is _Signal:
                 other = other._val
-            if not isinstance(other, EnumItemType) or type(self) is not type(other):
-                raise TypeError("Type mismatch in enum item comparison")
-            return self is other
+            if other.__class__ is EnumItem:
+                return self is other
+            return self is self._checkedOther(other)
 
         def __ne__(self, other):
+            if other.__class__ is _Signal:
+                other = other._val
+            if other.__class__ is EnumItem:
+                return self is not other
+            return self is not self._checkedOther(other)
+
+        def _checkedOther(self, other):
             if isinstance(other, _Signal):
                 other = other._val
             if not isinstance(other, EnumItemType) or type(self) is not type(other):
                 raise TypeError("Type mismatch in enum item comparison")
-            return self is not other
+            return other
 
 
     class Enum(EnumType):
@@ -32,8 +32,12 @@ import linecache
 
 from myhdl import ExtractHierarchyError, ToVerilogError, ToVHDLError
 from myhdl._Signal import _Signal, _isListOfSigs
+from myhdl._MemorySignal import _MemorySignal
 from myhdl._util import _isGenFunc
 from myhdl._misc import _isGenSeq
+from myhdl import _block
+from myhdl._block import _isBlock, _unwrap, _wrapperCode
+from myhdl._lazy import _proxyCallCode
 
 
 _profileFunc = None
@@ -62,6 +66,8 @@ _memInfoMap = {}
 class _MemInfo(object):
     __slots__ = ['mem', 'name', 'elObj', 'depth', '_used', '_driven', '_read']
     def __init__(self, mem):
+        if isinstance(mem, _MemorySignal):
+            mem = mem._elementSignals()
         self.mem = mem
         self.name = None
         self.depth = len(mem)
@@ -172,8 +178,12 @@ def _addUserCode(specs, arg, funcname, func, frame):
                 'vhdl_instance' :_UserVhdlInstance,
                
                }
-    namespace = frame.f_globals.copy()
-    namespace.update(frame.f_locals)
+    if frame is None:
+        namespace = func.func_globals.copy()
+        frame = func
+    else:
+        namespace = frame.f_globals.copy()
+        namespace.update(frame.f_locals)
     sourcefile = inspect.getsourcefile(frame)
     sourceline = inspect.getsourcelines(frame)[1]
     for hdl in _userCodeMap:
@@ -228,10 +238,19 @@ class _HierExtr(object):
         self.absnames = absnames = {}
         self.level = 0
 
-        _profileFunc = self.extractor
-        sys.setprofile(_profileFunc)
-        _top = dut(*args, **kwargs)
-        sys.setprofile(None)
+        if _isBlock(dut):
+            # block functions register themselves: no profile hook needed
+            _block._extractor = self
+            try:
+                _top = dut(*args, **kwargs)
+            finally:
+                _block._extractor = None
+                del _block._contexts[:]
+        else:
+            _profileFunc = self.extractor
+            sys.setprofile(_profileFunc)
+            _top = dut(*args, **kwargs)
+            sys.setprofile(None)
         if not hierarchy:
             raise ExtractHierarchyError(_error.NoInstances)
 
@@ -264,6 +283,10 @@ class _HierExtr(object):
 
                 
     def extractor(self, frame, event, arg):
+        code = frame.f_code
+        if code is _wrapperCode or code is _proxyCallCode:
+            # block wrappers and lazy object proxies are transparent
+            return
         if event == "call":
             
             funcname = frame.f_code.co_name
@@ -285,64 +308,80 @@ class _HierExtr(object):
                     func = getattr(obj, funcname)                
             
             if not self.skip:
-                isGenSeq = _isGenSeq(arg)
-                if isGenSeq:
-                    specs = {}
-                    for hdl in _userCodeMap:
-                        spec = "__%s__" % hdl
-                        if spec in frame.f_locals and frame.f_locals[spec]:
-                            specs[spec] = frame.f_locals[spec]
-                        spec = "%s_code" % hdl
-                        if func and hasattr(func, spec) and getattr(func, spec):
-                            specs[spec] = getattr(func, spec)
-                        spec = "%s_instance" % hdl
-                        if func and hasattr(func, spec) and getattr(func, spec):
-                            specs[spec] = getattr(func, spec)
-                    if specs: 
-                        _addUserCode(specs, arg, funcname, func, frame)
-                # building hierarchy only makes sense if there are generators
-                if isGenSeq and arg:
-                    sigdict = {}
-                    memdict = {}
-                    argdict = {} 
-                    if func:
-                        arglist = inspect.getargspec(func).args 
-                    else:
-                        arglist = []
-                    cellvars = frame.f_code.co_cellvars
-                    for dict in (frame.f_globals, frame.f_locals):
-                        for n, v in dict.items():
-                            # extract signals and memories
-                            # also keep track of whether they are used in generators
-                            # only include objects that are used in generators
-##                             if not n in cellvars:
-##                                 continue
-                            if isinstance(v, _Signal):
-                                sigdict[n] = v
-                                if n in cellvars:
-                                    v._markUsed()
-                            if _isListOfSigs(v):
-                                m = _makeMemInfo(v)
-                                memdict[n] = m
-                                if n in cellvars:
-                                    m._used = True
-                            # save any other variable in argdict
-                            if (n in arglist) and (n not in sigdict) and (n not in memdict):
-                                argdict[n] = v
-                                
-                    subs = []
-                    for n, sub in frame.f_locals.items():
-                        for elt in _inferArgs(arg):
-                            if elt is sub:
-                                subs.append((n, sub))
-                                
-                    inst = _Instance(self.level, arg, subs, sigdict, memdict, func, argdict)
-                    self.hierarchy.append(inst)
-                    
+                self._addInstance(self.level, arg, funcname, func, frame)
                 self.level -= 1
                 
             if funcname in self.skipNames:
                 self.skip -= 1
+
+    def _blockReturn(self, wrapper, func, frame, arg, level):
+        """ Add the instance returned by a block function. """
+        self._addInstance(level, arg, func.func_name, wrapper, frame)
+
+    def _addInstance(self, level, arg, funcname, func, frame):
+        isGenSeq = _isGenSeq(arg)
+        if not isGenSeq:
+            return
+        if frame is None:
+            # block function that didn't create instantiators or blocks
+            f_globals = _unwrap(func).func_globals
+            f_locals = {}
+            cellvars = ()
+        else:
+            f_globals = frame.f_globals
+            f_locals = frame.f_locals
+            cellvars = frame.f_code.co_cellvars
+        specs = {}
+        for hdl in _userCodeMap:
+            spec = "__%s__" % hdl
+            if spec in f_locals and f_locals[spec]:
+                specs[spec] = f_locals[spec]
+            spec = "%s_code" % hdl
+            if func and hasattr(func, spec) and getattr(func, spec):
+                specs[spec] = getattr(func, spec)
+            spec = "%s_instance" % hdl
+            if func and hasattr(func, spec) and getattr(func, spec):
+                specs[spec] = getattr(func, spec)
+        func = _unwrap(func)
+        if specs: 
+            _addUserCode(specs, arg, funcname, func, frame)
+        # building hierarchy only makes sense if there are generators
+        if arg:
+            sigdict = {}
+            memdict = {}
+            argdict = {} 
+            if func:
+                arglist = inspect.getargspec(func).args 
+            else:
+                arglist = []
+            for dict in (f_globals, f_locals):
+                for n, v in dict.items():
+                    # extract signals and memories
+                    # also keep track of whether they are used in generators
+                    # only include objects that are used in generators
+##                     if not n in cellvars:
+##                         continue
+                    if isinstance(v, _Signal):
+                        sigdict[n] = v
+                        if n in cellvars:
+                            v._markUsed()
+                    if _isListOfSigs(v) or isinstance(v, _MemorySignal):
+                        m = _makeMemInfo(v)
+                        memdict[n] = m
+                        if n in cellvars:
+                            m._used = True
+                    # save any other variable in argdict
+                    if (n in arglist) and (n not in sigdict) and (n not in memdict):
+                        argdict[n] = v
+                        
+            subs = []
+            for n, sub in f_locals.items():
+                for elt in _inferArgs(arg):
+                    if elt is sub:
+                        subs.append((n, sub))
+                        
+            inst = _Instance(level, arg, subs, sigdict, memdict, func, argdict)
+            self.hierarchy.append(inst)
                 
 
 def _inferArgs(arg):
@@ -25,6 +25,7 @@ from types import FunctionType
 from myhdl import InstanceError
 from myhdl._util import _isGenFunc
 from myhdl._Waiter import _inferWaiter
+from myhdl._block import _contexts, _registerFrame
 
 class _error:
     pass
@@ -39,6 +40,8 @@ def instance(genFunc):
         raise InstanceError(_error.ArgType)
     if genFunc.func_code.co_argcount > 0:
         raise InstanceError(_error.NrOfArgs)
+    if _contexts:
+        _registerFrame()
     return _Instantiator(genFunc)
 
 class _Instantiator(object):
@@ -0,0 +1,87 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with support for lazily imported myhdl objects.
+
+Conversion, tracing and cosimulation are not needed by pure simulation
+runs. The corresponding public objects are proxies that import their
+module on first use.
+
+"""
+
+
+import sys
+
+
+class _LazyObject(object):
+
+    """ Proxy for a module, or an object in a module, imported on first use.
+
+    Calls, attribute access and isinstance checks are forwarded to the
+    object. Once loaded, the object replaces the proxy in the myhdl
+    package namespace.
+
+    """
+
+    __slots__ = ('_modname', '_name', '_obj')
+
+    def __init__(self, modname, name=None):
+        object.__setattr__(self, '_modname', modname)
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_obj', None)
+
+    def _load(self):
+        obj = self._obj
+        if obj is None:
+            __import__(self._modname)
+            obj = sys.modules[self._modname]
+            if self._name is not None:
+                obj = getattr(obj, self._name)
+                pkg = sys.modules['myhdl']
+                if getattr(pkg, self._name, None) is self:
+                    setattr(pkg, self._name, obj)
+            object.__setattr__(self, '_obj', obj)
+        return obj
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, val):
+        setattr(self._load(), attr, val)
+
+    def __instancecheck__(self, obj):
+        # no instances can exist as long as the module is not imported
+        if self._obj is None and self._modname not in sys.modules:
+            return False
+        return isinstance(obj, self._load())
+
+    def __subclasscheck__(self, cls):
+        if self._obj is None and self._modname not in sys.modules:
+            return False
+        return issubclass(cls, self._load())
+
+    def __repr__(self):
+        return repr(self._load())
+
+
+# the hierarchy extractor skips the frames of proxy calls
+_proxyCallCode = _LazyObject.__call__.im_func.func_code
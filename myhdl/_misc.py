@@ -32,11 +32,12 @@ import inspect
 from types import GeneratorType
 from types import GeneratorType, ListType, TupleType
 
-from myhdl._Cosimulation import Cosimulation
+from myhdl._util import _isCosimulation
 from myhdl._instance import _Instantiator
+from myhdl._block import _contexts, _registerFrame
       
 def _isGenSeq(obj):
-    if isinstance(obj, (Cosimulation, _Instantiator)):
+    if isinstance(obj, _Instantiator) or _isCosimulation(obj):
         return True
     if not isinstance(obj, (ListType, TupleType, set)):
         return False
@@ -49,6 +50,8 @@ def _isGenSeq(obj):
 
     
 def instances():
+    if _contexts:
+        _registerFrame()
     f = inspect.currentframe()
     d = inspect.getouterframes(f)[1][0].f_locals
     l = []
@@ -32,6 +32,9 @@ _time = 0
 _cosim = 0
 _tracing = 0
 _tf = None
+_tracewaiter = None
+_epoch = 1
+_delta = 0
 
 def now():
     """ Return the current simulation time """
@@ -0,0 +1,139 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the per-process cache of source code and syntax trees.
+
+Elaboration and conversion inspect the source of generator functions
+and frames. Getting the source is much more expensive than parsing it,
+so the cache keeps the dedented source and its location by code
+object. An entry is valid as long as the modification time of its
+source file is unchanged.
+
+"""
+
+import os
+import ast
+import linecache
+import inspect
+from types import FunctionType, MethodType, FrameType, CodeType
+
+from myhdl._util import _dedent
+
+
+class _Entry(object):
+
+    __slots__ = ('mtime', 'source', 'sourcefile', 'lineoffset', 'tree')
+
+    def __init__(self, mtime, source, sourcefile, lineoffset):
+        self.mtime = mtime
+        self.source = source
+        self.sourcefile = sourcefile
+        self.lineoffset = lineoffset
+        self.tree = None
+
+
+def _getCode(obj):
+    if isinstance(obj, MethodType):
+        obj = obj.im_func
+    if isinstance(obj, FunctionType):
+        return obj.func_code
+    if isinstance(obj, FrameType):
+        return obj.f_code
+    assert isinstance(obj, CodeType)
+    return obj
+
+def _getMtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except (OSError, TypeError):
+        return None
+
+
+class _SourceCache(object):
+
+    """ Cache of source code and syntax trees, by code object.
+
+    The shared syntax tree of an entry is for read-only use, such as
+    sensitivity and waiter inference. Conversion annotates and
+    transforms its trees, and parses a new tree from the cached source.
+
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.clearStats()
+
+    def clear(self):
+        """ Remove all entries and reset the statistics. """
+        self._entries.clear()
+        self.clearStats()
+
+    def clearStats(self):
+        """ Reset the statistics. """
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """ Return a dictionary with the cache statistics.
+
+        hits -- number of lookups served from the cache
+        misses -- number of lookups that got the source from its file
+        entries -- number of cached code objects
+
+        """
+        return dict(hits=self.hits, misses=self.misses,
+                    entries=len(self._entries))
+
+    def _entry(self, obj):
+        code = _getCode(obj)
+        entry = self._entries.get(code)
+        if entry is not None and entry.mtime == _getMtime(entry.sourcefile):
+            self.hits += 1
+            return entry
+        self.misses += 1
+        sourcefile = inspect.getsourcefile(obj)
+        mtime = _getMtime(sourcefile)
+        # inspect gets the lines from linecache, that may be outdated
+        linecache.checkcache(sourcefile)
+        lines, lineno = inspect.getsourcelines(obj)
+        source = _dedent("".join(lines))
+        entry = _Entry(mtime, source, sourcefile, lineno - 1)
+        self._entries[code] = entry
+        return entry
+
+    def _getSource(self, obj):
+        """ Return the dedented source of a function, frame or code object. """
+        return self._entry(obj).source
+
+    def _getTree(self, obj):
+        """ Return the shared syntax tree, not to be modified. """
+        entry = self._entry(obj)
+        if entry.tree is None:
+            entry.tree = ast.parse(entry.source)
+        return entry.tree
+
+    def _parse(self, obj):
+        """ Return a new syntax tree, with sourcefile and lineoffset. """
+        entry = self._entry(obj)
+        tree = ast.parse(entry.source)
+        tree.sourcefile = entry.sourcefile
+        tree.lineoffset = entry.lineoffset
+        return tree
+
+sourceCache = _SourceCache()
@@ -0,0 +1,62 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module that provides the tlog function, for transaction logging.
+
+A transaction is recorded as a tuple with the simulation time and the
+integer values of the arguments. During simulation, records are
+written with marshal to the log file, if there is one. In converted
+code, a record is a line on the simulator output, that starts with
+the tlog marker and has the same integers in decimal format.
+
+"""
+
+import marshal
+
+from myhdl import _simulator
+
+
+_marker = "@tlog"
+
+_file = None
+
+def tlog(*args):
+    """ Record a transaction with the integer values of the arguments.
+
+    The arguments should be bool, int or intbv objects, or signals
+    with such a value. Without a log file, nothing is recorded.
+
+    """
+    if _file is not None:
+        # __int__ directly, as int() is much slower on signals
+        marshal.dump((_simulator._time,) +
+                     tuple([a.__int__() for a in args]), _file)
+
+def _setFile(f):
+    """ Set the file to write the records to, or None. """
+    global _file
+    _file = f
+
+def _records(f):
+    """ Generate the records in a log file. """
+    while True:
+        try:
+            yield marshal.load(f)
+        except EOFError:
+            return
@@ -29,10 +29,17 @@ import time
 import os
 path = os.path
 import shutil
+from fnmatch import fnmatchcase
+import gzip
+import threading
+import atexit
 
 from myhdl import _simulator, __version__, EnumItemType
 from myhdl._extractHierarchy import _HierExtr
 from myhdl import TraceSignalsError
+from myhdl._Signal import _Signal
+from myhdl._Waiter import _Waiter
+from myhdl._delay import delay
 
 _tracing = 0
 _profileFunc = None
@@ -42,19 +49,34 @@ class _error:
 _error.TopLevelName = "result of traceSignals call should be assigned to a top level name"
 _error.ArgType = "traceSignals first argument should be a classic function"
 _error.MultipleTraces = "Cannot trace multiple instances simultaneously"
+_error.WindowAndTrigger = "Cannot use both a time window and a trigger signal"
+_error.Window = "stop time should be larger than start time"
+_error.Trigger = "trigger should be a Signal or a hierarchical signal name"
 
 
 class _TraceSignalsClass(object):
 
     __slot__ = ("name",
                 "timescale",
-                "tracelists"
+                "tracelists",
+                "filter",
+                "depth",
+                "start",
+                "stop",
+                "trigger",
+                "compress"
                 )
 
     def __init__(self):
         self.name = None
         self.timescale = "1ns"
         self.tracelists = True
+        self.filter = None
+        self.depth = None
+        self.start = None
+        self.stop = None
+        self.trigger = None
+        self.compress = False
 
     def __call__(self, dut, *args, **kwargs):
         global _tracing
@@ -63,13 +85,23 @@ class _TraceSignalsClass(object):
         else:
             # clean start
             sys.setprofile(None)
-        from myhdl.conversion import _toVerilog
-        if _toVerilog._converting:
+        # don't import the converter just to check this
+        _toVerilog = sys.modules.get('myhdl.conversion._toVerilog')
+        if _toVerilog is not None and _toVerilog._converting:
             raise TraceSignalsError("Cannot use traceSignals while converting to Verilog")
         if not callable(dut):
             raise TraceSignalsError(_error.ArgType, "got %s" % type(dut))
         if _simulator._tracing:
             raise TraceSignalsError(_error.MultipleTraces)
+        windowed = self.start is not None or self.stop is not None
+        if windowed and self.trigger is not None:
+            raise TraceSignalsError(_error.WindowAndTrigger)
+        if self.start is not None and self.stop is not None and \
+           self.stop <= self.start:
+            raise TraceSignalsError(_error.Window)
+        if self.trigger is not None and \
+           not isinstance(self.trigger, (_Signal, str)):
+            raise TraceSignalsError(_error.Trigger, "got %s" % type(self.trigger))
 
         _tracing = 1
         try:
@@ -81,15 +113,34 @@ class _TraceSignalsClass(object):
                 raise TraceSignalsError(_error.TopLevelName)
             h = _HierExtr(name, dut, *args, **kwargs)
             vcdpath = name + ".vcd"
+            if self.compress:
+                vcdpath += ".gz"
             if path.exists(vcdpath):
                 backup = vcdpath + '.' + str(path.getmtime(vcdpath))
                 shutil.copyfile(vcdpath, backup)
                 os.remove(vcdpath)
-            vcdfile = open(vcdpath, 'w')
+            if self.compress:
+                vcdfile = _CompressedTraceFile(vcdpath)
+            else:
+                vcdfile = open(vcdpath, 'w')
             _simulator._tracing = 1
             _simulator._tf = vcdfile
+            _simulator._tracewaiter = None
             _writeVcdHeader(vcdfile, self.timescale)
-            _writeVcdSigs(vcdfile, h.hierarchy, self.tracelists)
+            trigger = self.trigger
+            if isinstance(trigger, str):
+                trigger = _findSig(h.hierarchy, trigger)
+            dumpon = True
+            if self.start or trigger is not None:
+                dumpon = bool(trigger)
+            siglist = _writeVcdSigs(vcdfile, h.hierarchy, self.tracelists,
+                                    self.filter, self.depth, dumpon)
+            if trigger is not None:
+                gen = _triggerControl(trigger, siglist)
+                _simulator._tracewaiter = _Waiter(gen)
+            elif windowed:
+                gen = _windowControl(self.start, self.stop, siglist)
+                _simulator._tracewaiter = _Waiter(gen)
         finally:
             _tracing = 0
 
@@ -98,6 +149,68 @@ class _TraceSignalsClass(object):
 traceSignals = _TraceSignalsClass()
 
 
+class _CompressedTraceFile(object):
+
+    """ Trace file that gzip compresses its output in a background thread.
+
+    The trace output is written to a pipe. A worker thread reads the pipe
+    and writes the data through zlib to the actual file. As zlib releases
+    the global interpreter lock, compression runs in parallel with the
+    simulation. The write method is the one of the buffered pipe file
+    object itself, so that tracing doesn't pay for a Python level call.
+
+    A simulation that is run for a duration is not finalized, so files
+    that are still open are closed at exit. The worker is a daemon
+    thread: the interpreter waits for other threads before it runs the
+    exit hooks, and the worker only ends when the pipe is closed.
+
+    """
+
+    bufsize = 1 << 16
+    compresslevel = 1
+
+    def __init__(self, name):
+        self.name = name
+        self._gz = gzip.GzipFile(name, 'wb', self.compresslevel)
+        r, w = os.pipe()
+        self._pipe = os.fdopen(w, 'w', self.bufsize)
+        self.write = self._pipe.write
+        self.flush = self._pipe.flush
+        self._thread = threading.Thread(target=self._compress, args=(r,))
+        self._thread.daemon = True
+        self._thread.start()
+        _openTraceFiles.append(self)
+
+    def _compress(self, r):
+        read, write = os.read, self._gz.write
+        try:
+            while 1:
+                data = read(r, self.bufsize)
+                if not data:
+                    break
+                write(data)
+        finally:
+            self._gz.close()
+            os.close(r)
+
+    def close(self):
+        if not self._pipe.closed:
+            self._pipe.close()
+            self._thread.join()
+        if self in _openTraceFiles:
+            _openTraceFiles.remove(self)
+
+
+# compressed trace files that are not closed yet
+_openTraceFiles = []
+
+def _closeTraceFiles():
+    for f in _openTraceFiles[:]:
+        f.close()
+
+atexit.register(_closeTraceFiles)
+
+
 _codechars = ""
 for i in range(33, 127):
     _codechars += chr(i)
@@ -129,12 +242,35 @@ def _writeVcdHeader(f, timescale):
     print >> f, "$end"
     print >> f
 
-def _writeVcdSigs(f, hierarchy, tracelists):
+def _selected(name, filter):
+    if filter is None:
+        return True
+    if isinstance(filter, str):
+        filter = (filter,)
+    for pattern in filter:
+        if fnmatchcase(name, pattern):
+            return True
+    return False
+
+def _findSig(hierarchy, name):
+    scopes = []
+    for inst in hierarchy:
+        del scopes[inst.level-1:]
+        scopes.append(inst.name)
+        prefix = ".".join(scopes) + "."
+        if name.startswith(prefix) and name[len(prefix):] in inst.sigdict:
+            return inst.sigdict[name[len(prefix):]]
+    raise TraceSignalsError(_error.Trigger, "signal %s not found" % name)
+
+def _writeVcdSigs(f, hierarchy, tracelists, filter=None, depth=None, dumpon=True):
     curlevel = 0
     namegen = _genNameCode()
     siglist = []
+    scopes = []
     for inst in hierarchy:
         level = inst.level
+        if depth is not None and level > depth:
+            continue
         name = inst.name
         sigdict = inst.sigdict
         memdict = inst.memdict
@@ -145,7 +281,12 @@ def _writeVcdSigs(f, hierarchy, tracelists):
             for i in range(delta + 1):
                 print >> f, "$upscope $end"
         print >> f, "$scope module %s $end" % name
+        del scopes[level-1:]
+        scopes.append(name)
+        prefix = ".".join(scopes) + "."
         for n, s in sigdict.items():
+            if not _selected(prefix + n, filter):
+                continue
             if s._val is None:
                 raise ValueError("%s of module %s has no initial value" % (n, name))
             if not s._tracing:
@@ -168,6 +309,9 @@ def _writeVcdSigs(f, hierarchy, tracelists):
             for n in memdict.keys():
                 memindex = 0
                 for s in memdict[n].mem:
+                    if not _selected("%s%s(%i)" % (prefix, n, memindex), filter):
+                        memindex += 1
+                        continue
                     if s._val == None:
                         raise ValueError("%s of module %s has no initial value" % (n, name))
                     if not s._tracing:
@@ -187,20 +331,57 @@ def _writeVcdSigs(f, hierarchy, tracelists):
         print >> f, "$upscope $end"
     print >> f
     print >> f, "$enddefinitions $end"
-    print >> f, "$dumpvars"
+    if dumpon:
+        print >> f, "$dumpvars"
+        for s in siglist:
+            s._printVcd() # initial value
+        print >> f, "$end"
+    else:
+        # signals outside the dump window don't pay the tracing cost
+        for s in siglist:
+            s._tracing = 0
+    return siglist
+
+
+def _dumpOn(siglist):
+    f = _simulator._tf
+    print >> f, "$dumpon"
     for s in siglist:
-        s._printVcd() # initial value
+        s._tracing = 1
+        s._printVcd()
     print >> f, "$end"
-            
-            
-        
-        
 
+def _dumpOff(siglist):
+    f = _simulator._tf
+    print >> f, "$dumpoff"
+    for s in siglist:
+        s._tracing = 0
+        w = s._nrbits
+        if w and not isinstance(s._val, EnumItemType):
+            if w == 1:
+                print >> f, "x%s" % s._code
+            else:
+                print >> f, "bx %s" % s._code
+    print >> f, "$end"
 
-    
-    
+def _windowControl(start, stop, siglist):
+    if start:
+        yield delay(start)
+        _dumpOn(siglist)
+    else:
+        start = 0
+    if stop is not None:
+        yield delay(stop - start)
+        _dumpOff(siglist)
 
-            
-        
-    
-    
+def _triggerControl(trigger, siglist):
+    on = bool(trigger)
+    while 1:
+        yield trigger
+        if bool(trigger) == on:
+            continue
+        on = not on
+        if on:
+            _dumpOn(siglist)
+        else:
+            _dumpOff(siglist)
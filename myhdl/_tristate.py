@@ -1,13 +1,10 @@
 import warnings
+from copy import deepcopy
 
 from myhdl._Signal import _Signal, _DelayedSignal
+from myhdl._ShadowSignal import BusContentionWarning
 from myhdl._simulator import _siglist
 
-class BusContentionWarning(UserWarning):
-    pass
-
-warnings.filterwarnings('always', r".*", BusContentionWarning)
-
 def Tristate(val, delay=None):
     """ Return a new Tristate(default or delay 0) or DelayedTristate """
     if delay is not None:
@@ -16,61 +13,89 @@ def Tristate(val, delay=None):
         return _DelayedTristate(val, delay)
     else:
         return _Tristate(val)
- 
-    
+
+
 class _Tristate(_Signal):
-            
+
     def __init__(self, val):
         self._drivers = []
-        super(Tristate, self).__init__(val)
-        self._val = None
+        # active drivers, by id
+        self._actives = {}
+        self._contentions = 0
+        self.onContention = None
+        super(_Tristate, self).__init__(val)
+        self._orival = deepcopy(val) # keep for drivers
+        self._next = self._val = self._init = None
 
     def driver(self):
         d = _TristateDriver(self)
         self._drivers.append(d)
         return d
 
+    def _clear(self):
+        super(_Tristate, self)._clear()
+        self._actives.clear()
+
     def _resolve(self):
-        next = None
-        for d in self._drivers:
-            if next is None:
-                next = d._next
-            elif d._next is not None:
-                warnings.warn("Bus contention", category=BusContentionWarning)
-                next = None
-                break
-        self._next = next
+        actives = self._actives
+        if len(actives) == 1:
+            for d in actives.itervalues():
+                self._next = d._next
+        else:
+            self._next = None
+            if actives:
+                self._contentions += 1
+                if self.onContention is None:
+                    warnings.warn("Bus contention", category=BusContentionWarning)
+                else:
+                    self.onContention(self, actives.values())
+
+    # support for the 'contentions' attribute
+    def _get_contentions(self):
+        return self._contentions
+    contentions = property(_get_contentions, None, None,
+                           "number of resolutions with bus contention")
 
     def _update(self):
         self._resolve()
-        return super(Tristate, self)._update()
+        return super(_Tristate, self)._update()
 
 
 class _TristateDriver(_Signal):
-    
+
     def __init__(self, bus):
-        _Signal.__init__(self, bus._val)
-        self._val = None
+        _Signal.__init__(self, bus._orival)
+        self._next = self._val = None
         self._bus = bus
 
     def _set_next(self, val):
          if isinstance(val, _Signal):
             val = val._val
+         actives = self._bus._actives
          if val is None:
              self._next = None
-         else:             
+             if id(self) in actives:
+                 del actives[id(self)]
+         else:
+             # start from the original value to cater for the intbv handler
+             self._next = deepcopy(self._bus._orival)
              self._setNextVal(val)
-         _siglist.append(self._bus)   
+             actives[id(self)] = self
+         _siglist.append(self._bus)
     next = property(_Signal._get_next, _set_next, None, "'next' access methods")
 
-    
+
 class _DelayedTristate(_DelayedSignal, _Tristate):
 
     def __init__(self, val, delay=1):
         self._drivers = []
+        self._actives = {}
+        self._contentions = 0
+        self.onContention = None
         super(_DelayedTristate, self).__init__(val, delay)
-        self._val = None
-        
+        self._orival = deepcopy(val) # keep for drivers
+        self._next = self._val = self._init = None
+
     def _update(self):
         self._resolve()
         return super(_DelayedTristate, self)._update()
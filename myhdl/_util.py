@@ -42,6 +42,11 @@ def _printExcInfo():
 
 _isGenFunc = inspect.isgeneratorfunction
 
+def _isCosimulation(obj):
+    """ Check for a Cosimulation object without importing its module. """
+    mod = sys.modules.get('myhdl._Cosimulation')
+    return mod is not None and isinstance(obj, mod.Cosimulation)
+
 def _flatten(*args):
     arglist = []
     for arg in args:
@@ -0,0 +1,499 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" myhdl waveform module.
+
+This module provides the following myhdl objects:
+Waveform -- indexed, read-only view on a VCD file
+
+The VCD file is scanned once. Value changes are stored per signal in
+a column oriented database file next to the VCD file: a column of
+change times, a column of value offsets and a heap with the raw value
+strings. During the scan, the value changes are flushed in chunks to a
+temporary file, so that the memory use doesn't grow with the VCD file.
+The database is memory-mapped, so that value-at-time and range
+queries are binary searches that don't load the columns in memory.
+A database that is newer than its VCD file is reused as such. VCD files
+with a .gz extension are decompressed on the fly.
+
+"""
+
+
+import os
+path = os.path
+import mmap
+import struct
+import json
+import gzip
+import tempfile
+from array import array
+
+from myhdl import WaveformError
+
+class _error:
+    pass
+_error.NoFile = "VCD file not found"
+_error.Format = "Unexpected VCD content"
+_error.UndefinedName = "No signal with this name in waveform"
+_error.AmbiguousName = "Name refers to multiple signals in waveform"
+_error.TooLarge = "Signal values exceed the database limit"
+
+_MAGIC = "MYHDLWDB\x02"
+# times are stored as doubles: they are exact for integer times up to 2**53
+_TIMECODE = 'd'
+# heap offsets are 32 bit unsigned ints, whatever the size of a C long
+_OFFSETCODE = 'I'
+_OFFSETSIZE = struct.calcsize("=" + _OFFSETCODE)
+if array(_OFFSETCODE).itemsize != _OFFSETSIZE:
+    raise ImportError("array type '%s' is not %s bytes" %
+                      (_OFFSETCODE, _OFFSETSIZE))
+_TRAILER = struct.Struct("<Q")
+# number of buffered value changes that triggers a flush during the scan
+_CHUNKSIZE = 1 << 18
+# block size to copy the flushed chunks into the database
+_COPYSIZE = 1 << 20
+
+
+class _Column(object):
+
+    """ Value changes of a single signal during the scan.
+
+    The changes are buffered, and flushed as chunks to a temporary file.
+    The heap offsets count from the start of the first chunk, so that
+    the chunks can be concatenated as such.
+
+    """
+
+    __slots__ = ('times', 'offsets', 'heap', 'n', 'hlen', 'chunks')
+
+    def __init__(self):
+        self.times = array(_TIMECODE)
+        self.offsets = array(_OFFSETCODE)
+        self.heap = bytearray()
+        self.n = 0
+        self.hlen = 0
+        self.chunks = []
+
+    def append(self, t, val):
+        self.times.append(t)
+        self.offsets.append(self.hlen + len(self.heap))
+        self.heap.extend(val)
+
+    def flush(self, f):
+        """ Write the buffered changes as a chunk to file f. """
+        if not self.times:
+            return
+        toff = f.tell()
+        self.times.tofile(f)
+        ooff = f.tell()
+        self.offsets.tofile(f)
+        hoff = f.tell()
+        f.write(self.heap)
+        self.chunks.append((len(self.times), toff, ooff, hoff, len(self.heap)))
+        self.n += len(self.times)
+        self.hlen += len(self.heap)
+        self.times = array(_TIMECODE)
+        self.offsets = array(_OFFSETCODE)
+        self.heap = bytearray()
+
+
+class _MappedColumn(object):
+
+    """ Memory-mapped value changes of a single signal. """
+
+    __slots__ = ('mm', 'n', 'toff', 'ooff', 'hoff', 'hlen',
+                 'tsize', 'osize', '_tfmt', '_ofmt')
+
+    def __init__(self, mm, n, toff, ooff, hoff, hlen):
+        self.mm = mm
+        self.n = n
+        self.toff = toff
+        self.ooff = ooff
+        self.hoff = hoff
+        self.hlen = hlen
+        self.tsize = array(_TIMECODE).itemsize
+        self.osize = _OFFSETSIZE
+        self._tfmt = struct.Struct(_TIMECODE)
+        self._ofmt = struct.Struct("=" + _OFFSETCODE)
+
+    def time(self, i):
+        return self._tfmt.unpack_from(self.mm, self.toff + i*self.tsize)[0]
+
+    def raw(self, i):
+        unpack = self._ofmt.unpack_from
+        start = unpack(self.mm, self.ooff + i*self.osize)[0]
+        if i + 1 < self.n:
+            stop = unpack(self.mm, self.ooff + (i+1)*self.osize)[0]
+        else:
+            stop = self.hlen
+        return self.mm[self.hoff+start:self.hoff+stop]
+
+    def bisect(self, t):
+        """ Return the number of changes at or before time t. """
+        lo, hi = 0, self.n
+        time = self.time
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if t < time(mid):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def bisectLeft(self, t):
+        """ Return the number of changes strictly before time t. """
+        lo, hi = 0, self.n
+        time = self.time
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if time(mid) < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+def _decode(raw):
+    """ Convert a raw VCD value string to a Python value.
+
+    Scalars and vectors without x or z bits become ints, reals become
+    floats, and everything else is returned as a string.
+    """
+    kind = raw[0]
+    if kind in "bB":
+        bits = raw[1:]
+        try:
+            return int(bits, 2)
+        except ValueError:
+            return bits.lower()
+    elif kind in "rR":
+        return float(raw[1:])
+    elif kind in "sS":
+        return raw[1:]
+    elif kind in "01":
+        return int(kind)
+    else:
+        return raw.lower()
+
+
+def _scan(vcdpath, spill):
+    """ Scan a VCD file and return its header info and value changes.
+
+    The value changes are flushed in chunks to file spill.
+    """
+    if vcdpath.endswith(".gz"):
+        f = gzip.open(vcdpath, 'rb')
+    else:
+        f = open(vcdpath, 'r')
+    try:
+        vars = {}
+        widths = {}
+        scope = []
+        timescale = []
+        tokens = (tok for line in f for tok in line.split())
+        # header
+        for tok in tokens:
+            if tok == "$enddefinitions":
+                _skipEnd(tokens)
+                break
+            elif tok == "$scope":
+                _, name = _readDecl(tokens, 2)
+                scope.append(name)
+            elif tok == "$upscope":
+                _readDecl(tokens, 0)
+                if not scope:
+                    raise WaveformError(_error.Format, "unbalanced $upscope")
+                scope.pop()
+            elif tok == "$var":
+                decl = _readDecl(tokens)
+                if len(decl) < 4:
+                    raise WaveformError(_error.Format, "bad $var declaration")
+                w, code, name = decl[1], decl[2], "".join(decl[3:])
+                vars[".".join(scope + [name])] = code
+                widths[code] = int(w)
+            elif tok == "$timescale":
+                timescale = _readDecl(tokens)
+            elif tok.startswith("$"):
+                _skipEnd(tokens)
+        else:
+            raise WaveformError(_error.Format, "no $enddefinitions")
+        # value changes
+        columns = dict((code, _Column()) for code in widths)
+        t = 0
+        pending = 0
+        for tok in tokens:
+            c = tok[0]
+            if c == '#':
+                t = float(tok[1:])
+                if pending >= _CHUNKSIZE:
+                    for col in columns.values():
+                        col.flush(spill)
+                    pending = 0
+            elif c in "bBrRsS":
+                code = tokens.next()
+                columns[code].append(t, tok)
+                pending += 1
+            elif c == '$':
+                if tok == "$comment":
+                    _skipEnd(tokens)
+            else:
+                columns[tok[1:]].append(t, c)
+                pending += 1
+        for col in columns.values():
+            col.flush(spill)
+    except (StopIteration, KeyError), e:
+        raise WaveformError(_error.Format, "%s: %s" % (vcdpath, e))
+    except OverflowError:
+        raise WaveformError(_error.TooLarge, vcdpath)
+    finally:
+        f.close()
+    return "".join(timescale), vars, widths, columns
+
+
+def _readDecl(tokens, n=None):
+    decl = []
+    for tok in tokens:
+        if tok == "$end":
+            break
+        decl.append(tok)
+    if n is not None and len(decl) != n:
+        raise WaveformError(_error.Format, "bad declaration %s" % " ".join(decl))
+    return decl
+
+def _skipEnd(tokens):
+    for tok in tokens:
+        if tok == "$end":
+            return
+
+
+def _copy(src, dst, off, size):
+    src.seek(off)
+    while size > 0:
+        data = src.read(min(size, _COPYSIZE))
+        if not data:
+            raise IOError("unexpected end of file")
+        dst.write(data)
+        size -= len(data)
+
+
+def _writeDb(dbpath, vcdpath, spill, timescale, vars, widths, columns):
+    """ Write the database, from the chunks in file spill. """
+    tsize = array(_TIMECODE).itemsize
+    f = open(dbpath, 'wb')
+    try:
+        f.write(_MAGIC)
+        index = {}
+        for code, col in columns.items():
+            toff = f.tell()
+            for n, ctoff, cooff, choff, chlen in col.chunks:
+                _copy(spill, f, ctoff, n*tsize)
+            ooff = f.tell()
+            for n, ctoff, cooff, choff, chlen in col.chunks:
+                _copy(spill, f, cooff, n*_OFFSETSIZE)
+            hoff = f.tell()
+            for n, ctoff, cooff, choff, chlen in col.chunks:
+                _copy(spill, f, choff, chlen)
+            index[code] = (col.n, toff, ooff, hoff, col.hlen)
+        info = {'vcdsize': path.getsize(vcdpath),
+                'timescale': timescale,
+                'vars': vars,
+                'widths': widths,
+                'columns': index,
+                'itemsizes': (tsize, _OFFSETSIZE)
+               }
+        ioff = f.tell()
+        f.write(json.dumps(info))
+        f.write(_TRAILER.pack(ioff))
+    finally:
+        f.close()
+
+
+def _readDbInfo(mm):
+    if mm[:len(_MAGIC)] != _MAGIC:
+        return None
+    ioff = _TRAILER.unpack_from(mm, len(mm) - _TRAILER.size)[0]
+    info = json.loads(mm[ioff:len(mm) - _TRAILER.size])
+    # json returns unicode strings
+    info['vars'] = dict((str(n), str(c)) for n, c in info['vars'].items())
+    info['widths'] = dict((str(c), w) for c, w in info['widths'].items())
+    info['columns'] = dict((str(c), v) for c, v in info['columns'].items())
+    info['timescale'] = str(info['timescale'])
+    itemsizes = (array(_TIMECODE).itemsize, _OFFSETSIZE)
+    if tuple(info['itemsizes']) != itemsizes:
+        return None
+    return info
+
+
+class Waveform(object):
+
+    """ Indexed, read-only view on a VCD file.
+
+    Signals are named by their hierarchical path, with the scope names
+    joined by dots, e.g. "top.dut.count". The MyHDL style name with
+    underscores, e.g. "top_dut_count", can be used as well as long as
+    it is unambiguous. Flattened memory elements are named as written
+    by traceSignals, e.g. "top.mem(3)".
+
+    Methods:
+    names -- return the signal names
+    value -- return the value of a signal at some time
+    changes -- return the value changes of a signal in a time range
+    edges -- return the times of edges of a signal in a time range
+
+    """
+
+    def __init__(self, vcdpath, dbpath=None):
+        """ Open a waveform, building its database when required.
+
+        vcdpath -- path of the VCD file
+        dbpath -- path of the database file (default: vcdpath + ".wdb")
+
+        """
+        if not path.exists(vcdpath):
+            raise WaveformError(_error.NoFile, vcdpath)
+        if dbpath is None:
+            dbpath = vcdpath + ".wdb"
+        self.vcdpath = vcdpath
+        self.dbpath = dbpath
+        info = None
+        if path.exists(dbpath) and \
+           path.getmtime(dbpath) >= path.getmtime(vcdpath):
+            info = self._open()
+            if info is None or info['vcdsize'] != path.getsize(vcdpath):
+                self.close()
+                info = None
+        if info is None:
+            spill = tempfile.TemporaryFile()
+            try:
+                _writeDb(dbpath, vcdpath, spill, *_scan(vcdpath, spill))
+            finally:
+                spill.close()
+            info = self._open()
+        self.timescale = info['timescale']
+        self._vars = vars = info['vars']
+        self._widths = info['widths']
+        self._columns = {}
+        for code, (n, toff, ooff, hoff, hlen) in info['columns'].items():
+            self._columns[code] = _MappedColumn(self._mm, n, toff, ooff, hoff, hlen)
+        self._aliases = aliases = {}
+        for name in vars:
+            alias = name.replace('.', '_')
+            if alias in aliases and aliases[alias] != name:
+                aliases[alias] = None
+            else:
+                aliases[alias] = name
+
+    def _open(self):
+        self._file = open(self.dbpath, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return _readDbInfo(self._mm)
+
+    def close(self):
+        """ Release the memory-mapped database. """
+        self._mm.close()
+        self._file.close()
+
+    def names(self):
+        """ Return a sorted list of the signal names. """
+        return sorted(self._vars)
+
+    def width(self, name):
+        """ Return the bit width of a signal. """
+        return self._widths[self._code(name)]
+
+    def _code(self, name):
+        if name in self._vars:
+            return self._vars[name]
+        if name in self._aliases:
+            n = self._aliases[name]
+            if n is None:
+                raise WaveformError(_error.AmbiguousName, name)
+            return self._vars[n]
+        raise WaveformError(_error.UndefinedName, name)
+
+    def _column(self, name):
+        return self._columns[self._code(name)]
+
+    def value(self, name, t):
+        """ Return the value of a signal at time t.
+
+        None is returned before the first value change.
+        """
+        col = self._column(name)
+        i = col.bisect(t)
+        if i == 0:
+            return None
+        return _decode(col.raw(i-1))
+
+    def changes(self, name, start=None, stop=None):
+        """ Return the value changes of a signal as (time, value) tuples.
+
+        start -- first time included (default: beginning)
+        stop -- last time included (default: end)
+
+        """
+        col = self._column(name)
+        if start is None:
+            lo = 0
+        else:
+            lo = col.bisectLeft(start)
+        if stop is None:
+            hi = col.n
+        else:
+            hi = col.bisect(stop)
+        return [(_toTime(col.time(i)), _decode(col.raw(i))) for i in range(lo, hi)]
+
+    def edges(self, name, start=None, stop=None, edge=None):
+        """ Return the times of the edges of a 1 bit signal.
+
+        start -- first time included (default: beginning)
+        stop -- last time included (default: end)
+        edge -- "posedge", "negedge" or None for both (default)
+
+        """
+        if edge not in ("posedge", "negedge", None):
+            raise ValueError("edge should be 'posedge', 'negedge' or None")
+        col = self._column(name)
+        if start is None:
+            lo = 0
+        else:
+            lo = col.bisectLeft(start)
+        if stop is None:
+            hi = col.n
+        else:
+            hi = col.bisect(stop)
+        prev = None
+        if lo > 0:
+            prev = _decode(col.raw(lo-1))
+        times = []
+        for i in range(lo, hi):
+            val = _decode(col.raw(i))
+            if prev is not None and val != prev:
+                if val == 1 and prev == 0 and edge != "negedge":
+                    times.append(_toTime(col.time(i)))
+                elif val == 0 and prev == 1 and edge != "posedge":
+                    times.append(_toTime(col.time(i)))
+            prev = val
+        return times
+
+
+def _toTime(t):
+    if t == int(t):
+        return int(t)
+    return t
@@ -41,7 +41,11 @@ from myhdl.conversion._misc import (_error, _access, _kind,
 from myhdl._extractHierarchy import _isMem, _getMemInfo, _UserCode
 from myhdl._Signal import _Signal, _WaiterList
 from myhdl._ShadowSignal import _ShadowSignal, _SliceSignal
-from myhdl._util import _isTupleOfInts, _dedent
+from myhdl._MemorySignal import _MemorySignal
+from myhdl._block import _unwrap
+from myhdl._util import _isTupleOfInts
+from myhdl._sourcecache import sourceCache
+from myhdl._tlog import tlog
 
 myhdlObjects = myhdl.__dict__.values()
 builtinObjects = __builtin__.__dict__.values()
@@ -51,32 +55,22 @@ _constDict = {}
 _extConstDict = {}
 
 
-def _makeName(n, prefixes):
-    # trim empty prefixes
-    prefixes = [p for p in prefixes if p]
-    if len(prefixes) > 1:
-#        name = '_' + '_'.join(prefixes[1:]) + '_' + n
-        name = '_'.join(prefixes[1:]) + '_' + n
-    else:
-        name = n
+def _makeName(n, prefix):
+    name = prefix + n
     if '[' in name or ']' in name:
         name = "\\" + name + ' '
-##     print prefixes
-##     print name
     return name
 
 def _makeAST(f):
-    s = inspect.getsource(f)
-    s = _dedent(s)
-    tree = ast.parse(s)
-    tree.sourcefile = inspect.getsourcefile(f)
-    tree.lineoffset = inspect.getsourcelines(f)[1]-1
-    return tree
+    f = _unwrap(f)
+    return sourceCache._parse(f)
                      
 def _analyzeSigs(hierarchy, hdl='Verilog'):
     curlevel = 0
     siglist = []
     memlist = []
+    # stack of (number of named levels, name prefix) tuples: the prefix
+    # joins the non-empty instance names, the top level excepted
     prefixes = []
     open, close = '[', ']'
     if hdl == 'VHDL':
@@ -92,17 +86,27 @@ def _analyzeSigs(hierarchy, hdl='Verilog'):
         assert(delta >= -1)
         if delta > -1: # same or higher level
             prefixes = prefixes[:curlevel-1]   
+        if prefixes:
+            nr, prefix = prefixes[-1]
+        else:
+            nr, prefix = 0, ''
         # skip processing and prefixing in context without signals    
         if not (sigdict or memdict):
-            prefixes.append("")
+            prefixes.append((nr, prefix))
             continue
-        prefixes.append(name)
+        if not name:
+            prefixes.append((nr, prefix))
+        elif nr:
+            prefix = prefix + name + '_'
+            prefixes.append((nr+1, prefix))
+        else:
+            prefixes.append((1, prefix))
         for n, s in sigdict.items():
             if s._name is not None:
                 continue
             if isinstance(s, _SliceSignal):
                 continue
-            s._name = _makeName(n, prefixes)
+            s._name = _makeName(n, prefix)
             if not s._nrbits:
                 raise ConversionError(_error.UndefinedBitWidth, s._name)
             # slice signals
@@ -113,7 +117,7 @@ def _analyzeSigs(hierarchy, hdl='Verilog'):
         for n, m in memdict.items():
             if m.name is not None:
                 continue
-            m.name = _makeName(n, prefixes)
+            m.name = _makeName(n, prefix)
             memlist.append(m)
 
     # handle the case where a named signal appears in a list also by giving
@@ -121,17 +125,20 @@ def _analyzeSigs(hierarchy, hdl='Verilog'):
     for m in memlist:
         if not m._used:
             continue
+        fmt = "%s%s%%d%s" % (m.name, open, close)
+        eltype = type(m.elObj._init)
+        nrbits = m.elObj._nrbits
         for i, s in enumerate(m.mem):
-            s._name = "%s%s%s%s" % (m.name, open, i, close)
+            s._name = fmt % i
             s._used = False
             if s._inList:
                 raise ConversionError(_error.SignalInMultipleLists, s._name)
             s._inList = True
             if not s._nrbits:
                 raise ConversionError(_error.UndefinedBitWidth, s._name)
-            if type(s.val) != type(m.elObj.val):
+            if type(s._init) is not eltype:
                 raise ConversionError(_error.InconsistentType, s._name)
-            if s._nrbits != m.elObj._nrbits:
+            if s._nrbits != nrbits:
                 raise ConversionError(_error.InconsistentBitWidth, s._name)
             
     return siglist, memlist
@@ -145,12 +152,8 @@ def _analyzeGens(top, absnames):
             tree = g
         elif isinstance(g, (_AlwaysComb, _AlwaysSeq, _Always)):
             f = g.func
-            s = inspect.getsource(f)
-            s = _dedent(s)
-            tree = ast.parse(s)
+            tree = sourceCache._parse(f)
             #print ast.dump(tree)
-            tree.sourcefile  = inspect.getsourcefile(f)
-            tree.lineoffset = inspect.getsourcelines(f)[1]-1
             tree.symdict = f.func_globals.copy()
             tree.callstack = []
             # handle free variables
@@ -181,12 +184,8 @@ def _analyzeGens(top, absnames):
             v.visit(tree)
         else: # @instance
             f = g.gen.gi_frame
-            s = inspect.getsource(f)
-            s = _dedent(s)
-            tree = ast.parse(s)
+            tree = sourceCache._parse(f)
             # print ast.dump(tree)
-            tree.sourcefile = inspect.getsourcefile(f)
-            tree.lineoffset = inspect.getsourcelines(f)[1]-1
             tree.symdict = f.f_globals.copy()
             tree.symdict.update(f.f_locals)
             tree.nonlocaldict = {}
@@ -196,6 +195,9 @@ def _analyzeGens(top, absnames):
             v.visit(tree)
             v = _AnalyzeBlockVisitor(tree)
             v.visit(tree)
+        if not isinstance(g, _UserCode):
+            v = _FoldConstantsVisitor(tree)
+            v.visit(tree)
         genlist.append(tree)
     return genlist
 
@@ -351,7 +353,7 @@ def hasType(obj, theType):
     if isinstance(obj, theType):
         return True
     if isinstance(obj, _Signal):
-        if isinstance(obj._val, theType):
+        if isinstance(obj.val, theType):
             return True
     return False
 
@@ -586,21 +588,34 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
         ### suprize: identity comparison on unbound methods doesn't work in python 2.5??
         elif f == intbv.signed:
             node.obj = int(-1)
+        elif f is tlog:
+            self.tree.hasPrint = True
+            for arg in node.args:
+                if not hasType(arg.obj, (bool, int, long, intbv)):
+                    self.raiseError(node, _error.UnsupportedType,
+                                    "tlog argument: %s" % type(arg.obj))
+                # VHDL writes the values as integers
+                val = arg.obj
+                if isinstance(val, _Signal):
+                    val = val.val
+                if isinstance(val, intbv):
+                    maxbits = 31
+                    if val.min is not None and val.min < 0:
+                        maxbits = 32
+                    if len(val) > maxbits:
+                        self.raiseError(node, _error.TlogBitWidth,
+                                        "%s bits" % len(val))
         elif f in myhdlObjects:
             pass
         elif f in builtinObjects:
             pass
         elif type(f) is FunctionType:
             argsAreInputs = False
-            s = inspect.getsource(f)
-            s = _dedent(s)
-            tree = ast.parse(s)
+            tree = sourceCache._parse(f)
             # print ast.dump(tree)
             # print tree
             fname = f.__name__
             tree.name = _Label(fname)
-            tree.sourcefile = inspect.getsourcefile(f)
-            tree.lineoffset = inspect.getsourcelines(f)[1]-1
             tree.symdict = f.func_globals.copy()
             tree.nonlocaldict = {}
             if fname in self.tree.callstack:
@@ -728,6 +743,9 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
         if not hasattr(test1, 'case'):
             return
         var1, item1 = test1.case
+        # a case needs a choice type, which ints and constants don't have
+        if not isinstance(var1.obj, (_Signal, intbv, EnumItemType)):
+            return
         # don't infer a case if there's no elsif test
         if not node.tests[1:]:
             return
@@ -981,7 +999,7 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
             else:
                 node.obj = node.value.obj.elObj
         elif _isMem(node.value.obj):
-            node.obj = node.value.obj[0]
+            node.obj = _getMemInfo(node.value.obj).elObj
         elif isinstance(node.value.obj, _Rom):
             node.obj = int(-1)
         elif isinstance(node.value.obj, intbv):
@@ -1028,7 +1046,7 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
         elif isinstance(n.obj, (_Signal, _WaiterList, delay)):
             senslist = [n.obj]
         elif _isMem(n.obj):
-            senslist = n.obj
+            senslist = _getMemInfo(n.obj).mem
         else:
             self.raiseError(node, _error.UnsupportedYield)
         node.senslist = senslist
@@ -1087,7 +1105,14 @@ class _AnalyzeAlwaysCombVisitor(_AnalyzeBlockVisitor):
     
     def __init__(self, tree, senslist):
         _AnalyzeBlockVisitor.__init__(self, tree)
-        self.tree.senslist = senslist
+        # expand memory signals into their element signals
+        expanded = []
+        for s in senslist:
+            if isinstance(s, _MemorySignal):
+                expanded.extend(_getMemInfo(s).mem)
+            else:
+                expanded.append(s)
+        self.tree.senslist = expanded
 
 
     def visit_FunctionDef(self, node):
@@ -1236,6 +1261,107 @@ ismethod = inspect.ismethod
 def isboundmethod(m):
     return ismethod(m) and m.__self__ is not None
 
+class _FoldConstantsVisitor(ast.NodeTransformer, _ConversionMixin):
+
+    """ Fold constant expressions and prune dead if arms.
+
+    Runs on analyzed trees. Constant operands are numbers, and names
+    that refer to integer (or bool) objects, and are not variables or
+    function arguments. A constant if test is evaluated: a false arm is
+    removed, and a true arm becomes the else clause. An if statement
+    without arms left is replaced by its else clause. Constant
+    arithmetic expressions are replaced by a number, if the result is
+    a natural integer that fits in 31 bits.
+
+    """
+
+    _foldable = (ast.BinOp, ast.UnaryOp)
+    _testable = (ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare)
+
+    def __init__(self, tree):
+        self.tree = tree
+
+    def isConstant(self, node):
+        if isinstance(node, ast.Num):
+            return True
+        if isinstance(node, ast.Name):
+            n = node.id
+            if n in ('True', 'False'):
+                return True
+            if n in self.tree.vardict or n in self.tree.argnames:
+                return False
+            return isinstance(self.tree.symdict.get(n), (int, long))
+        if isinstance(node, self._testable):
+            for n in ast.iter_child_nodes(node):
+                if isinstance(n, (ast.expr_context, ast.operator,
+                                  ast.unaryop, ast.boolop, ast.cmpop)):
+                    continue
+                if not self.isConstant(n):
+                    return False
+            return True
+        return False
+
+    def foldStmts(self, stmts):
+        new = []
+        for stmt in stmts:
+            stmt = self.visit(stmt)
+            if stmt is None:
+                continue
+            if isinstance(stmt, list):
+                new.extend(stmt)
+            else:
+                new.append(stmt)
+        if stmts and not new:
+            new.append(ast.copy_location(ast.Pass(), stmts[0]))
+        return new
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if hasattr(node, 'tree'):
+            v = _FoldConstantsVisitor(node.tree)
+            v.visit(node.tree)
+        return node
+
+    def visit_If(self, node):
+        if node.ignore:
+            return node
+        tests = []
+        else_ = node.else_
+        for test, suite in node.tests:
+            if isinstance(test, (ast.Num, ast.Name) + self._testable) and \
+               self.isConstant(test):
+                if self.getVal(test):
+                    else_ = suite
+                    break
+                continue
+            tests.append((self.visit(test), self.foldStmts(suite)))
+        else_ = self.foldStmts(else_)
+        if not tests:
+            return else_ or None
+        node.tests = tests
+        node.else_ = else_
+        return node
+
+    def generic_visit(self, node):
+        for field, old in ast.iter_fields(node):
+            if isinstance(old, list) and old and isinstance(old[0], ast.stmt):
+                old[:] = self.foldStmts(old)
+            elif isinstance(old, list):
+                old[:] = [self.visit(n) if isinstance(n, ast.AST) else n
+                          for n in old]
+            elif isinstance(old, ast.AST):
+                setattr(node, field, self.visit(old))
+        if isinstance(node, self._foldable) and self.isConstant(node):
+            val = self.getVal(node)
+            if isinstance(val, (int, long)) and 0 <= val < 2**31:
+                num = ast.copy_location(ast.Num(int(val)), node)
+                # as in the analyzer
+                num.value = num.n
+                num.obj = bool(num.n) if num.n in (0, 1) else num.n
+                return num
+        return node
+
+
 def _analyzeTopFunc(func, *args, **kwargs):
     tree = _makeAST(func)
     v = _AnalyzeTopFuncVisitor(func, tree, *args, **kwargs)
@@ -67,6 +67,7 @@ class _error(object):
      "Can't assign to list element; use slice assignment to change its value"
     NotASignal = "Non-local object should be a Signal"
     UnsupportedType = "Object type is not supported in this context"
+    TlogBitWidth = "tlog argument doesn't fit in a VHDL integer"
     InconsistentType = "Signal elements should have the same base type"
     InconsistentBitWidth = "Signal elements should have the same bit width"
     UnsupportedFormatString = "Unsupported format string"
@@ -23,7 +23,9 @@
 
 
 import sys
+import os
 import math
+import re
 
 import inspect
 from datetime import datetime
@@ -48,6 +50,7 @@ from myhdl.conversion._misc import (_error,_kind,_context,
 from myhdl.conversion._analyze import (_analyzeSigs, _analyzeGens, _analyzeTopFunc,
                                        _Ram, _Rom, _enumTypeSet, _constDict, _extConstDict)
 from myhdl._Signal import _Signal,_WaiterList
+from myhdl._tlog import _marker
 from myhdl.conversion._toVHDLPackage import _package
 
 _version = myhdl.__version__.replace('.','')
@@ -94,6 +97,8 @@ class _ToVHDLConvertor(object):
                  "use_clauses",
                  "architecture",
                  "numeric_ports",
+                 "rom_threshold",
+                 "incremental",
                  )
 
     def __init__(self):
@@ -106,6 +111,8 @@ class _ToVHDLConvertor(object):
         self.architecture = "MyHDL"
         self.numeric_ports = True
         self.use_clauses = None
+        self.rom_threshold = None
+        self.incremental = False
 
     def __call__(self, func, *args, **kwargs):
         global _converting
@@ -134,21 +141,28 @@ class _ToVHDLConvertor(object):
         useClauses = self.use_clauses
 
         vpath = name + ".vhd"
-        vfile = open(vpath, 'w')
         ppath = "pck_myhdl_%s.vhd" % _shortversion
         pfile = None
 #        # write MyHDL package always during development, as it may change
 #        pfile = None
 #        if not os.path.isfile(ppath):
 #            pfile = open(ppath, 'w')
-        if not self.no_myhdl_package:
-            pfile = open(ppath, 'w')
+        if self.incremental:
+            # the files are written at the end, if changed
+            vfile = StringIO()
+            if not self.no_myhdl_package:
+                pfile = StringIO()
+        else:
+            vfile = open(vpath, 'w')
+            if not self.no_myhdl_package:
+                pfile = open(ppath, 'w')
 
         ### initialize properly ###
         _genUniqueSuffix.reset()
         _enumTypeSet.clear()
         _constDict.clear()
         _extConstDict.clear()
+        del _romList[:]
 
         siglist, memlist = _analyzeSigs(h.hierarchy, hdl='VHDL')
         arglist = _flatten(h.top)
@@ -186,6 +200,8 @@ class _ToVHDLConvertor(object):
         if pfile:
             _writeFileHeader(pfile, ppath)
             print >> pfile, _package
+            if self.incremental:
+                _writeIfChanged(ppath, pfile.getvalue())
             pfile.close()
 
         _writeFileHeader(vfile, vpath)
@@ -200,6 +216,8 @@ class _ToVHDLConvertor(object):
         _convertGens(genlist, siglist, memlist, vfile)
         _writeModuleFooter(vfile, arch)
 
+        if self.incremental:
+            _writeIfChanged(vpath, vfile.getvalue())
         vfile.close()
         # tbfile.close()
 
@@ -224,6 +242,7 @@ class _ToVHDLConvertor(object):
         self.no_myhdl_package = False
         self.architecture = "MyHDL"
         self.numeric_ports = True
+        self.rom_threshold = None
         
         
     def _convert_filter(self, h, intf, siglist, memlist, genlist):
@@ -240,6 +259,21 @@ myhdl_header = """\
 -- Date: $date
 """
 
+_re_date = re.compile(r"^-- Date: .*$", re.M)
+
+def _writeIfChanged(path, s):
+    """ Write a file, unless it has the same content, apart from the date. """
+    if os.path.isfile(path):
+        f = open(path)
+        old = f.read()
+        f.close()
+        if _re_date.sub("", old) == _re_date.sub("", s):
+            return False
+    f = open(path, 'w')
+    f.write(s)
+    f.close()
+    return True
+
 def _writeFileHeader(f, fn):
     vars = dict(filename=fn, 
                 version=myhdl.__version__,
@@ -357,10 +391,13 @@ constwires = []
 
 def _writeSigDecls(f, intf, siglist, memlist):
     del constwires[:]
+    argnames = set(intf.argnames)
+    # declarations are collected in a list and written at once
+    decls = []
     for s in siglist:
         if not s._used:
             continue
-        if s._name in intf.argnames:
+        if s._name in argnames:
             continue
         r = _getRangeString(s)
         p = _getTypeString(s)
@@ -371,7 +408,7 @@ def _writeSigDecls(f, intf, siglist, memlist):
                               )
             # the following line implements initial value assignments
             # print >> f, "%s %s%s = %s;" % (s._driven, r, s._name, int(s._val))
-            print >> f, "signal %s: %s%s;" % (s._name, p, r)
+            decls.append("signal %s: %s%s;" % (s._name, p, r))
         elif s._read:
             # the original exception
             # raise ToVHDLError(_error.UndrivenSignal, s._name)
@@ -380,12 +417,14 @@ def _writeSigDecls(f, intf, siglist, memlist):
                           category=ToVHDLWarning
                           )
             constwires.append(s)
-            print >> f, "signal %s: %s%s;" % (s._name, p, r)
+            decls.append("signal %s: %s%s;" % (s._name, p, r))
     for m in memlist:
         if not m._used:
             continue
         # infer attributes for the case of named signals in a list
-        for i, s in enumerate(m.mem):
+        for s in m.mem:
+            if m._driven and m._read:
+                break
             if not m._driven and s._driven:
                 m._driven = s._driven
             if not m._read and s._read:
@@ -395,9 +434,11 @@ def _writeSigDecls(f, intf, siglist, memlist):
         r = _getRangeString(m.elObj)
         p = _getTypeString(m.elObj)
         t = "t_array_%s" % m.name
-        print >> f, "type %s is array(0 to %s-1) of %s%s;" % (t, m.depth, p, r)
-        print >> f, "signal %s: %s;" % (m.name, t)
-    print >> f
+        decls.append("type %s is array(0 to %s-1) of %s%s;" % (t, m.depth, p, r))
+        decls.append("signal %s: %s;" % (m.name, t))
+    decls.append("")
+    f.write("\n".join(decls))
+    f.write("\n")
 
 def _writeCompDecls(f,  compDecls):
     if compDecls is not None:
@@ -412,7 +453,7 @@ def _getRangeString(s):
     elif s._type is bool:
         return ''
     elif s._nrbits is not None:
-        ls = getattr(s, 'lenStr', False)
+        ls = getattr(s._val, 'lenStr', False)
         if ls:
 	    msb = ls + '-1'
 	else:
@@ -433,6 +474,37 @@ def _getTypeString(s):
     else:
         return 'unsigned'
 
+# ROMs that are emitted as a constant array, as (name, rom, vhd) tuples
+_romList = []
+
+def _getRomName(rom, vhd):
+    """ Return the name of the constant array for rom with element type vhd.
+
+    The constant is added on first use.
+
+    """
+    tipe = vhd.toStr()
+    for name, r, v in _romList:
+        if r is rom and v.toStr() == tipe:
+            return name
+    name = "rom" + _genUniqueSuffix.next()
+    _romList.append((name, rom, vhd))
+    return name
+
+def _writeRomDecls(f):
+    for name, rom, vhd in _romList:
+        if isinstance(vhd, vhd_std_logic):
+            items = ["'%s'" % n for n in rom]
+        elif isinstance(vhd, vhd_int):
+            items = ["%s" % n for n in rom]
+        else:
+            items = ['"%s"' % bin(n, vhd.size) for n in rom]
+        print >> f, "type t_%s is array(0 to %s-1) of %s;" % (name, len(rom), vhd.toStr())
+        print >> f, "constant %s: t_%s := (" % (name, name)
+        print >> f, "    " + ",\n    ".join(items)
+        print >> f, ");"
+        print >> f
+
 def _convertGens(genlist, siglist, memlist, vfile):
     blockBuf = StringIO()
     funcBuf = StringIO()
@@ -454,6 +526,7 @@ def _convertGens(genlist, siglist, memlist, vfile):
             Visitor = _ConvertAlwaysCombVisitor
         v = Visitor(tree, blockBuf, funcBuf)
         v.visit(tree)
+    _writeRomDecls(vfile)
     vfile.write(funcBuf.getvalue()); funcBuf.close()
     print >> vfile, "begin"
     print >> vfile
@@ -475,7 +548,7 @@ def _convertGens(genlist, siglist, memlist, vfile):
     print >> vfile
     # shadow signal assignments
     for s in siglist:
-        if hasattr(s, 'toVHDL') and s._read:
+        if s._read and hasattr(s, 'toVHDL'):
             print >> vfile, s.toVHDL()
     # hack for slice signals in a list
     for m in memlist:
@@ -815,6 +888,25 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
                 isinstance(node.value.slice, ast.Index) and \
                 isinstance(node.value.value.obj, _Rom):
             rom = node.value.value.obj.rom
+            threshold = toVHDL.rom_threshold
+            if threshold is not None and len(rom) >= max(threshold, 2) and \
+                    isinstance(lhs.vhd, (vhd_std_logic, vhd_int, vhd_vector)):
+                # read from a constant array instead
+                convOpen, convClose = "", ""
+                self.visit(lhs)
+                if self.SigAss:
+                    if isinstance(lhs.value, ast.Name):
+                        sig = self.tree.symdict[lhs.value.id]
+                        if not sig._numeric and isinstance(lhs.vhd, vhd_vector):
+                            convOpen, convClose = "std_logic_vector(", ")"
+                    self.write(' <= ')
+                    self.SigAss = False
+                else:
+                    self.write(' := ')
+                self.write("%s%s(" % (convOpen, _getRomName(rom, lhs.vhd)))
+                self.visit(node.value.slice)
+                self.write(")%s;" % convClose)
+                return
             self.write("case ")
             self.visit(node.value.slice)
             self.write(" is")
@@ -918,6 +1010,22 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
             self.write("(now / 1 ns)")
             self.write(suf)
             return
+        elif f is tlog:
+            # a record is a single line with the time and the values
+            self.write('write(L, string\'("%s "));' % _marker)
+            self.writeline()
+            self.write("write(L, (now / 1 ns));")
+            for arg in node.args:
+                self.writeline()
+                self.write('write(L, string\'(" "));')
+                self.writeline()
+                arg.vhd = vhd_int()
+                self.write("write(L, ")
+                self.visit(arg)
+                self.write(");")
+            self.writeline()
+            self.write("writeline(output, L);")
+            return
         elif f is ord:
             opening, closing = '', ''
             if isinstance(node.args[0], ast.Str):
@@ -2169,7 +2277,9 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
         node.vhd = vhd_std_logic() # XXX default
         node.slice.value.vhd = vhd_int()
         obj = node.value.obj
-        if isinstance(obj, list):
+        if _isMem(obj):
+            node.vhd = inferVhdlObj(_getMemInfo(obj).elObj)
+        elif isinstance(obj, list):
             assert len(obj)
             node.vhd = inferVhdlObj(obj[0])
         elif isinstance(obj, _Ram):
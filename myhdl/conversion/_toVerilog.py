@@ -23,6 +23,7 @@
 
 
 import sys
+import os
 import math
 import inspect
 from datetime import datetime
@@ -45,6 +46,7 @@ from myhdl.conversion._misc import (_error, _kind, _context,
 from myhdl.conversion._analyze import (_analyzeSigs, _analyzeGens, _analyzeTopFunc, 
                                        _Ram, _Rom)
 from myhdl._Signal import _Signal
+from myhdl._tlog import _marker
             
 _converting = 0
 _profileFunc = None
@@ -86,7 +88,8 @@ class _ToVerilogConvertor(object):
                  "radix",
                  "header",
                  "no_myhdl_header",
-                 "no_testbench"
+                 "no_testbench",
+                 "rom_threshold"
                  )
 
     def __init__(self):
@@ -98,6 +101,7 @@ class _ToVerilogConvertor(object):
         self.header = ''
         self.no_myhdl_header = False
         self.no_testbench = False
+        self.rom_threshold = None
 
     def __call__(self, func, *args, **kwargs):
         global _converting
@@ -127,6 +131,7 @@ class _ToVerilogConvertor(object):
         
         ### initialize properly ###
         _genUniqueSuffix.reset()
+        del _romList[:]
 
         siglist, memlist = _analyzeSigs(h.hierarchy)
         arglist = _flatten(h.top)
@@ -176,6 +181,7 @@ class _ToVerilogConvertor(object):
         self.header = ""
         self.no_myhdl_header = False
         self.no_testbench = False
+        self.rom_threshold = None
         
         
     def _convert_filter(self, h, intf, siglist, memlist, genlist):
@@ -247,10 +253,13 @@ def _writeModuleHeader(f, intf, doc):
 
 def _writeSigDecls(f, intf, siglist, memlist):
     constwires = []
+    argnames = set(intf.argnames)
+    # declarations are collected in a list and written at once
+    decls = []
     for s in siglist:
         if not s._used:
             continue
-        if s._name in intf.argnames:
+        if s._name in argnames:
             continue
         r = _getRangeString(s)
         p = _getSignString(s)
@@ -264,7 +273,7 @@ def _writeSigDecls(f, intf, siglist, memlist):
                 k = 'reg'
             # the following line implements initial value assignments
             # print >> f, "%s %s%s = %s;" % (k, r, s._name, int(s._val))
-            print >> f, "%s %s%s%s;" % (k, p, r, s._name)
+            decls.append("%s %s%s%s;" % (k, p, r, s._name))
         elif s._read:
             # the original exception
             # raise ToVerilogError(_error.UndrivenSignal, s._name)
@@ -273,13 +282,15 @@ def _writeSigDecls(f, intf, siglist, memlist):
                           category=ToVerilogWarning
                           )
             constwires.append(s)
-            print >> f, "wire %s%s;" % (r, s._name)
-    print >> f
+            decls.append("wire %s%s;" % (r, s._name))
+    decls.append("")
     for m in memlist:
         if not m._used:
             continue
         # infer attributes for the case of named signals in a list
-        for i, s in enumerate(m.mem):
+        for s in m.mem:
+            if m._driven and m._read:
+                break
             if not m._driven and s._driven:
                 m._driven = s._driven
             if not m._read and s._read:
@@ -291,20 +302,22 @@ def _writeSigDecls(f, intf, siglist, memlist):
         k = 'wire'
         if m._driven:
             k = m._driven 
-        print >> f, "%s %s%s%s [0:%s-1];" % (k, p, r, m.name, m.depth)
-    print >> f
+        decls.append("%s %s%s%s [0:%s-1];" % (k, p, r, m.name, m.depth))
+    decls.append("")
     for s in constwires:
         if s._type in (bool, intbv):
             c = int(s.val)
         else:
             raise ToVerilogError("Unexpected type for constant signal", s._name)
-        print >> f, "assign %s = %s;" % (s._name, c)
-    print >> f
+        decls.append("assign %s = %s;" % (s._name, c))
+    decls.append("")
     # shadow signal assignments
     for s in siglist:
-        if hasattr(s, 'toVerilog') and s._read:
-            print >> f, s.toVerilog()
-    print >> f
+        if s._read and hasattr(s, 'toVerilog'):
+            decls.append(s.toVerilog())
+    decls.append("")
+    f.write("\n".join(decls))
+    f.write("\n")
 
 
 def _writeModuleFooter(f):
@@ -362,6 +375,43 @@ def _getSignString(s):
         return ''
 
 
+# ROMs that are emitted as a memory array, as (name, rom) tuples
+_romList = []
+
+def _getRomName(rom):
+    """ Return the name of the memory array for rom, adding it on first use. """
+    for name, r in _romList:
+        if r is rom:
+            return name
+    name = "rom" + _genUniqueSuffix.next()
+    _romList.append((name, rom))
+    return name
+
+def _writeRomDecls(f):
+    """ Declare the memory arrays of the ROMs, and write their init files.
+
+    The init files are written next to the Verilog file, and read with
+    $readmemh by their file name, relative to the Verilog file, so that
+    the output can be moved along with it.
+
+    """
+    base = os.path.splitext(f.name)[0]
+    for name, rom in _romList:
+        lo, hi = min(min(rom), 0), max(max(rom), 0)
+        nrbits = intbv(0, min=lo, max=hi+1)._nrbits
+        p = ''
+        if lo < 0:
+            p = "signed "
+        path = "%s_%s.hex" % (base, name)
+        print >> f, "reg %s[%s:0] %s [0:%s-1];" % (p, nrbits-1, name, len(rom))
+        print >> f, 'initial $readmemh("%s", %s);' % (os.path.basename(path), name)
+        print >> f
+        mask = (1 << nrbits) - 1
+        fmt = "%%0%sx\n" % ((nrbits + 3) // 4)
+        romfile = open(path, 'w')
+        romfile.write("".join([fmt % (n & mask) for n in rom]))
+        romfile.close()
+
 def _convertGens(genlist, vfile):
     blockBuf = StringIO()
     funcBuf = StringIO()
@@ -383,6 +433,7 @@ def _convertGens(genlist, vfile):
             Visitor = _ConvertAlwaysCombVisitor
         v = Visitor(tree, blockBuf, funcBuf)
         v.visit(tree)
+    _writeRomDecls(vfile)
     vfile.write(funcBuf.getvalue()); funcBuf.close()
     vfile.write(blockBuf.getvalue()); blockBuf.close()
 
@@ -629,6 +680,19 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
                 isinstance(node.value.slice, ast.Index) and\
                 isinstance(node.value.value.obj, _Rom):
             rom = node.value.value.obj.rom
+            threshold = toVerilog.rom_threshold
+            if threshold is not None and len(rom) >= max(threshold, 2):
+                # read from a memory array instead
+                self.visit(node.targets[0])
+                if self.isSigAss:
+                    self.write(' <= ')
+                    self.isSigAss = False
+                else:
+                    self.write(' = ')
+                self.write("%s[" % _getRomName(rom))
+                self.visit(node.value.slice)
+                self.write("];")
+                return
 #            self.write("// synthesis parallel_case full_case")
 #            self.writeline()
             self.write("case (")
@@ -698,6 +762,15 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
         elif f is now:
             self.write("$time")
             return
+        elif f is tlog:
+            # a record is a single line with the time and the values
+            fs = " %0d" * (len(node.args) + 1)
+            self.write('$write("%s%s\\n", $time' % (_marker, fs))
+            for arg in node.args:
+                self.write(", ")
+                self.visit(arg)
+            self.write(");")
+            return
         elif f is ord:
             opening, closing = '', ''
             if isinstance(node.args[0], ast.Str):
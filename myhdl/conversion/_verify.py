@@ -1,13 +1,22 @@
 import sys
 import os
-import tempfile
+import shutil
 import subprocess
-import difflib
+import threading
+import linecache
+import traceback
+import multiprocessing
+try:
+    from hashlib import sha1
+except ImportError:
+    from sha import sha as sha1
 
 import myhdl
 from myhdl._Simulation import Simulation
 from myhdl.conversion._toVHDL import toVHDL
 from myhdl.conversion._toVerilog import toVerilog
+from myhdl import _tlog
+from myhdl._tlog import _marker
 
 _version = myhdl.__version__.replace('.','')
 # strip 'dev' for version
@@ -21,9 +30,10 @@ _simulateCommands = {}
 _skiplinesMap = {}
 _skipcharsMap = {}
 _ignoreMap = {}
+_artifactsMap = {}
 
 def registerSimulator(name=None, hdl=None, analyze=None, elaborate=None, simulate=None, 
-                      skiplines=None, skipchars=None, ignore=None):
+                      skiplines=None, skipchars=None, ignore=None, artifacts=()):
     if not isinstance(name, str) or (name.strip() == ""):
         raise ValueError("Invalid simulator name")
     if hdl not in ("VHDL", "Verilog"):
@@ -44,13 +54,15 @@ def registerSimulator(name=None, hdl=None, analyze=None, elaborate=None, simulat
     _skiplinesMap[name] = skiplines
     _skipcharsMap[name] = skipchars
     _ignoreMap[name] = ignore
+    _artifactsMap[name] = tuple(artifacts)
 
 registerSimulator(
     name="GHDL",
     hdl="VHDL",
     analyze="ghdl -a --workdir=work pck_myhdl_%(version)s.vhd %(topname)s.vhd",
     elaborate="ghdl -e --workdir=work -o %(unitname)s_ghdl %(topname)s",
-    simulate="ghdl -r %(unitname)s_ghdl"
+    simulate="ghdl -r %(unitname)s_ghdl",
+    artifacts=("work", "%(unitname)s_ghdl")
     )
 
 
@@ -61,7 +73,8 @@ registerSimulator(
     simulate='vsim work_vlog.%(topname)s -quiet -c -do "run -all; quit -f"',
     skiplines=6,
     skipchars=2,
-    ignore=("# **", )
+    ignore=("# **", ),
+    artifacts=("work_vlog", )
     )
 
 registerSimulator(
@@ -71,7 +84,8 @@ registerSimulator(
     simulate='vsim work_vcom.%(topname)s -quiet -c -do "run -all; quit -f"',
     skiplines=6,
     skipchars=2,
-    ignore=("# **", "#    Time:")
+    ignore=("# **", "#    Time:"),
+    artifacts=("work_vcom", )
     )
 
 
@@ -79,7 +93,8 @@ registerSimulator(
     name="icarus",
     hdl="Verilog",
     analyze="iverilog -o %(topname)s.o %(topname)s.v",
-    simulate="vvp %(topname)s.o"
+    simulate="vvp %(topname)s.o",
+    artifacts=("%(topname)s.o", )
     )
 
 registerSimulator(
@@ -91,12 +106,183 @@ registerSimulator(
     )
 
 
+_packageFile = "pck_myhdl_%(version)s.vhd"
+
+
+class _ToolCache(object):
+
+    """ Record of the HDL code that a simulator has analyzed in a directory.
+
+    package -- stamp of the libraries with the analyzed MyHDL VHDL
+               package, or None
+    units -- (digest of the analyzed HDL code, stamp of its artifacts)
+             tuple, by top level name
+
+    A stamp records the files and directories that the analysis produced,
+    so that the analysis is run again when they were removed or changed.
+
+    """
+
+    def __init__(self):
+        self.package = None
+        self.units = {}
+
+def _stamp(paths):
+    """ Return a stamp of paths: their modification times, by path.
+
+    Directories, such as libraries, are only required to exist, as
+    their content changes with the analysis of other units.
+    """
+    stamp = {}
+    for p in paths:
+        if os.path.isdir(p):
+            stamp[p] = 0
+        elif os.path.exists(p):
+            stamp[p] = os.path.getmtime(p)
+        else:
+            stamp[p] = None
+    return stamp
+
+def _isValid(stamp):
+    """ Return whether the paths of a stamp are still as recorded. """
+    if stamp is None:
+        return False
+    for p, mtime in stamp.items():
+        if mtime is None or _stamp([p])[p] != mtime:
+            return False
+    return True
+
+_toolCaches = {}
+
+def _getToolCache(hdlsim):
+    key = (os.getcwd(), hdlsim)
+    if key not in _toolCaches:
+        _toolCaches[key] = _ToolCache()
+    return _toolCaches[key]
+
+def _digest(path):
+    """ Return a digest of an HDL file, ignoring the date in its header. """
+    h = sha1()
+    f = open(path)
+    for line in f:
+        if line.startswith("-- Date:") or line.startswith("// Date:"):
+            continue
+        h.update(line)
+    f.close()
+    return h.hexdigest()
+
+
+class _ToolRun(threading.Thread):
+
+    """ Thread that runs the HDL simulator commands.
+
+    The commands run one after another, concurrently with the MyHDL
+    simulation. A step is a (command, failure message) tuple; on failure,
+    failed is set to a (message, return code) tuple, and the remaining
+    steps are skipped. The simulation command is started last, with its
+    output to a pipe, as proc.
+
+    """
+
+    def __init__(self, steps, simulate):
+        threading.Thread.__init__(self)
+        self.steps = steps
+        self.simulate = simulate
+        self.failed = None
+        self.proc = None
+
+    def run(self):
+        for cmd, msg in self.steps:
+            ret = subprocess.call(cmd, shell=True)
+            if ret != 0:
+                self.failed = (msg, ret)
+                return
+        self.proc = subprocess.Popen(self.simulate, stdout=subprocess.PIPE,
+                                     shell=True)
+
+
+def _hdlLines(g, skiplines, skipchars, ignore):
+    """ Generate the lines of the HDL simulator output to compare. """
+    for i in range(skiplines or 0):
+        if not g.readline():
+            return
+    for line in iter(g.readline, ''):
+        if ignore and line.startswith(tuple(ignore)):
+            continue
+        yield line[skipchars:]
+
+def _parseRecord(line):
+    try:
+        return tuple([int(v) for v in line.split()[1:]])
+    except ValueError:
+        return None
+
+_recordFormats = {}
+
+def _formatRecord(record):
+    n = len(record)
+    if n not in _recordFormats:
+        _recordFormats[n] = _marker + " %d" * n + "\n"
+    return _recordFormats[n] % record
+
+def _compare(f, records, g, log, diff, maxMismatches):
+    """ Compare the MyHDL output with the HDL output.
+
+    The MyHDL output consists of the printed lines f, and the tlog
+    records. HDL lines with the tlog marker are compared as records,
+    other lines are compared with the printed lines, ignoring case.
+    Compared HDL lines are written to log, and mismatches to diff.
+    Comparison stops at the end of the MyHDL output, or at maxMismatches
+    mismatches. Return the number of mismatches.
+
+    """
+    mismatches = 0
+    n = 0
+    fline = next(f, None)
+    record = next(records, None)
+    while fline is not None or record is not None:
+        n += 1
+        gline = next(g, None)
+        if gline is not None:
+            log.write(gline)
+        # with no printed lines left, a record is expected
+        isRecord = fline is None or \
+                   gline is not None and gline.startswith(_marker)
+        if isRecord:
+            expected, record = record, next(records, None)
+            if expected is not None:
+                # formatting is cheaper than parsing; parse on mismatch only
+                expectedLine = _formatRecord(expected)
+                if gline == expectedLine or \
+                   gline is not None and _parseRecord(gline) == expected:
+                    continue
+                expected = expectedLine
+        else:
+            expected, fline = fline.lower(), next(f, None)
+            if gline is not None:
+                gline = gline.lower()
+            if gline == expected:
+                continue
+        if not mismatches:
+            diff.write("--- MyHDL\n+++ HDL\n")
+        diff.write("@@ line %s @@\n" % n)
+        if expected is not None:
+            diff.write("-" + expected)
+        if gline is not None:
+            diff.write("+" + gline)
+        mismatches += 1
+        if maxMismatches and mismatches >= maxMismatches:
+            break
+    return mismatches
+
+
 class  _VerificationClass(object):
 
-    __slots__ = ("simulator", "_analyzeOnly")
+    __slots__ = ("simulator", "max_mismatches", "_analyzeOnly")
 
     def __init__(self, analyzeOnly=False):
         self.simulator = "GHDL"
+        self.max_mismatches = 10
         self._analyzeOnly = analyzeOnly
 
 
@@ -121,11 +307,27 @@ class  _VerificationClass(object):
         skiplines = _skiplinesMap[hdlsim]
         skipchars = _skipcharsMap[hdlsim]
         ignore = _ignoreMap[hdlsim]
+        artifacts = [p % vals for p in _artifactsMap[hdlsim]]
+
+        cache = _getToolCache(hdlsim)
+        package = _packageFile % vals
+        hasPackage = hdl == "VHDL" and package in analyze
+        if hasPackage and _isValid(cache.package) and os.path.exists(package):
+            # analyze the design only, and leave the package file alone
+            analyze = analyze.replace(package, "")
+            hasPackage = False
+            toVHDL.no_myhdl_package = True
 
         if hdl == "VHDL":
             inst = toVHDL(func, *args, **kwargs)
+            digest = _digest(vals['topname'] + ".vhd")
         else:
             inst = toVerilog(func, *args, **kwargs)
+            digest = _digest(vals['topname'] + ".v")
+        # unchanged HDL code was analyzed and elaborated before, unless
+        # the artifacts of the analysis are gone
+        unit = cache.units.get(vals['topname'])
+        analyzed = unit is not None and unit[0] == digest and _isValid(unit[1])
 
         if hdl == "VHDL":
             if not os.path.exists("work"):
@@ -140,85 +342,165 @@ class  _VerificationClass(object):
                 except:
                     pass
 
-        ret = subprocess.call(analyze, shell=True)
-        if ret != 0:
-            print >> sys.stderr, "Analysis failed"
-            return ret
-
         if self._analyzeOnly:
+            ret = subprocess.call(analyze, shell=True)
+            if ret != 0:
+                print >> sys.stderr, "Analysis failed"
+                return ret
+            if hasPackage:
+                cache.package = _stamp(filter(os.path.isdir, artifacts))
             print >> sys.stderr, "Analysis succeeded"
             return 0
 
-        f = tempfile.TemporaryFile()
-        sys.stdout = f
-        sim = Simulation(inst)
-        sim.run()
-        sys.stdout = sys.__stdout__
-        f.flush()
-        f.seek(0)
-
-        flines = f.readlines()
-        f.close()
-        if not flines:
-            print >> sys.stderr, "No MyHDL simulation output - nothing to verify"
-            return 1
-
-
-        if elaborate is not None:
-            ret = subprocess.call(elaborate, shell=True)
-            if ret != 0:
-                print >> sys.stderr, "Elaboration failed"
-                return ret
-            
-        g = tempfile.TemporaryFile()
-        ret = subprocess.call(simulate, stdout=g, shell=True)
-    #    if ret != 0:
-    #        print "Simulation run failed"
-    #        return
-        g.flush()
-        g.seek(0)
-
-        glines = g.readlines()[skiplines:]
-        if ignore:
-            for p in ignore:
-                glines = [line for line in glines if not line.startswith(p)]
-        # limit diff window to the size of the MyHDL output
-        # this is a hack to remove an eventual simulator postamble
-        if len(glines) > len(flines):
-            glines = glines[:len(flines)]
-        glines = [line[skipchars:] for line in glines]
-        flinesNorm = [line.lower() for line in flines]
-        glinesNorm = [line.lower() for line in glines]
-        g = difflib.unified_diff(flinesNorm, glinesNorm, fromfile=hdlsim, tofile=hdl)
+        steps = []
+        if not analyzed:
+            cache.units.pop(vals['topname'], None)
+            steps.append((analyze, "Analysis failed"))
+            if elaborate is not None:
+                steps.append((elaborate, "Elaboration failed"))
 
         MyHDLLog = "MyHDL.log"
         HDLLog = hdlsim + ".log"
-        try:
-            os.remove(MyHDLLog)
-            os.remove(HDLLog)
-        except:
-            pass
-
-        s = "".join(g)
+        TransactionLog = "MyHDL.tlog"
+        for p in (MyHDLLog, HDLLog, TransactionLog, "diff.log"):
+            if os.path.exists(p):
+                os.remove(p)
+
+        # run the HDL simulator concurrently with the MyHDL simulation
+        tools = _ToolRun(steps, simulate)
+        tools.start()
         f = open(MyHDLLog, 'w')
+        t = open(TransactionLog, 'wb')
+        sys.stdout = f
+        _tlog._setFile(t)
+        simulated = False
+        try:
+            sim = Simulation(inst)
+            sim.run()
+            simulated = True
+        finally:
+            sys.stdout = sys.__stdout__
+            _tlog._setFile(None)
+            f.close()
+            t.close()
+            tools.join()
+            if not simulated and tools.proc is not None:
+                # the simulator stops on the closed pipe, if still running
+                tools.proc.stdout.close()
+                tools.proc.wait()
+
+        if tools.failed is not None:
+            msg, ret = tools.failed
+            print >> sys.stderr, msg
+            return ret
+        if steps:
+            cache.units[vals['topname']] = (digest, _stamp(artifacts))
+            if hasPackage:
+                cache.package = _stamp(filter(os.path.isdir, artifacts))
+
+        proc = tools.proc
+        f = open(MyHDLLog)
+        t = open(TransactionLog, 'rb')
         g = open(HDLLog, 'w')
-        d = open('diff.log', 'w')
-        f.writelines(flines)
-        g.writelines(glines)
-        d.write(s)
-        f.close()
-        g.close()
-        d.close()
-
-        if not s:
+        d = open("diff.log", 'w')
+        try:
+            if not f.readline() and not t.read(1):
+                print >> sys.stderr, "No MyHDL simulation output - nothing to verify"
+                return 1
+            f.seek(0)
+            t.seek(0)
+            # stream the HDL simulator output; lines beyond the MyHDL
+            # output, such as a simulator postamble, are not compared
+            glines = _hdlLines(proc.stdout, skiplines, skipchars, ignore)
+            mismatches = _compare(iter(f), _tlog._records(t), glines, g, d,
+                                  self.max_mismatches)
+        finally:
+            f.close()
+            t.close()
+            g.close()
+            d.close()
+            # the simulator stops on the closed pipe, if still running
+            proc.stdout.close()
+            proc.wait()
+
+        if not mismatches:
             print >> sys.stderr, "Conversion verification succeeded"
         else:
             print >> sys.stderr, "Conversion verification failed"
-            # print >> sys.stderr, s ,
             return 1
 
         return 0
 
 
+    def batch(self, jobs, workers=None):
+        """ Verify or analyze several designs, in parallel.
+
+        jobs -- sequence of (func, arg, ...) tuples, one per call
+        workers -- number of worker processes (default: number of CPUs)
+
+        Each worker process works in its own directory, verify_batch_<n>,
+        and keeps its analyzed HDL code from job to job; the directories
+        are removed when all jobs are done. Return a list
+        with the return value of each call; a call that raises an
+        exception counts as a failure.
+
+        """
+        global _batch
+        jobs = list(jobs)
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        workers = min(workers, len(jobs))
+        if workers <= 1:
+            return [_runJob(self, job) for job in jobs]
+        # the workers are forked, and find the jobs here
+        _batch = (self, jobs)
+        counter = multiprocessing.Value('i', 0)
+        pool = multiprocessing.Pool(workers, _initWorker, (counter,))
+        try:
+            results = pool.map(_runBatchJob, range(len(jobs)), 1)
+        finally:
+            pool.close()
+            pool.join()
+            _batch = None
+            for n in range(1, counter.value + 1):
+                shutil.rmtree("verify_batch_%s" % n, ignore_errors=True)
+        return results
+
+
+def _runJob(verifier, job):
+    try:
+        return verifier(*job)
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+_batch = None
+
+def _runBatchJob(i):
+    verifier, jobs = _batch
+    return _runJob(verifier, jobs[i])
+
+def _initWorker(counter):
+    counter.acquire()
+    counter.value += 1
+    n = counter.value
+    counter.release()
+    # keep the source of modules loaded by a relative path available
+    # for inspection, for as far as it is not yet in linecache
+    for m in sys.modules.values():
+        path = getattr(m, '__file__', None)
+        if path and not os.path.isabs(path):
+            if path[-4:] in ('.pyc', '.pyo'):
+                path = path[:-1]
+            if path not in linecache.cache and os.path.exists(path):
+                lines = open(path).readlines()
+                # without modification time, linecache keeps the entry
+                linecache.cache[path] = (len("".join(lines)), None, lines, path)
+    d = "verify_batch_%s" % n
+    if not os.path.exists(d):
+        os.mkdir(d)
+    os.chdir(d)
+
+
 verify = _VerificationClass(analyzeOnly=False)
 analyze = _VerificationClass(analyzeOnly=True)
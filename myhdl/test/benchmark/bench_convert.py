@@ -0,0 +1,271 @@
+""" Conversion benchmark with per-phase time and memory.
+
+Converts generated designs with toVerilog and toVHDL, and measures
+each phase of the converter separately:
+
+elab  -- hierarchy extraction (_HierExtr)
+sigs  -- signal analysis (_analyzeSigs)
+gens  -- generator analysis (_analyzeGens)
+types -- type annotation (_annotateTypes)
+emit  -- the rest: top level interface analysis and writing the
+         output files
+
+The phases are timed by wrapping the converter functions in the
+namespace of the converter module. The memory of a phase is the growth
+of the peak resident set size over the resident set size at its start,
+from /proc/self/status on Linux. Each conversion runs in a forked
+process.
+
+The designs are:
+
+dec     -- a chain of combinatorial decrementer cells, from bench_elab
+bitonic -- a bitonic sorter, from bench_elab
+inc     -- a chain of clocked incrementer cells, with a variable,
+           an if statement and a reset
+mem     -- a bank of RAMs with 1024 entries; the size is the total
+           number of entries
+
+The results are written to stdout as a JSON list with one record per
+converter, design and size.
+
+Usage: python bench_convert.py [options] [size ...]
+
+The size is the number of cells. The default sizes are 1e3 and 1e4;
+a conversion of 1e5 cells takes about a minute and a few GB.
+
+"""
+
+import sys
+import os
+import time
+import glob
+import json
+from optparse import OptionParser
+
+from myhdl import *
+from myhdl.conversion import _toVerilog, _toVHDL
+
+from bench_elab import decDesign, bitonicDesign, _status, _resetPeak
+
+PHASES = ("elab", "sigs", "gens", "types", "emit")
+
+HDLS = ("verilog", "vhdl")
+
+WIDTH = 8
+
+
+### registered incrementer chain ###
+
+@block
+def inc(a, z, clock, reset):
+    @always_seq(clock.posedge, reset=reset)
+    def logic():
+        s = intbv(0, min=0, max=2**(WIDTH+1))
+        s[:] = a + 1
+        if s >= 2**WIDTH:
+            z.next = s - 2**WIDTH
+        else:
+            z.next = s
+    return logic
+
+@block
+def incChain(a, z, clock, reset, n):
+    s = [Signal(intbv(0, min=0, max=2**WIDTH)) for i in range(1, n)]
+    s = [a] + s + [z]
+    cells = [inc(s[i], s[i+1], clock, reset) for i in range(n)]
+    return cells
+
+def incDesign(size):
+    a = Signal(intbv(0, min=0, max=2**WIDTH))
+    z = Signal(intbv(0, min=0, max=2**WIDTH))
+    clock = Signal(bool(0))
+    reset = ResetSignal(0, active=1, async=False)
+    return incChain, (a, z, clock, reset, size), size
+
+
+### memory bank ###
+
+DEPTH = 1024
+
+@block
+def ram(dout, din, addr, we, clock, depth):
+    mem = [Signal(intbv(0)[WIDTH:]) for i in range(depth)]
+    @always(clock.posedge)
+    def write():
+        if we:
+            mem[int(addr)].next = din
+    @always_comb
+    def read():
+        dout.next = mem[int(addr)]
+    return write, read
+
+@block
+def ramBank(din, dout, addr, we, clock, n):
+    s = [Signal(intbv(0)[WIDTH:]) for i in range(1, n)]
+    s = [din] + s + [dout]
+    rams = [ram(s[i+1], s[i], addr, we, clock, DEPTH) for i in range(n)]
+    return rams
+
+def memDesign(size):
+    n = max(size // DEPTH, 1)
+    din = Signal(intbv(0)[WIDTH:])
+    dout = Signal(intbv(0)[WIDTH:])
+    addr = Signal(intbv(0, min=0, max=DEPTH))
+    we = Signal(bool(0))
+    clock = Signal(bool(0))
+    return ramBank, (din, dout, addr, we, clock, n), n * DEPTH
+
+DESIGNS = {"dec": decDesign, "bitonic": bitonicDesign, "inc": incDesign,
+           "mem": memDesign}
+
+
+### phases ###
+
+class _Phases(object):
+
+    """ Time and memory recorder for the phases of a converter. """
+
+    _wrapped = (("elab", "_HierExtr"), ("sigs", "_analyzeSigs"),
+                ("gens", "_analyzeGens"), ("types", "_annotateTypes"))
+
+    def __init__(self, module):
+        self.module = module
+        self.times = {}
+        self.peaks = {}
+
+    def _start(self):
+        _resetPeak()
+        self.base = _status("VmRSS:")
+        self.t = time.time()
+
+    def _stop(self, phase):
+        self.times[phase] = time.time() - self.t
+        peak = _status("VmHWM:")
+        if peak is None or self.base is None:
+            self.peaks[phase] = None
+        else:
+            self.peaks[phase] = peak - self.base
+
+    def _wrap(self, phase, func):
+        def wrapper(*args, **kwargs):
+            self._start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._stop(phase)
+                if phase == "types":
+                    self._start()
+        return wrapper
+
+    def run(self, convertor, top, args):
+        saved = {}
+        for phase, name in self._wrapped:
+            saved[name] = getattr(self.module, name)
+            setattr(self.module, name, self._wrap(phase, saved[name]))
+        try:
+            start = time.time()
+            convertor(top, *args)
+            total = time.time() - start
+            self._stop("emit")
+        finally:
+            for name, func in saved.items():
+                setattr(self.module, name, func)
+        return total
+
+def runConversion(hdl, design, size):
+    """ Convert a design; return a result record. """
+    func, args, cells = DESIGNS[design](size)
+    if hdl == "verilog":
+        convertor, module = toVerilog, _toVerilog
+    else:
+        convertor, module = toVHDL, _toVHDL
+    phases = _Phases(module)
+    name = func.func_name
+    try:
+        total = phases.run(convertor, func, args)
+        nbytes = 0
+        for p in glob.glob("%s.v" % name) + glob.glob("%s.vhd" % name):
+            nbytes += os.path.getsize(p)
+    finally:
+        for p in glob.glob("*%s.v" % name) + glob.glob("%s.vhd" % name) + \
+                 glob.glob("pck_myhdl_*.vhd"):
+            os.remove(p)
+    result = dict(hdl=hdl, design=design, cells=cells, total=total,
+                  bytes=nbytes)
+    result["phases"] = [dict(phase=p, time=phases.times[p],
+                             peak=phases.peaks[p]) for p in PHASES]
+    return result
+
+def forkConversion(hdl, design, size):
+    """ Run a conversion in a child process, to measure it in isolation. """
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        status = 0
+        try:
+            try:
+                result = runConversion(hdl, design, size)
+            except Exception, e:
+                result = dict(hdl=hdl, design=design, size=size,
+                              error="%s: %s" % (type(e).__name__, e))
+                status = 1
+            os.write(w, json.dumps(result))
+        finally:
+            os._exit(status)
+    os.close(w)
+    data = ""
+    while 1:
+        chunk = os.read(r, 4096)
+        if not chunk:
+            break
+        data += chunk
+    os.close(r)
+    os.waitpid(pid, 0)
+    return json.loads(data)
+
+
+def main():
+    parser = OptionParser(usage="%prog [options] [size ...]")
+    parser.add_option("-d", "--designs", default="dec,inc",
+                      help="comma separated designs: %s [dec,inc]" %
+                           ", ".join(sorted(DESIGNS)))
+    parser.add_option("-l", "--hdls", default=",".join(HDLS),
+                      help="comma separated converters [verilog,vhdl]")
+    parser.add_option("-o", "--output", default=None,
+                      help="write the JSON results to a file [stdout]")
+    options, args = parser.parse_args()
+    sizes = [int(float(a)) for a in args] or [10**3, 10**4]
+    designs = options.designs.split(",")
+    hdls = options.hdls.split(",")
+    for d in designs:
+        if d not in DESIGNS:
+            parser.error("unknown design %s" % d)
+    for h in hdls:
+        if h not in HDLS:
+            parser.error("unknown converter %s" % h)
+
+    sys.setrecursionlimit(10000)
+    results = []
+    for size in sizes:
+        for design in designs:
+            for hdl in hdls:
+                result = forkConversion(hdl, design, size)
+                results.append(result)
+                if "error" in result:
+                    msg = result["error"]
+                else:
+                    msg = "%.3f s" % result["total"]
+                print >> sys.stderr, "%-8s %-8s %8d %s" % (hdl, design, size, msg)
+    if options.output is None:
+        f = sys.stdout
+    else:
+        f = open(options.output, 'w')
+    json.dump(results, f, indent=1, sort_keys=True)
+    f.write("\n")
+    if f is not sys.stdout:
+        f.close()
+
+
+if __name__ == '__main__':
+    main()
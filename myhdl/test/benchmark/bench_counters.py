@@ -0,0 +1,90 @@
+""" Simulation benchmark for counter-heavy designs.
+
+Runs the designs of the timer and lfsr24 benchmarks, and a bank of
+wrapping counters, for a limited number of clock cycles, so that the
+cost of value assignment with bounds handling can be compared quickly.
+
+counters -- modbv counters: full range unsigned, full range signed,
+            and arbitrary bounds
+timer    -- timer_sig from timer.py: intbv signal counter
+timervar -- timer_var from timer.py: intbv variable counter
+lfsr24   -- lfsr24 from lfsr24.py: modbv shift register
+
+Usage: python bench_counters.py [cycles] [repeat]
+
+"""
+
+import sys
+import time
+
+from myhdl import *
+
+from timer import timer_sig, timer_var
+from lfsr24 import lfsr24
+
+
+def clockgen(clock, reset, cycles):
+    @instance
+    def logic():
+        reset.next = 1
+        yield delay(10)
+        reset.next = 0
+        for i in range(cycles):
+            yield delay(10)
+            clock.next = 1
+            yield delay(10)
+            clock.next = 0
+        raise StopSimulation
+    return logic
+
+def counters(clock, reset, n=8):
+    cs = [Signal(modbv(0, min=0, max=2**8)) for i in range(n)]
+    cs += [Signal(modbv(0, min=-2**7, max=2**7)) for i in range(n)]
+    cs += [Signal(modbv(0, min=-3, max=1000)) for i in range(n)]
+    def count(c, step):
+        @always(clock.posedge, reset.posedge)
+        def logic():
+            if reset == 1:
+                c.next = 0
+            else:
+                c.next = c + step
+        return logic
+    return [count(c, 1 + i % 5) for i, c in enumerate(cs)]
+
+def bench(design, cycles):
+    clock = Signal(bool(0))
+    reset = Signal(bool(0))
+    if design == "counters":
+        dut = counters(clock, reset)
+    elif design == "timer":
+        dut = timer_sig(Signal(bool(0)), clock, reset, 1234)
+    elif design == "timervar":
+        dut = timer_var(Signal(bool(0)), clock, reset, 1234)
+    elif design == "lfsr24":
+        lfsr = Signal(modbv(0, min=0, max=2**24))
+        dut = lfsr24(lfsr, Signal(bool(1)), clock, reset)
+    return dut, clockgen(clock, reset, cycles)
+
+DESIGNS = ("counters", "timer", "timervar", "lfsr24")
+
+def main(cycles, repeat):
+    print "%-10s %8s %10s %12s" % ("design", "cycles", "time (s)", "us/cycle")
+    for design in DESIGNS:
+        best = None
+        for i in range(repeat):
+            sim = Simulation(bench(design, cycles))
+            start = time.time()
+            sim.run(quiet=1)
+            elapsed = time.time() - start
+            if best is None or elapsed < best:
+                best = elapsed
+        print "%-10s %8d %10.3f %12.2f" % (design, cycles, best, best * 1e6 / cycles)
+
+if __name__ == '__main__':
+    cycles = 20000
+    repeat = 3
+    if len(sys.argv) > 1:
+        cycles = int(float(sys.argv[1]))
+    if len(sys.argv) > 2:
+        repeat = int(sys.argv[2])
+    main(cycles, repeat)
@@ -0,0 +1,290 @@
+""" Elaboration benchmark with generated large hierarchies.
+
+Builds parameterized designs from small cells and measures the time
+and peak memory of the phases before a simulation really starts:
+
+elab    -- hierarchy extraction, which includes instantiation
+           (waiter inference and always_comb source analysis)
+header  -- traceSignals VCD header writing
+verilog -- toVerilog (including its own elaboration)
+vhdl    -- toVHDL (including its own elaboration)
+waiters -- Simulation construction (_makeWaiters)
+delta   -- the first delta cycle
+
+The designs are:
+
+dec     -- a chain of decrementer cells, after example/arith_lib
+bitonic -- a bitonic sorter, after example/cookbook/bitonic, with
+           the smallest number of inputs that gives the requested
+           number of cells
+
+The hierarchy functions are block functions. With -m profile, the
+top level function is passed undecorated, so that the hierarchy is
+extracted with the profile hook instead.
+
+Each phase runs in a forked process, so that its peak memory can be
+measured on its own. The peak is the growth of the resident set size
+during the phase, from /proc/self/status on Linux.
+
+Usage: python bench_elab.py [options] [size ...]
+
+"""
+
+import sys
+import os
+import time
+import glob
+from optparse import OptionParser
+
+from myhdl import *
+from myhdl import _simulator
+from myhdl._extractHierarchy import _HierExtr
+from myhdl._traceSignals import _writeVcdHeader, _writeVcdSigs
+
+PHASES = ("elab", "header", "verilog", "vhdl", "waiters", "delta")
+
+WIDTH = 8
+
+
+### decrementer chain ###
+
+@block
+def dec(a, z):
+    @always_comb
+    def logic():
+        z.next = a - 1
+    return logic
+
+@block
+def decChain(a, z, n):
+    # initial values are consistent, so that the first delta cycle
+    # evaluates each cell once
+    s = [Signal(modbv(-i, min=0, max=2**WIDTH)) for i in range(1, n)]
+    s = [a] + s + [z]
+    cells = [dec(s[i], s[i+1]) for i in range(n)]
+    return cells
+
+def decDesign(size):
+    a = Signal(modbv(0, min=0, max=2**WIDTH))
+    z = Signal(modbv(-size, min=0, max=2**WIDTH))
+    return decChain, (a, z, size), size
+
+
+### bitonic sorter ###
+
+DESCENDING, ASCENDING = False, True
+
+@block
+def compare(a1, a2, z1, z2, dir):
+    @always_comb
+    def logic():
+        z1.next = a1
+        z2.next = a2
+        if dir == (a1 > a2):
+            z1.next = a2
+            z2.next = a1
+    return logic
+
+@block
+def feedthru(a, z):
+    @always_comb
+    def logic():
+        z.next = a
+    return logic
+
+@block
+def bitonicMerge(a, z, dir):
+    n = len(a)
+    k = n//2
+    w = len(a[0])
+    if n > 1:
+        t = [Signal(intbv(0)[w:]) for i in range(n)]
+        comp = [compare(a[i], a[i+k], t[i], t[i+k], dir) for i in range(k)]
+        loMerge = bitonicMerge(t[:k], z[:k], dir)
+        hiMerge = bitonicMerge(t[k:], z[k:], dir)
+        return comp, loMerge, hiMerge
+    else:
+        feed = feedthru(a[0], z[0])
+        return feed
+
+@block
+def bitonicSort(a, z, dir):
+    n = len(a)
+    k = n//2
+    w = len(a[0])
+    if n > 1:
+        t = [Signal(intbv(0)[w:]) for i in range(n)]
+        loSort = bitonicSort(a[:k], t[:k], ASCENDING)
+        hiSort = bitonicSort(a[k:], t[k:], DESCENDING)
+        merge = bitonicMerge(t, z, dir)
+        return loSort, hiSort, merge
+    else:
+        feed = feedthru(a[0], z[0])
+        return feed
+
+@block
+def sorter(a, z):
+    n = len(a) // WIDTH
+    la = [a((i+1)*WIDTH, i*WIDTH) for i in range(n)]
+    lz = [Signal(intbv(0)[WIDTH:]) for i in range(n)]
+    zc = ConcatSignal(*reversed(lz))
+    sort = bitonicSort(la, lz, ASCENDING)
+    @always_comb
+    def output():
+        z.next = zc
+    return sort, output
+
+def bitonicCells(k):
+    """ Return the number of cells of a bitonic sorter with 2**k inputs. """
+    n = 2**k
+    merges = sum([2**(k-j) * (j * 2**(j-1) + 2**j) for j in range(1, k+1)])
+    return merges + n * (k == 0)
+
+def bitonicDesign(size):
+    k = 1
+    while bitonicCells(k) < size:
+        k += 1
+    n = 2**k
+    a = Signal(intbv(0)[n*WIDTH:])
+    z = Signal(intbv(0)[n*WIDTH:])
+    return sorter, (a, z), bitonicCells(k)
+
+DESIGNS = {"dec": decDesign, "bitonic": bitonicDesign}
+
+
+### phases ###
+
+def _status(field):
+    try:
+        for line in open("/proc/self/status"):
+            if line.startswith(field):
+                return int(line.split()[1])
+    except IOError:
+        pass
+    return None
+
+def _resetPeak():
+    # writing 5 to clear_refs resets the peak RSS (Linux 4.0 and later)
+    try:
+        f = open("/proc/self/clear_refs", "w")
+        f.write("5")
+        f.close()
+    except IOError:
+        pass
+
+def _top(func, mode):
+    if mode == "profile":
+        return func._blockFunc
+    return func
+
+def runPhase(phase, design, size, mode):
+    """ Set up and run a phase; return its time (s) and peak memory (kB). """
+    func, args, cells = DESIGNS[design](size)
+    top = _top(func, mode)
+    if phase == "header":
+        h = _HierExtr(func.func_name, top, *args)
+        f = open(os.devnull, 'w')
+        _simulator._tf = f
+        def run():
+            _writeVcdHeader(f, "1ns")
+            _writeVcdSigs(f, h.hierarchy, True)
+    elif phase in ("waiters", "delta"):
+        dut = top(*args)
+        if phase == "delta":
+            sim = Simulation(dut)
+            def run():
+                sim.run(1, quiet=1)
+        else:
+            def run():
+                Simulation(dut)
+    elif phase == "elab":
+        def run():
+            _HierExtr(func.func_name, top, *args)
+    elif phase == "verilog":
+        def run():
+            toVerilog(top, *args)
+    elif phase == "vhdl":
+        def run():
+            toVHDL(top, *args)
+    _resetPeak()
+    base = _status("VmRSS:")
+    start = time.time()
+    try:
+        run()
+    finally:
+        elapsed = time.time() - start
+        name = func.func_name
+        for p in glob.glob("*%s.v" % name) + glob.glob("%s.vhd" % name) + \
+                 glob.glob("pck_myhdl_*.vhd"):
+            os.remove(p)
+    peak = _status("VmHWM:")
+    if peak is None or base is None:
+        return elapsed, None
+    return elapsed, peak - base
+
+def forkPhase(phase, design, size, mode):
+    """ Run a phase in a child process, to measure it in isolation. """
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        status = 0
+        try:
+            try:
+                result = runPhase(phase, design, size, mode)
+            except Exception, e:
+                result = "%s: %s" % (type(e).__name__, e)
+                status = 1
+            os.write(w, repr(result))
+        finally:
+            os._exit(status)
+    os.close(w)
+    data = ""
+    while 1:
+        chunk = os.read(r, 4096)
+        if not chunk:
+            break
+        data += chunk
+    os.close(r)
+    os.waitpid(pid, 0)
+    return eval(data)
+
+
+def main():
+    parser = OptionParser(usage="%prog [options] [size ...]")
+    parser.add_option("-d", "--design", default="dec",
+                      help="design: %s [dec]" % ", ".join(sorted(DESIGNS)))
+    parser.add_option("-p", "--phases", default=",".join(PHASES),
+                      help="comma separated phases [all]")
+    parser.add_option("-m", "--mode", default="block",
+                      help="hierarchy extraction: block or profile [block]")
+    options, args = parser.parse_args()
+    sizes = [int(float(a)) for a in args] or [10**3, 10**4]
+    phases = options.phases.split(",")
+    for p in phases:
+        if p not in PHASES:
+            parser.error("unknown phase %s" % p)
+    if options.design not in DESIGNS:
+        parser.error("unknown design %s" % options.design)
+
+    sys.setrecursionlimit(10000)
+    print "%-8s %-8s %8s %-8s %10s %12s" % \
+          ("design", "mode", "cells", "phase", "time (s)", "peak (kB)")
+    for size in sizes:
+        cells = DESIGNS[options.design](size)[2]
+        for phase in phases:
+            result = forkPhase(phase, options.design, size, options.mode)
+            if isinstance(result, str):
+                print "%-8s %-8s %8d %-8s %s" % \
+                      (options.design, options.mode, cells, phase, result)
+                continue
+            elapsed, peak = result
+            if peak is None:
+                peak = "-"
+            print "%-8s %-8s %8d %-8s %10.3f %12s" % \
+                  (options.design, options.mode, cells, phase, elapsed, peak)
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
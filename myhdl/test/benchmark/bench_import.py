@@ -0,0 +1,51 @@
+""" Measure the import time of myhdl.
+
+Each case runs repeatedly in a fresh interpreter, and times the import
+statements inside the interpreter, so that interpreter startup is
+excluded. The "simulation" case is what a pure simulation run pays;
+the other cases force the lazily imported subsystems to load.
+
+Usage: python bench_import.py [repeat]
+
+"""
+
+import sys
+import subprocess
+
+CASES = (
+    ("simulation", "import myhdl"),
+    ("tracing", "import myhdl; myhdl.traceSignals.name"),
+    ("conversion", "import myhdl; myhdl.toVerilog.name; myhdl.toVHDL.name"),
+    ("all", "import myhdl; myhdl.traceSignals.name; myhdl.toVerilog.name; "
+            "myhdl.Cosimulation.__name__"),
+)
+
+_script = """
+import time, sys
+t = time.time()
+%s
+t = time.time() - t
+print t, len([m for m in sys.modules if m.startswith('myhdl') and sys.modules[m]])
+"""
+
+def measure(stmt, repeat):
+    times = []
+    for i in range(repeat):
+        out = subprocess.Popen([sys.executable, "-c", _script % stmt],
+                               stdout=subprocess.PIPE).communicate()[0]
+        t, modules = out.split()
+        times.append(float(t))
+    times.sort()
+    return times[0], times[len(times)//2], int(modules)
+
+def main(repeat):
+    print "%-12s %10s %11s %8s" % ("case", "min (ms)", "median (ms)", "modules")
+    for name, stmt in CASES:
+        best, median, modules = measure(stmt, repeat)
+        print "%-12s %10.1f %11.1f %8d" % (name, best*1000, median*1000, modules)
+
+if __name__ == '__main__':
+    repeat = 20
+    if len(sys.argv) > 1:
+        repeat = int(sys.argv[1])
+    main(repeat)
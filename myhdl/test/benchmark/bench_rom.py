@@ -0,0 +1,107 @@
+""" Conversion benchmark for designs with large ROMs.
+
+Converts designs that read a tuple of ints, with the ROM expanded in a
+case statement (the default) and with rom_threshold set, so that it
+becomes a memory array initialized from a $readmemh file in Verilog,
+or a constant array in VHDL. Reports the conversion time and the size
+of the output files (the test bench and the MyHDL package excluded).
+
+The designs are:
+
+sine -- a signed sine lookup table, with a registered read
+crc  -- a 32 bit CRC table with 256 entries, with a combinatorial read
+
+Usage: python bench_rom.py [size ...]
+
+The size is the number of entries of the sine table.
+
+"""
+
+import sys
+import os
+import time
+import math
+import glob
+
+from myhdl import *
+
+WIDTH = 16
+
+
+def sineTable(size):
+    a = 2**(WIDTH-1) - 1
+    return tuple([int(round(a * math.sin(2 * math.pi * i / size)))
+                  for i in range(size)])
+
+def crcTable():
+    table = []
+    for i in range(256):
+        c = i
+        for j in range(8):
+            if c & 1:
+                c = 0xEDB88320 ^ (c >> 1)
+            else:
+                c = c >> 1
+        table.append(c)
+    return tuple(table)
+
+def sine(dout, addr, clk, table):
+    @always(clk.posedge)
+    def read():
+        dout.next = table[int(addr)]
+    return read
+
+def crc(dout, addr, clk, table):
+    @always_comb
+    def read():
+        dout.next = table[int(addr)]
+    return read
+
+def design(name, size):
+    clk = Signal(bool(0))
+    if name == "sine":
+        table = sineTable(size)
+        dout = Signal(intbv(0, min=-2**(WIDTH-1), max=2**(WIDTH-1)))
+    else:
+        table = crcTable()
+        dout = Signal(intbv(0)[32:])
+    addr = Signal(intbv(0, min=0, max=len(table)))
+    return globals()[name], (dout, addr, clk, table)
+
+def convert(hdl, name, size, threshold):
+    """ Convert a design; return the time (s) and the output size (bytes). """
+    func, args = design(name, size)
+    if hdl == "verilog":
+        convertor, outputs = toVerilog, ["%s.v", "%s_rom_*.hex"]
+    else:
+        convertor, outputs = toVHDL, ["%s.vhd"]
+    convertor.rom_threshold = threshold
+    start = time.time()
+    try:
+        convertor(func, *args)
+        elapsed = time.time() - start
+        paths = []
+        for p in outputs:
+            paths.extend(glob.glob(p % name))
+        nbytes = sum([os.path.getsize(p) for p in paths])
+    finally:
+        for p in glob.glob("%s*.v" % name) + glob.glob("tb_%s.v" % name) + \
+                 glob.glob("%s*.hex" % name) + glob.glob("%s.vhd" % name) + \
+                 glob.glob("pck_myhdl_*.vhd"):
+            os.remove(p)
+    return elapsed, nbytes
+
+def main(sizes):
+    print "%-8s %-8s %8s %-6s %10s %12s" % \
+          ("hdl", "design", "entries", "rom", "time (s)", "size (kB)")
+    for hdl in ("verilog", "vhdl"):
+        for name, size in [("crc", 256)] + [("sine", s) for s in sizes]:
+            for rom, threshold in (("case", None), ("array", 0)):
+                elapsed, nbytes = convert(hdl, name, size, threshold)
+                print "%-8s %-8s %8d %-6s %10.3f %12.1f" % \
+                      (hdl, name, size, rom, elapsed, nbytes / 1024.0)
+                sys.stdout.flush()
+
+if __name__ == '__main__':
+    sizes = [int(float(a)) for a in sys.argv[1:]] or [2**10, 2**14, 2**16]
+    main(sizes)
@@ -0,0 +1,54 @@
+""" Compare plain and compressed VCD tracing.
+
+Runs the timer benchmarks under traceSignals, once with plain
+VCD output and once with compressed output, and reports the wall time
+and the number of bytes written.
+
+Usage: python bench_trace.py [duration]
+
+"""
+
+import sys
+import os
+import time
+
+from myhdl import *
+from myhdl import _simulator
+
+from test_timer import test_timer
+from timer import timer_sig, timer_var
+
+
+def run(name, bench, args, duration, compress):
+    traceSignals.name = name
+    traceSignals.compress = compress
+    start = time.time()
+    dut = traceSignals(bench, *args)
+    Simulation(dut).run(duration, quiet=1)
+    _simulator._tf.close()
+    _simulator._tracing = 0
+    elapsed = time.time() - start
+    vcdpath = name + ".vcd"
+    if compress:
+        vcdpath += ".gz"
+    size = os.path.getsize(vcdpath)
+    os.remove(vcdpath)
+    return elapsed, size
+
+
+def main(duration):
+    benches = (("timer_sig", test_timer, (timer_sig,)),
+               ("timer_var", test_timer, (timer_var,)))
+    print "%-10s %-6s %10s %14s" % ("bench", "output", "time (s)", "bytes")
+    for name, bench, args in benches:
+        for compress in (False, True):
+            elapsed, size = run(name, bench, args, duration, compress)
+            output = compress and "gzip" or "plain"
+            print "%-10s %-6s %10.2f %14d" % (name, output, elapsed, size)
+
+
+if __name__ == '__main__':
+    duration = 200000
+    if len(sys.argv) > 1:
+        duration = int(sys.argv[1])
+    main(duration)
@@ -0,0 +1,65 @@
+from myhdl import *
+
+MODE_INC, MODE_DEC, MODE_HOLD = 0, 1, 2
+
+def step(count, enable, clock, reset, MODE, WIDTH):
+
+    @always_seq(clock.posedge, reset=reset)
+    def logic():
+        if enable:
+            if MODE == MODE_INC:
+                count.next = (count + 1) % 2**WIDTH
+            elif MODE == MODE_DEC:
+                if count == 0:
+                    count.next = 2**WIDTH - 1
+                else:
+                    count.next = count - 1
+            else:
+                pass
+        if WIDTH > 4 and not MODE:
+            if count == 2**(WIDTH-1):
+                count.next = 0
+
+    return logic
+
+
+def stepBench(MODE, WIDTH):
+
+    count = Signal(intbv(0)[WIDTH:])
+    enable = Signal(bool(0))
+    clock = Signal(bool(0))
+    reset = ResetSignal(0, active=1, async=True)
+
+    dut = step(count, enable, clock, reset, MODE, WIDTH)
+
+    @instance
+    def clockgen():
+        while True:
+            yield delay(10)
+            clock.next = not clock
+
+    @instance
+    def stimulus():
+        reset.next = 1
+        yield clock.negedge
+        reset.next = 0
+        for i in range(3 * 2**WIDTH):
+            enable.next = i % 5 != 0
+            yield clock.negedge
+            print count
+        raise StopSimulation
+
+    return dut, clockgen, stimulus
+
+
+def testFoldInc():
+    assert conversion.verify(stepBench, MODE_INC, 6) == 0
+
+def testFoldIncNarrow():
+    assert conversion.verify(stepBench, MODE_INC, 3) == 0
+
+def testFoldDec():
+    assert conversion.verify(stepBench, MODE_DEC, 5) == 0
+
+def testFoldHold():
+    assert conversion.verify(stepBench, MODE_HOLD, 4) == 0
@@ -1,5 +1,7 @@
 import os
 path = os.path
+import re
+import glob
 from random import randrange
 
 from myhdl import *
@@ -96,7 +98,64 @@ def test3():
 def test4():
     assert conversion.verify(RomBench, rom4) == 0
 
-        
-        
-    
 
+def romArrayVerify(rom):
+    toVerilog.rom_threshold = toVHDL.rom_threshold = 16
+    try:
+        return conversion.verify(RomBench, rom)
+    finally:
+        toVerilog.rom_threshold = toVHDL.rom_threshold = None
+
+def testArray1():
+    assert romArrayVerify(rom1) == 0
+
+def testArray3():
+    assert romArrayVerify(rom3) == 0
+
+def testArray4():
+    assert romArrayVerify(rom4) == 0
+
+
+ROM1 = (5,)
+
+def rom5(dout, addr, clk):
+
+    @always_comb
+    def read():
+        dout.next = ROM1[int(addr)]
+
+    return read
+
+def romArrayConvert(rom, threshold):
+    dout = Signal(intbv(0)[8:])
+    addr = Signal(intbv(0)[8:])
+    clk = Signal(bool(0))
+    name = rom.func_name
+    toVerilog.rom_threshold = threshold
+    try:
+        toVerilog(rom, dout, addr, clk)
+        f = open("%s.v" % name)
+        code = f.read()
+        f.close()
+        hexpaths = [p for p in glob.glob("%s_rom_*.hex" % name)]
+    finally:
+        toVerilog.rom_threshold = None
+        for p in glob.glob("%s_rom_*.hex" % name) + \
+                 ["%s.v" % name, "tb_%s.v" % name]:
+            if path.exists(p):
+                os.remove(p)
+    return code, hexpaths
+
+def testArrayReadmemh():
+    code, hexpaths = romArrayConvert(rom4, 16)
+    # the init file is read by its name, next to the Verilog file
+    m = re.search(r'initial \$readmemh\("(.*)", rom_\d+\);', code)
+    assert m is not None
+    assert [m.group(1)] == hexpaths
+
+def testArraySingleEntry():
+    # like in VHDL, a ROM with a single entry remains a case statement
+    code, hexpaths = romArrayConvert(rom5, 1)
+    assert "$readmemh" not in code
+    assert "case" in code
+    assert hexpaths == []
@@ -0,0 +1,81 @@
+import os
+import glob
+
+from myhdl import *
+from myhdl import ConversionError
+from myhdl.conversion._misc import _error
+
+t_State = enum("START", "RUN", "STOP")
+
+def TlogBench():
+    a = Signal(intbv(0)[8:])
+    b = Signal(intbv(0, min=-8, max=8))
+    c = Signal(bool(0))
+
+    @instance
+    def logic():
+        v = intbv(0)[4:]
+        for i in range(10):
+            a.next = i * 3
+            b.next = i % 8 - 4
+            c.next = not c
+            v[:] = i
+            yield delay(10)
+            tlog(a, b, c, v, i)
+            if i == 5:
+                print "halfway"
+        tlog(a)
+        print "done"
+
+    return logic
+
+def testTlog():
+    assert conversion.verify(TlogBench) == 0
+
+
+def TlogError():
+    @instance
+    def logic():
+        state = t_State.START
+        yield delay(10)
+        tlog(state)
+    return logic
+
+def testTlogError():
+    try:
+        conversion.verify(TlogError)
+    except ConversionError, e:
+        assert e.kind == _error.UnsupportedType
+    else:
+        assert False
+
+
+def TlogWidth(a):
+    @instance
+    def logic():
+        yield delay(10)
+        tlog(a)
+    return logic
+
+def tlogConvert(a):
+    toVHDL(TlogWidth, a)
+    for p in glob.glob("TlogWidth.vhd") + glob.glob("pck_myhdl_*.vhd"):
+        os.remove(p)
+
+def testTlogUnsignedWidth():
+    tlogConvert(Signal(intbv(0)[31:]))
+    try:
+        tlogConvert(Signal(intbv(0)[32:]))
+    except ConversionError, e:
+        assert e.kind == _error.TlogBitWidth
+    else:
+        assert False
+
+def testTlogSignedWidth():
+    tlogConvert(Signal(intbv(0, min=-2**31, max=2**31)))
+    try:
+        tlogConvert(Signal(intbv(0, min=-2**32, max=2**32)))
+    except ConversionError, e:
+        assert e.kind == _error.TlogBitWidth
+    else:
+        assert False
@@ -0,0 +1,138 @@
+import os
+from StringIO import StringIO
+
+from myhdl import *
+from myhdl.conversion import verify, registerSimulator
+from myhdl.conversion._verify import _compare
+from myhdl._tlog import _marker
+
+# a simulator whose analysis writes the expected output of CountBench(3)
+registerSimulator(
+    name="fakesim",
+    hdl="Verilog",
+    analyze="printf '0\\n1\\n2\\n' > %(topname)s.sim; echo >> fakesim.count",
+    simulate="cat %(topname)s.sim",
+    artifacts=("%(topname)s.sim", )
+    )
+
+
+def CountBench(n):
+
+    count = Signal(intbv(0, min=0, max=n))
+
+    @instance
+    def stimulus():
+        for i in range(n):
+            count.next = i
+            yield delay(10)
+            print count
+
+    return stimulus
+
+def ShiftBench():
+
+    s = Signal(intbv(1)[8:])
+
+    @instance
+    def stimulus():
+        for i in range(7):
+            s.next = s << 1
+            yield delay(10)
+            print s
+
+    return stimulus
+
+def TraceBench(n):
+
+    count = Signal(intbv(0)[32:])
+
+    @instance
+    def stimulus():
+        for i in range(n):
+            count.next = count + 3
+            yield delay(10)
+            print count
+
+    return stimulus
+
+
+def testVerifyTwice():
+    assert verify(ShiftBench) == 0
+    # the unchanged design is simulated without analysis
+    assert verify(ShiftBench) == 0
+
+def testBatch():
+    jobs = [(CountBench, 5), (ShiftBench,), (CountBench, 13)]
+    assert verify.batch(jobs, workers=2) == [0, 0, 0]
+
+def testBatchSequential():
+    jobs = [(CountBench, 7), (ShiftBench,)]
+    assert verify.batch(jobs, workers=1) == [0, 0]
+
+def testLongTrace():
+    assert verify(TraceBench, 100000) == 0
+
+def testVerifyCleaned():
+    def analyses():
+        return len(open("fakesim.count").readlines())
+    simulator = verify.simulator
+    verify.simulator = "fakesim"
+    try:
+        assert verify(CountBench, 3) == 0
+        assert verify(CountBench, 3) == 0
+        assert analyses() == 1
+        # the analysis runs again when its output was cleaned up
+        os.remove("CountBench.sim")
+        assert verify(CountBench, 3) == 0
+        assert analyses() == 2
+    finally:
+        verify.simulator = simulator
+        for p in ("fakesim.count", "CountBench.sim"):
+            if os.path.exists(p):
+                os.remove(p)
+
+
+def compare(flines, records, glines, maxMismatches=10):
+    """ Compare with _compare; return the mismatches, log and diff. """
+    log, diff = StringIO(), StringIO()
+    mismatches = _compare(iter(StringIO(flines)), iter(records),
+                          iter(StringIO(glines)), log, diff, maxMismatches)
+    return mismatches, log.getvalue(), diff.getvalue()
+
+def testCompareMatch():
+    glines = "1\n%s 10 5\nDONE\n" % _marker
+    # case is ignored, and a record may be formatted differently
+    assert compare("1\ndone\n", [(10, 5)], glines) == (0, glines, "")
+    glines = "1\n%s  10   5\ndone\n" % _marker
+    assert compare("1\ndone\n", [(10, 5)], glines) == (0, glines, "")
+
+def testCompareMismatch():
+    mismatches, log, diff = compare("1\n2\n3\n", [], "1\n4\n3\n")
+    assert mismatches == 1
+    assert log == "1\n4\n3\n"
+    assert diff == "--- MyHDL\n+++ HDL\n@@ line 2 @@\n-2\n+4\n"
+
+def testCompareMissing():
+    mismatches, log, diff = compare("1\n2\n", [], "1\n")
+    assert mismatches == 1
+    assert diff == "--- MyHDL\n+++ HDL\n@@ line 2 @@\n-2\n"
+
+def testCompareMaxMismatches():
+    flines = "".join(["%s\n" % i for i in range(10)])
+    mismatches, log, diff = compare(flines, [], "x\n" * 10, maxMismatches=3)
+    assert mismatches == 3
+    # the comparison stops at the cutoff
+    assert log == "x\n" * 3
+    assert diff.count("@@ line") == 3
+    assert diff.endswith("@@ line 3 @@\n-2\n+x\n")
+
+def testCompareRecordMismatch():
+    glines = "1\n%s 10 6\n" % _marker
+    mismatches, log, diff = compare("1\n", [(10, 5)], glines)
+    assert mismatches == 1
+    assert diff == "--- MyHDL\n+++ HDL\n@@ line 2 @@\n-%s 10 5\n+%s 10 6\n" % \
+                   (_marker, _marker)
+    # a print line where a record is expected is a mismatch too
+    mismatches, log, diff = compare("1\n", [(10, 5)], "1\n2\n")
+    assert mismatches == 1
+    assert diff == "--- MyHDL\n+++ HDL\n@@ line 2 @@\n-%s 10 5\n+2\n" % _marker
@@ -0,0 +1,52 @@
+import os
+
+from myhdl import *
+
+
+def incr(count, clock, reset, STEP):
+
+    @always_seq(clock.posedge, reset=reset)
+    def logic():
+        count.next = (count + STEP) % 2**len(count)
+
+    return logic
+
+def signals():
+    count = Signal(intbv(0)[8:])
+    clock = Signal(bool(0))
+    reset = ResetSignal(0, active=1, async=False)
+    return count, clock, reset
+
+def convert(step):
+    count, clock, reset = signals()
+    toVHDL.incremental = True
+    try:
+        toVHDL(incr, count, clock, reset, step)
+    finally:
+        toVHDL.incremental = False
+
+def _stamp(path, t):
+    os.utime(path, (t, t))
+    return os.path.getmtime(path)
+
+def test_incremental():
+    vpath = "incr.vhd"
+    convert(1)
+    ppath = [p for p in os.listdir('.') if p.startswith("pck_myhdl_")][0]
+    vstamp = _stamp(vpath, 1000000)
+    pstamp = _stamp(ppath, 1000000)
+    # unchanged: nothing is written
+    convert(1)
+    assert os.path.getmtime(vpath) == vstamp
+    assert os.path.getmtime(ppath) == pstamp
+    # changed design: only the design file is written
+    convert(3)
+    assert os.path.getmtime(vpath) != vstamp
+    assert os.path.getmtime(ppath) == pstamp
+    assert "STEP: integer := 3;" in open(vpath).read()
+    # changed package file: it is written again
+    f = open(ppath, 'a')
+    f.write("-- modified\n")
+    f.close()
+    convert(3)
+    assert "-- modified" not in open(ppath).read()
@@ -0,0 +1,196 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Run the unit tests for MemorySignal """
+
+
+import random
+from random import randrange
+random.seed(1) # random, but deterministic
+import os
+import glob
+from array import array
+
+import unittest
+from unittest import TestCase
+
+from myhdl import *
+from myhdl import _simulator
+
+QUIET=1
+
+def ram_list(dout, din, addr, we, clk, depth=16):
+    mem = [Signal(intbv(0)[8:]) for i in range(depth)]
+    @always(clk.posedge)
+    def write():
+        if we:
+            mem[addr].next = din
+    @always_comb
+    def read():
+        dout.next = mem[addr]
+    return write, read
+
+def ram_mem(dout, din, addr, we, clk, depth=16):
+    mem = MemorySignal(intbv(0)[8:], depth)
+    @always(clk.posedge)
+    def write():
+        if we:
+            mem[addr].next = din
+    @always_comb
+    def read():
+        dout.next = mem[addr]
+    return write, read
+
+def bench(ram, trace):
+    dout = Signal(intbv(0)[8:])
+    din = Signal(intbv(0)[8:])
+    addr = Signal(intbv(0)[4:])
+    we = Signal(bool(0))
+    clk = Signal(bool(0))
+    dut = ram(dout, din, addr, we, clk)
+    @instance
+    def stimulus():
+        for i in range(200):
+            din.next = randrange(256)
+            addr.next = randrange(16)
+            we.next = randrange(2)
+            yield delay(10)
+            clk.next = 1
+            yield delay(10)
+            clk.next = 0
+            trace.append(int(dout))
+        raise StopSimulation
+    return dut, stimulus
+
+
+class TestMemorySignal(TestCase):
+
+    def testStore(self):
+        mem = MemorySignal(intbv(0)[8:], 1024)
+        self.assert_(isinstance(mem._store, array))
+        self.assertEqual(mem._store.itemsize, 1)
+        self.assertEqual(len(mem), 1024)
+        smem = MemorySignal(intbv(0, min=-8, max=8), 4)
+        self.assertEqual(smem._store.typecode, 'b')
+        wmem = MemorySignal(intbv(0)[100:], 4)
+        self.assert_(isinstance(wmem._store, list))
+
+    def testInit(self):
+        mem = MemorySignal(intbv(0)[8:], 4, init=(1, 2, 3, 4))
+        self.assertEqual([int(w) for w in mem], [1, 2, 3, 4])
+        self.assertEqual(mem[2][1:], 1)
+        try:
+            MemorySignal(intbv(0)[8:], 4, init=(1, 2, 3, 256))
+        except ValueError:
+            pass
+        else:
+            self.fail()
+
+    def testEquivalence(self):
+        random.seed(2)
+        ref = []
+        Simulation(bench(ram_list, ref)).run(quiet=QUIET)
+        random.seed(2)
+        res = []
+        Simulation(bench(ram_mem, res)).run(quiet=QUIET)
+        self.assertEqual(res, ref)
+
+    def testWriteTracking(self):
+        mem = MemorySignal(intbv(0)[8:], 8)
+        @instance
+        def stimulus():
+            mem[3].next = 0
+            mem[5].next = 7
+            yield delay(10)
+            self.assertEqual(mem[5], 7)
+            self.assertEqual(mem.writtenAddresses(), [3, 5])
+            self.assert_(mem.isWritten(3))
+            self.assert_(not mem.isWritten(4))
+        Simulation(stimulus).run(quiet=QUIET)
+        # simulation end restores the initial state
+        self.assertEqual(mem.writtenAddresses(), [])
+        self.assertEqual(mem[5], 0)
+
+    def testDelta(self):
+        mem = MemorySignal(intbv(0)[8:], 8)
+        @instance
+        def writer():
+            mem[1].next = 5
+            self.assertEqual(mem[1], 0)
+            yield mem
+            self.assertEqual(mem[1], 5)
+            self.assertEqual(now(), 0)
+        Simulation(writer).run(quiet=QUIET)
+
+    def testBounds(self):
+        mem = MemorySignal(intbv(0)[4:], 8)
+        try:
+            mem[0].next = 16
+        except ValueError:
+            pass
+        else:
+            self.fail()
+        mmem = MemorySignal(modbv(0, min=0, max=16), 8)
+        mmem[0].next = 17
+        self.assertEqual(mmem._pending[0], 1)
+
+    def testTrace(self):
+        def top():
+            mem = MemorySignal(intbv(0)[8:], 4)
+            @instance
+            def logic():
+                yield delay(10)
+                mem[2].next = 0x55
+                yield delay(10)
+            return logic
+        try:
+            Simulation(traceSignals(top)).run(quiet=QUIET)
+            vcd = open("top.vcd").read()
+            self.assert_("mem(2)" in vcd)
+            self.assert_("b01010101 #" in vcd.split("#10")[1])
+        finally:
+            if _simulator._tracing:
+                _simulator._tf.close()
+                _simulator._tracing = 0
+            for p in glob.glob("top.vcd*"):
+                os.remove(p)
+
+    def testConversion(self):
+        dout = Signal(intbv(0)[8:])
+        din = Signal(intbv(0)[8:])
+        addr = Signal(intbv(0)[4:])
+        we = Signal(bool(0))
+        clk = Signal(bool(0))
+        for conv, ext in ((toVerilog, ".v"), (toVHDL, ".vhd")):
+            codes = []
+            for ram in (ram_list, ram_mem):
+                conv.name = "memsig"
+                conv(ram, dout, din, addr, we, clk)
+                lines = open("memsig" + ext).readlines()
+                codes.append([l for l in lines if "Date" not in l])
+                for p in glob.glob("*memsig" + ext):
+                    os.remove(p)
+            conv.name = None
+            self.assertEqual(codes[0], codes[1])
+        for p in glob.glob("pck_myhdl_*.vhd"):
+            os.remove(p)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -33,7 +33,7 @@ import unittest
 from unittest import TestCase
 
 from myhdl._simulator import _siglist
-from myhdl import intbv, Signal
+from myhdl import intbv, modbv, Signal
 
         
 class SigTest(TestCase):
@@ -631,7 +631,122 @@ class TestSignalIntbvBounds(TestCase):
                 pass
             else:
                 self.fail()
-            
+
+    def testNextAssign(self):
+        for bv in (intbv(0, min=-24, max=34), intbv(0)[8:], intbv(0, min=-8, max=8)):
+            s = Signal(bv)
+            for v in (bv.min, bv.max-1, 0, intbv(1)):
+                s.next = v
+                self.assertEqual(s.next, v)
+            for v in (bv.min-1, bv.max, bv.max + 100):
+                self.assertRaises(ValueError, setattr, s, 'next', v)
+        s = Signal(intbv(0))
+        s.next = -2**70
+        self.assertEqual(s.next, -2**70)
+        self.assertRaises(TypeError, setattr, s, 'next', 1.5)
+
+
+class TestSignalModbvBounds(TestCase):
+
+    def testNextAssign(self):
+        for bv in (modbv(0, min=0, max=256), modbv(0, min=-8, max=8), modbv(0, min=-3, max=5),
+                   modbv(0, min=0, max=1), modbv(0)):
+            s = Signal(bv)
+            for v in range(-300, 300, 7) + [2**70 + 5, -2**70 - 3]:
+                s.next = v
+                ref = modbv(v, min=bv.min, max=bv.max)
+                self.assertEqual(s.next, ref)
+                s.next = intbv(v)
+                self.assertEqual(s.next, ref)
+        self.assertRaises(TypeError, setattr, s, 'next', 1.5)
+
+
+class TestSignalVectorValue(TestCase):
+
+    """ Signals with a sized, full range value keep it as an integer. """
+
+    def setUp(self):
+        self.bvs = [intbv(5)[8:], intbv(-3, min=-8, max=8),
+                    modbv(200)[8:], modbv(-100, min=-128, max=128)]
+
+    def update(self, s):
+        del _siglist[:]
+        return s._update()
+
+    def testVal(self):
+        for bv in self.bvs:
+            s = Signal(bv)
+            v = s.val
+            self.assertTrue(type(v) is type(bv))
+            self.assertEqual(v, bv)
+            self.assertEqual((v.min, v.max, len(v)), (bv.min, bv.max, len(bv)))
+            self.assertEqual(repr(s), "Signal(%r)" % bv)
+            self.assertEqual(str(s), str(bv))
+            self.assertEqual(s.signed(), bv.signed())
+
+    def testNextModify(self):
+        s = Signal(intbv(0)[8:])
+        s.next[3] = 1
+        s.next[8:6] = 3
+        self.assertEqual(s.next, 0xc8)
+        self.assertEqual(s, 0)
+        self.update(s)
+        self.assertEqual(s, 0xc8)
+        s.next[3] = 0
+        s.next = 7
+        self.update(s)
+        self.assertEqual(s, 7)
+        self.assertRaises(ValueError, s.next.__setitem__, slice(4, 0), 16)
+
+    def testUpdate(self):
+        s = Signal(intbv(0)[4:])
+        s.next = 0
+        self.assertEqual(self.update(s), [])
+        s.next = 9
+        self.update(s)
+        self.assertEqual(s.val, 9)
+        self.assertEqual(s.val._val, 9)
+        s._clear()
+        self.assertEqual(s.val, 0)
+        self.assertEqual(s.next, 0)
+
+    def testOperators(self):
+        for bv in self.bvs:
+            s = Signal(bv)
+            for op in (operator.getitem, operator.and_, operator.or_,
+                       operator.xor, operator.lshift, operator.rshift,
+                       operator.add, operator.sub, operator.mul):
+                for i in (0, 1, 3, intbv(2)):
+                    self.assertEqual(op(s, i), op(bv, i))
+                    self.assertEqual(type(op(s, i)), type(op(bv, i)))
+            for op in (operator.and_, operator.or_, operator.xor,
+                       operator.add, operator.sub):
+                self.assertEqual(op(6, s), op(6, bv))
+                self.assertEqual(type(op(6, s)), type(op(6, bv)))
+            self.assertEqual(s[6:2], bv[6:2])
+            self.assertEqual(type(s[6:2]), type(bv[6:2]))
+            self.assertEqual(~s, ~bv)
+            self.assertEqual(type(~s), type(~bv))
+            self.assertEqual(s, bv)
+            self.assertEqual(s, Signal(bv))
+            self.assertEqual(s, intbv(int(bv)))
+            self.assertTrue(s < bv + 1)
+
+    def testInvertSigned(self):
+        for bv in (intbv(0, min=-8, max=8), modbv(5, min=-8, max=8),
+                   intbv(0)[4:]):
+            s = Signal(bv)
+            self.assertEqual(~s, ~bv)
+            self.assertEqual(type(~s), type(~bv))
+        self.assertEqual(~Signal(intbv(0, min=-8, max=8)), -1)
+
+    def testAttributes(self):
+        s = Signal(intbv(5)[8:])
+        self.assertEqual(s.signed(), 5)
+        self.assertFalse(hasattr(s, '_waiter'))
+        self.assertRaises(AttributeError, getattr, s, '_nosuchattr')
+        self.assertRaises(AttributeError, getattr, s, 'nosuchattr')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -27,7 +27,7 @@ from random import randrange
 random.seed(1) # random, but deterministic
 
 from myhdl import Simulation, SimulationError, now, delay, StopSimulation, join
-from myhdl import Signal, intbv
+from myhdl import Signal, intbv, always
 from myhdl._Simulation import _error
 
 from myhdl._simulator import _siglist
@@ -868,7 +868,93 @@ class TimeZeroEvents(TestCase):
         Simulation(testBench).run(quiet=QUIET)
 
 
-        
+class WaiterReuse(TestCase):
+
+    """ Check that waiters on several clauses don't pile up in waiter lists """
+
+    def bench(self, clk, rst, counts, edges):
+        def clkgen():
+            for i in range(2*edges):
+                yield delay(5)
+                clk.next = not clk
+            raise StopSimulation
+        def edgeTuple():
+            while 1:
+                yield clk.posedge, rst.negedge
+                counts[0] += 1
+        def mixed():
+            while 1:
+                yield clk.posedge, rst.negedge, delay(1000)
+                counts[1] += 1
+        def check():
+            while 1:
+                yield clk.negedge
+                self.assert_(len(rst._negedgeWaiters) <= 2)
+                self.assert_(len(clk._posedgeWaiters) <= 2)
+        return clkgen(), edgeTuple(), mixed(), check()
+
+    def testNoGrowth(self):
+        """ Reused triggers on tuple yields """
+        clk, rst = Signal(bool(0)), Signal(bool(1))
+        counts = [0, 0]
+        Simulation(self.bench(clk, rst, counts, 50)).run(quiet=QUIET)
+        self.assertEqual(counts, [50, 50])
+
+    def testJoinOnce(self):
+        """ A join resumes once, after all its clauses """
+        a, b = Signal(0), Signal(0)
+        resumed = []
+        def stimulus():
+            for i in range(1, 5):
+                a.next = i
+                yield delay(10)
+                a.next = i + 10
+                b.next = i
+                yield delay(10)
+        def response():
+            while 1:
+                yield join(a, b)
+                resumed.append(now())
+        Simulation(stimulus(), response()).run(quiet=QUIET)
+        self.assertEqual(resumed, [10, 30, 50, 70])
+
+    def testNewSimulation(self):
+        """ Reused triggers in a new simulation with the same instance """
+        clk, rst = Signal(bool(0)), Signal(bool(1))
+        counts = [0]
+        @always(clk.posedge, rst.negedge)
+        def logic():
+            counts[0] += 1
+        def clkgen(edges):
+            for i in range(2*edges):
+                yield delay(5)
+                clk.next = not clk
+            raise StopSimulation
+        Simulation(logic, clkgen(10)).run(quiet=QUIET)
+        self.assertEqual(counts[0], 10)
+        Simulation(logic, clkgen(10)).run(quiet=QUIET)
+        self.assert_(counts[0] >= 20)
+
+    def testAlternatingTuples(self):
+        """ Alternating tuple yields on signals that don't change """
+        a, b, c, d = [Signal(0) for i in range(4)]
+        def stimulus():
+            for i in range(1, 1000):
+                b.next = i
+                yield delay(10)
+                d.next = i
+                yield delay(10)
+        def response():
+            while 1:
+                yield a, b
+                yield c, d
+        sim = Simulation(stimulus(), response())
+        sim.run(10000, quiet=QUIET)
+        self.assert_(len(a._eventWaiters) <= 1)
+        self.assert_(len(c._eventWaiters) <= 1)
+        sim.run(quiet=QUIET)
+
+
 if __name__ == "__main__":
     unittest.main()
                 
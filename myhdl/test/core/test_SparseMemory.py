@@ -0,0 +1,174 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Run the unit tests for SparseMemory """
+
+
+import os
+import struct
+
+import unittest
+from unittest import TestCase
+
+from myhdl import Signal, ResetSignal, Simulation, StopSimulation, intbv, \
+                  delay, instance, always, SparseMemory, SparseMemoryError
+from myhdl._SparseMemory import _error
+
+QUIET=1
+
+GIGA = 1 << 30
+
+
+class TestSparseMemory(TestCase):
+
+    def setUp(self):
+        self.path = "sparse_test.bin"
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def testReadWrite(self):
+        mem = SparseMemory(intbv(0)[32:], GIGA)
+        mem.write(0x12345678, 0xdeadbeef)
+        mem[GIGA-1] = 7
+        self.assertEqual(mem.read(0x12345678), 0xdeadbeef)
+        self.assertEqual(mem[GIGA-1], 7)
+        self.assertEqual(mem[0x100], 0)
+        self.assertEqual(mem.residentPages(), [0x12345678 >> 12, (GIGA-1) >> 12])
+        stats = mem.stats()
+        self.assertEqual(stats['writes'], 2)
+        self.assertEqual(stats['reads'], 3)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['faults'], 2)
+        self.assertEqual(stats['pages'], 2)
+        self.assertEqual(stats['bytes'], 2 * 4096 * 4)
+        mem.clearStats()
+        self.assertEqual(mem.stats()['reads'], 0)
+
+    def testBounds(self):
+        mem = SparseMemory(intbv(0)[8:], 1024)
+        self.assertRaises(ValueError, mem.write, 0, 256)
+        self.assertRaises(IndexError, mem.write, 1024, 0)
+        self.assertRaises(IndexError, mem.read, -1)
+        try:
+            SparseMemory(intbv(0)[8:], 1024, pagesize=1000)
+        except SparseMemoryError, e:
+            self.assertEqual(e.kind, _error.PageSize)
+        else:
+            self.fail()
+
+    def testStrict(self):
+        mem = SparseMemory(intbv(0)[8:], 1024, pagesize=16, strict=True)
+        mem[3] = 1
+        self.assertEqual(mem[3], 1)
+        for addr in (4, 100):
+            try:
+                mem[addr]
+            except SparseMemoryError, e:
+                self.assertEqual(e.kind, _error.Uninitialized)
+            else:
+                self.fail()
+
+    def testLoadDump(self):
+        words = [0x1111, 0, 0, 0, 0, 0, 0xffff]
+        f = open(self.path, 'wb')
+        f.write("xx" + struct.pack("<7H", *words))
+        f.close()
+        mem = SparseMemory(intbv(0)[16:], 1 << 20, pagesize=4)
+        n = mem.load(self.path, base=10, offset=2)
+        self.assertEqual(n, 7)
+        self.assertEqual([mem[i] for i in range(10, 17)], words)
+        # the all-zero page 3 is not allocated
+        self.assertEqual(mem.residentPages(), [2, 4])
+        mem.dump(self.path, start=8, stop=19)
+        data = open(self.path, 'rb').read()
+        self.assertEqual(struct.unpack("<11H", data), tuple([0, 0] + words + [0, 0]))
+
+    def testLoadOddWidth(self):
+        words = [0x123456, 0xfffffe, 0x000001]
+        f = open(self.path, 'wb')
+        for w in words:
+            f.write(struct.pack("<I", w)[:3])
+        f.close()
+        mem = SparseMemory(intbv(0, min=-2**23, max=2**23), 1024, pagesize=2)
+        mem.load(self.path)
+        self.assertEqual([mem[i] for i in range(3)], [0x123456, -2, 1])
+        mem.dump(self.path, stop=3)
+        self.assertEqual(open(self.path, 'rb').read(),
+                         "".join([struct.pack("<I", w)[:3] for w in words]))
+
+    def testLoadRange(self):
+        open(self.path, 'wb').write("\x01" * 8)
+        mem = SparseMemory(intbv(0)[8:], 4)
+        try:
+            mem.load(self.path)
+        except SparseMemoryError, e:
+            self.assertEqual(e.kind, _error.Range)
+        else:
+            self.fail()
+
+    def testDumpDefault(self):
+        mem = SparseMemory(intbv(0x5a)[8:], 64, pagesize=8)
+        mem[1] = 3
+        mem.dump(self.path, stop=10)
+        self.assertEqual(open(self.path, 'rb').read(), "\x5a\x03" + "\x5a" * 8)
+
+    def testPort(self):
+        clk = Signal(bool(0))
+        addr = Signal(intbv(0)[30:])
+        din = Signal(intbv(0)[16:])
+        dout = Signal(intbv(0)[16:])
+        we = Signal(bool(0))
+        en = Signal(bool(0))
+        reset = ResetSignal(0, active=1, async=False)
+        mem = SparseMemory(intbv(0)[16:], GIGA)
+        dut = mem.port(clk, addr, din, dout, we, en=en, reset=reset)
+        result = []
+        @always(delay(10))
+        def clkgen():
+            clk.next = not clk
+        @instance
+        def stimulus():
+            for a in (0x5, GIGA-2, 0x12345):
+                yield clk.negedge
+                addr.next = a
+                din.next = a & 0xffff
+                we.next = 1
+                en.next = 1
+            for a in (0x12345, 0x5, 0x6):
+                yield clk.negedge
+                addr.next = a
+                we.next = 0
+                yield clk.posedge
+                yield delay(1)
+                result.append(int(dout))
+            en.next = 0
+            reset.next = 1
+            yield clk.posedge
+            yield delay(1)
+            result.append(int(dout))
+            raise StopSimulation
+        Simulation(dut, clkgen, stimulus).run(quiet=QUIET)
+        self.assertEqual(result, [0x2345, 0x5, 0, 0])
+        self.assertEqual(len(mem.residentPages()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,12 +23,14 @@
 import test_Simulation, test_Signal, test_intbv, test_Cosimulation, test_misc, \
        test_always_comb, test_bin, test_traceSignals, test_enum, test_concat, \
        test_unparse, test_inferWaiter, test_always, test_instance, test_signed, \
-       test_modbv
+       test_modbv, test_waveform, test_MemorySignal, test_SparseMemory, test_block, \
+       test_sourcecache
 
 modules = (test_Simulation, test_Signal, test_intbv, test_misc, test_always_comb,
            test_bin, test_traceSignals, test_enum, test_concat,
            test_unparse, test_inferWaiter, test_always, test_instance, test_signed,
-           test_modbv
+           test_modbv, test_waveform, test_MemorySignal, test_SparseMemory, test_block,
+           test_sourcecache
           )
 
 import unittest
@@ -33,7 +33,7 @@ from myhdl import Signal, Simulation, instances, AlwaysCombError, \
 
 from myhdl._always_comb import always_comb, _AlwaysComb, _error
 
-from myhdl._Waiter import _Waiter,_SignalWaiter,_SignalTupleWaiter
+from myhdl._Waiter import _Waiter,_SignalWaiter,_SignalTupleWaiter,_CombWaiter
 
 
 QUIET=1
@@ -419,10 +419,86 @@ class InferWaiterTest(TestCase):
         sim.run()
         
     def testSignalTuple1(self):
-        sim = Simulation(self.bench(SignalTupleGen1, _SignalTupleWaiter))
+        sim = Simulation(self.bench(SignalTupleGen1, _CombWaiter))
         sim.run()
 
 
+class CombWaiterTest(TestCase):
+
+    def bench(self, n=32):
+        ins = [Signal(bool(0)) for i in range(n)]
+        sel = Signal(intbv(0, min=0, max=n))
+        z = Signal(bool(0))
+        runs = [0]
+
+        @always_comb
+        def mux():
+            runs[0] += 1
+            z.next = ins[sel]
+
+        def stimulus():
+            yield delay(10)
+            runs[0] = 0
+            for i in range(n):
+                sel.next = i
+                for s in ins:
+                    s.next = not s
+                yield delay(10)
+                self.assertEqual(z, ins[i])
+                self.assertEqual(runs[0], i + 1)
+                for s in ins + [sel]:
+                    self.assertEqual(len(s._eventWaiters), 0)
+            raise StopSimulation
+
+        return mux, stimulus(), ins, runs
+
+    def testOncePerDelta(self):
+        mux, stim, ins, runs = self.bench()
+        self.assertEqual(type(mux.waiter), _CombWaiter)
+        Simulation(mux, stim).run(quiet=QUIET)
+
+    def testNewSimulation(self):
+        mux, stim, ins, runs = self.bench()
+        Simulation(mux, stim).run(quiet=QUIET)
+        # the process is not part of the new simulation
+        def stimulus():
+            for s in ins:
+                s.next = not s
+            yield delay(10)
+            raise StopSimulation
+        runs[0] = 0
+        Simulation(stimulus()).run(quiet=QUIET)
+        self.assertEqual(runs[0], 0)
+        # but it runs again when it is
+        def stimulus2():
+            yield delay(10)
+            runs[0] = 0
+            for s in ins:
+                s.next = not s
+            yield delay(10)
+            raise StopSimulation
+        Simulation(mux, stimulus2()).run(quiet=QUIET)
+        self.assertEqual(runs[0], 1)
+
+    def testViewsRemoved(self):
+        a, b, z = [Signal(bool(0)) for i in range(3)]
+        # a new process on the same signals in each simulation
+        for i in range(3):
+            @always_comb
+            def andgate():
+                z.next = a and b
+            def stimulus():
+                a.next = 1
+                b.next = 1
+                yield delay(10)
+                self.assertEqual(z, 1)
+                for s in (a, b):
+                    self.assertEqual(s._views, [andgate.waiter])
+                raise StopSimulation
+            Simulation(andgate, stimulus()).run(quiet=QUIET)
+            for s in (a, b):
+                self.assertEqual(s._views, [])
+
 
 if __name__ == "__main__":
     unittest.main()
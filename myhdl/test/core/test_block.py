@@ -0,0 +1,208 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Run the unit tests for the block decorator """
+
+
+import os
+import sys
+import tempfile
+
+import unittest
+from unittest import TestCase
+
+from myhdl import *
+from myhdl import ExtractHierarchyError
+from myhdl._extractHierarchy import _HierExtr
+from myhdl._Cosimulation import Cosimulation
+from myhdl import _simulator
+
+QUIET=1
+
+@block
+def inc(count, enable, clock, n=16):
+    @always(clock.posedge)
+    def logic():
+        if enable:
+            count.next = (count + 1) % n
+    return logic
+
+@block
+def pair(a, b, enable, clock):
+    t = Signal(intbv(0)[4:])
+    u1 = inc(a, enable, clock)
+    u2 = inc(b, enable, clock)
+    @always_comb
+    def comb():
+        t.next = a ^ b
+    return u1, u2, comb
+
+@block
+def buf(a, b):
+    @always_comb
+    def logic():
+        b.next = a
+    return logic
+
+def helper(a, b):
+    # not a block: its generators belong to the calling block
+    @always_comb
+    def logic():
+        b.next = a
+    return logic
+
+@block
+def top(q, enable, clock):
+    a = Signal(intbv(0)[4:])
+    b = Signal(intbv(0)[4:])
+    mem = [Signal(intbv(0)[4:]) for i in range(2)]
+    p = pair(a, b, enable, clock)
+    incs = [inc(mem[i], enable, clock) for i in range(2)]
+    h = buf(a, q)
+    return p, incs, h
+
+@block
+def flat(q, enable, clock):
+    a = Signal(intbv(0)[4:])
+    u = inc(a, enable, clock)
+    h = helper(a, q)
+    return u, h
+
+
+# cosimulator that only registers its signals
+_cosimScript = """
+import os
+wt = int(os.environ['MYHDL_TO_PIPE'])
+rf = int(os.environ['MYHDL_FROM_PIPE'])
+os.write(wt, "TO 0 q 4")
+os.read(rf, 2)
+os.write(wt, "START")
+os.read(rf, 2)
+"""
+
+@block
+def cosimtop(q, d, exe):
+    t = Signal(intbv(0)[4:])
+    return Cosimulation(exe, q=q, d=d, t=t)
+
+
+def summary(h):
+    insts = []
+    for inst in h.hierarchy:
+        insts.append((inst.level, inst.name, inst.func,
+                      sorted(inst.sigdict), sorted(inst.memdict),
+                      sorted(inst.argdict), sorted([n for n, s in inst.subs])))
+    return insts, sorted(h.absnames.values())
+
+
+class TestBlock(TestCase):
+
+    def setUp(self):
+        self.q = Signal(intbv(0)[4:])
+        self.enable = Signal(bool(1))
+        self.clock = Signal(bool(0))
+
+    def testWrapper(self):
+        self.assertEqual(top.__name__, "top")
+        self.assertEqual(top.func_name, "top")
+        try:
+            block(1)
+        except ExtractHierarchyError:
+            pass
+        else:
+            self.fail()
+
+    def testNoProfile(self):
+        profiled = []
+        def hook(frame, event, arg):
+            profiled.append(frame.f_code.co_name)
+        # extraction through blocks doesn't install its own profile hook
+        sys.setprofile(hook)
+        try:
+            h = _HierExtr("top", top, self.q, self.enable, self.clock)
+        finally:
+            sys.setprofile(None)
+        self.assert_("top" in profiled)
+        self.assertEqual(sys.getprofile(), None)
+
+    def testSameHierarchy(self):
+        args = (self.q, self.enable, self.clock)
+        hb = _HierExtr("top", top, *args)
+        hp = _HierExtr("top", top._blockFunc, *args)
+        self.assertEqual(summary(hb), summary(hp))
+        levels = [(inst.level, inst.name) for inst in hb.hierarchy]
+        self.assertEqual(levels, [(1, "top"), (2, "h"), (2, "incs_1"), (2, "incs_0"),
+                                  (2, "p"), (3, "u2"), (3, "u1")])
+
+    def testCosimulation(self):
+        # a block that only returns a cosimulation keeps its signals
+        fd, script = tempfile.mkstemp(suffix=".py")
+        os.write(fd, _cosimScript)
+        os.close(fd)
+        exe = "%s %s" % (sys.executable, script)
+        d = Signal(intbv(0)[4:])
+        hs = []
+        try:
+            for func in (cosimtop, cosimtop._blockFunc):
+                h = _HierExtr("cosimtop", func, self.q, d, exe)
+                hs.append(h)
+                cosim = h.top
+                _simulator._cosim = 0
+                os.close(cosim._rt)
+                os.close(cosim._wf)
+                os.waitpid(cosim._child_pid, 0)
+        finally:
+            _simulator._cosim = 0
+            os.remove(script)
+        self.assertEqual(summary(hs[0]), summary(hs[1]))
+        self.assertEqual(sorted(hs[0].hierarchy[0].sigdict), ["d", "q", "t"])
+
+    def testFlatten(self):
+        h = _HierExtr("flat", flat, self.q, self.enable, self.clock)
+        self.assertEqual([inst.name for inst in h.hierarchy], ["flat", "u"])
+        self.assertEqual(sorted(h.hierarchy[0].sigdict), ["a", "clock", "enable", "q"])
+
+    def testSimulation(self):
+        def bench():
+            dut = top(self.q, self.enable, self.clock)
+            @instance
+            def stimulus():
+                for i in range(10):
+                    yield delay(10)
+                    self.clock.next = not self.clock
+                raise StopSimulation
+            return dut, stimulus
+        Simulation(traceSignals(bench)).run(quiet=QUIET)
+        vcd = open("bench.vcd").read()
+        os.remove("bench.vcd")
+        self.assert_("$scope module u1 $end" in vcd)
+
+    def testConversion(self):
+        args = (self.q, self.enable, self.clock)
+        codes = []
+        for func in (top, top._blockFunc):
+            toVerilog(func, *args)
+            codes.append([l for l in open("top.v") if "Date" not in l])
+            os.remove("top.v")
+            os.remove("tb_top.v")
+        self.assertEqual(codes[0], codes[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
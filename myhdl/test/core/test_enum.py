@@ -30,7 +30,7 @@ import copy
 import unittest
 from unittest import TestCase
 
-from myhdl import enum
+from myhdl import enum, Signal
 
 
 t_State = enum("SEARCH", "CONFIRM", "SYNC")
@@ -82,6 +82,24 @@ class TestEnum(TestCase):
         self.assert_(e == t_State.SEARCH)
         self.assert_(e != t_State.CONFIRM)
 
+    def testCompare(self):
+        s = Signal(t_State.CONFIRM)
+        self.assert_(s == t_State.CONFIRM)
+        self.assert_(t_State.CONFIRM == s)
+        self.assert_(s != t_State.SYNC)
+        self.assert_(not (s != t_State.CONFIRM))
+        for other in (t_Homograph.CONFIRM, Signal(t_Homograph.CONFIRM), 1, None):
+            self.assertRaises(TypeError, lambda: t_State.CONFIRM == other)
+            self.assertRaises(TypeError, lambda: t_State.CONFIRM != other)
+
+    def testCodes(self):
+        self.assertEqual([hex(getattr(t_State, n)) for n in t_State._names],
+                         ["0x0", "0x1", "0x2"])
+        t = enum("A", "B", "C", encoding="one_hot")
+        self.assertEqual([t.A._code, t.B._code, t.C._code], [1, 2, 4])
+        t = enum("A", "B", "C", encoding="one_cold")
+        self.assertEqual([t.A._code, t.B._code, t.C._code], [6, 5, 3])
+
 
 if __name__ == "__main__":
     unittest.main()
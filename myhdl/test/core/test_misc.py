@@ -24,6 +24,8 @@ import random
 from random import randrange
 random.seed(1) # random, but deterministic
 from types import GeneratorType
+import sys
+import subprocess
 
 import unittest
 from unittest import TestCase
@@ -74,5 +76,28 @@ class InstancesTest(TestCase):
             self.assert_(e in i)
 
 
+_lazyScript = """
+import sys
+from myhdl import *
+import myhdl
+lazy = ("myhdl.conversion", "myhdl._traceSignals", "myhdl._Cosimulation")
+print [m for m in lazy if m in sys.modules]
+print isinstance(1, Cosimulation), "toVerilog" in myhdl.__all__
+toVHDL.name = "top"
+print toVHDL.name, myhdl.toVHDL is sys.modules["myhdl.conversion"].toVHDL
+"""
+
+class LazyImportTest(TestCase):
+
+    def testLazyImport(self):
+        # run in a fresh interpreter, as the test suite imports everything
+        p = subprocess.Popen([sys.executable, "-c", _lazyScript],
+                             stdout=subprocess.PIPE)
+        out = p.communicate()[0].split("\n")
+        self.assertEqual(out[0], "[]")
+        self.assertEqual(out[1], "False True")
+        self.assertEqual(out[2], "top True")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,135 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Run the unit tests for the source cache """
+
+
+import os
+import sys
+import shutil
+import tempfile
+import ast
+
+import unittest
+from unittest import TestCase
+
+from myhdl import Signal, Simulation, intbv, delay, instance, always_comb, \
+                  sourceCache, toVerilog
+
+
+def design(a, b, c):
+
+    @always_comb
+    def logic():
+        c.next = a + b
+
+    @instance
+    def stimulus():
+        for i in range(4):
+            a.next = i
+            yield delay(10)
+
+    return logic, stimulus
+
+_source = '''
+def f(x):
+    return '%s'
+'''
+
+
+class TestSourceCache(TestCase):
+
+    def setUp(self):
+        sourceCache.clear()
+
+    def signals(self):
+        return Signal(intbv(0)[4:]), Signal(intbv(0)[4:]), Signal(intbv(0)[5:])
+
+    def testStats(self):
+        self.assertEqual(sourceCache.stats(), dict(hits=0, misses=0, entries=0))
+        Simulation(design(*self.signals()))
+        self.assertEqual(sourceCache.stats(), dict(hits=0, misses=2, entries=2))
+        Simulation(design(*self.signals()))
+        self.assertEqual(sourceCache.stats(), dict(hits=2, misses=2, entries=2))
+        sourceCache.clearStats()
+        self.assertEqual(sourceCache.stats(), dict(hits=0, misses=0, entries=2))
+        sourceCache.clear()
+        self.assertEqual(sourceCache.stats(), dict(hits=0, misses=0, entries=0))
+
+    def testConversion(self):
+        a, b, c = self.signals()
+        Simulation(design(a, b, c))
+        toVerilog.name = "srccache_design"
+        try:
+            toVerilog(design, a, b, c)
+        finally:
+            toVerilog.name = None
+            for p in ("srccache_design.v", "tb_srccache_design.v"):
+                if os.path.exists(p):
+                    os.remove(p)
+        stats = sourceCache.stats()
+        # the elaboration for conversion finds the sources in the cache
+        self.assertEqual(stats['entries'], 3)
+        self.assertEqual(stats['misses'], 3)
+
+    def testTrees(self):
+        tree = sourceCache._getTree(design)
+        self.assert_(sourceCache._getTree(design) is tree)
+        t1 = sourceCache._parse(design)
+        t2 = sourceCache._parse(design)
+        self.assert_(t1 is not tree and t2 is not t1)
+        self.assertEqual(t1.sourcefile, design.func_code.co_filename)
+        self.assertEqual(t1.lineoffset, design.func_code.co_firstlineno - 1)
+        self.assertEqual(sourceCache.stats()['misses'], 1)
+
+    def testSharedTreeUnchanged(self):
+        logic, stimulus = design(*self.signals())
+        Simulation(logic, stimulus)
+        # waiter inference doesn't annotate the shared tree
+        tree = sourceCache._getTree(stimulus.gen.gi_frame)
+        for node in ast.walk(tree):
+            self.assert_(not hasattr(node, 'kind'))
+
+    def testModified(self):
+        d = tempfile.mkdtemp()
+        path = os.path.join(d, 'cached_mod.py')
+        sys.path.insert(0, d)
+        try:
+            f = open(path, 'w')
+            f.write(_source % "one")
+            f.close()
+            os.utime(path, (1000000, 1000000))
+            import cached_mod
+            self.assert_("'one'" in sourceCache._getSource(cached_mod.f))
+            self.assert_("'one'" in sourceCache._getSource(cached_mod.f))
+            self.assertEqual(sourceCache.stats()['hits'], 1)
+            f = open(path, 'w')
+            f.write(_source % "two")
+            f.close()
+            os.utime(path, (2000000, 2000000))
+            self.assert_("'two'" in sourceCache._getSource(cached_mod.f))
+            self.assertEqual(sourceCache.stats()['misses'], 2)
+        finally:
+            sys.path.remove(d)
+            sys.modules.pop('cached_mod', None)
+            shutil.rmtree(d)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -31,9 +31,12 @@ import unittest
 from unittest import TestCase
 import shutil
 import glob
+import gzip
+import subprocess
 
-from myhdl import delay, Signal, Simulation, _simulator, instance
+from myhdl import delay, Signal, Simulation, _simulator, instance, now, enum
 from myhdl._traceSignals import traceSignals, TraceSignalsError, _error
+from myhdl._lazy import _LazyObject
 
 QUIET=1
 
@@ -59,6 +62,13 @@ def top():
     inst = traceSignals(fun)
     return inst
 
+# the public traceSignals, as bound by 'from myhdl import *'
+publicTraceSignals = _LazyObject("myhdl._traceSignals", "traceSignals")
+
+def toppub():
+    inst = publicTraceSignals(fun)
+    return inst
+
 def top2():
     inst = [{} for i in range(4)]
     j = 3
@@ -70,6 +80,43 @@ def top3():
     inst_2 = traceSignals(fun)
     return inst_1, inst_2
 
+def sub(clk, count, en):
+    @instance
+    def logic():
+        while 1:
+            yield clk.posedge
+            count.next = count + 1
+            en.next = 20 <= now() < 60
+    return logic
+
+t_State = enum("IDLE", "RUN")
+
+def fsm():
+    clk = Signal(bool(0))
+    state = Signal(t_State.IDLE)
+    gen_inst = gen(clk)
+    @instance
+    def logic():
+        while 1:
+            yield clk.posedge
+            if state == t_State.IDLE:
+                state.next = t_State.RUN
+            else:
+                state.next = t_State.IDLE
+    return gen_inst, logic
+
+wintopSigs = {}
+
+def wintop():
+    clk = Signal(bool(0))
+    count = Signal(0)
+    en = Signal(bool(0))
+    data = Signal(bool(1))
+    wintopSigs.update(clk=clk, count=count)
+    gen_inst = gen(clk)
+    sub_inst = sub(clk, count, en)
+    return gen_inst, sub_inst
+
 
 
 
@@ -87,6 +134,9 @@ class TestTraceSigs(TestCase):
             _simulator._tracing = 0
         for p in paths:
             os.remove(p)
+        traceSignals.filter = traceSignals.depth = None
+        traceSignals.start = traceSignals.stop = traceSignals.trigger = None
+        traceSignals.compress = False
 
 ##     def testTopName(self):
 ##         p = "dut.vcd"
@@ -138,6 +188,18 @@ class TestTraceSigs(TestCase):
         self.assert_(path.exists(pdut))
         self.assert_(not path.exists(psub))
 
+    def testHierarchicalTracePublic(self):
+        """ The public traceSignals adds no hierarchy level """
+        def scopes(name):
+            _simulator._tf.close()
+            _simulator._tracing = 0
+            return [l for l in open(name).read().splitlines() if "scope" in l]
+        traceSignals(top)
+        expected = scopes("top.vcd")
+        publicTraceSignals(toppub)
+        self.assertEqual(scopes("toppub.vcd"), [l.replace("top", "toppub")
+                                                 for l in expected])
+
     def testBackupOutputFile(self):
         p = "%s.vcd" % fun.func_name
         dut = traceSignals(fun)
@@ -155,6 +217,96 @@ class TestTraceSigs(TestCase):
         self.assert_(path.getsize(pbak) == size)
         self.assert_(path.getsize(p) < size)
 
+    def _vars(self):
+        return [l.split()[4] for l in open("wintop.vcd") if l.startswith("$var")]
+
+    def _trace(self):
+        dut = traceSignals(wintop)
+        Simulation(dut).run(100, quiet=QUIET)
+        _simulator._tf.close()
+        _simulator._tracing = 0
+        return open("wintop.vcd").read()
+
+    def testFilter(self):
+        traceSignals.filter = ["wintop.c*", "*.en"]
+        self._trace()
+        self.assertEqual(sorted(self._vars()), ["clk", "count", "en", "en"])
+
+    def testFilterNotTraced(self):
+        traceSignals.filter = "wintop.clk"
+        traceSignals(wintop)
+        self.assertEqual(wintopSigs['clk']._tracing, 1)
+        self.assertEqual(wintopSigs['count']._tracing, 0)
+
+    def testDepth(self):
+        traceSignals.depth = 1
+        vcd = self._trace()
+        self.assertEqual(sorted(self._vars()), ["clk", "count", "data", "en"])
+        self.assert_("$scope module sub_inst" not in vcd)
+
+    def testWindow(self):
+        traceSignals.start = 30
+        traceSignals.stop = 70
+        vcd = self._trace()
+        self.assert_("$dumpvars" not in vcd)
+        head, body = vcd.split("$dumpon")
+        self.assert_("#10" in head)
+        self.assert_("\n1" not in head.split("$enddefinitions")[1])
+        on, off = body.split("$dumpoff")
+        self.assert_("#50" in on)
+        self.assertEqual(off.count("\n0"), 0)
+
+    def testTrigger(self):
+        traceSignals.trigger = "wintop.en"
+        vcd = self._trace()
+        self.assertEqual(vcd.count("$dumpon"), 1)
+        self.assertEqual(vcd.count("$dumpoff"), 1)
+        self.assert_(vcd.index("#30") < vcd.index("$dumpon") < vcd.index("#40"))
+        self.assert_(vcd.index("#70") < vcd.index("$dumpoff"))
+
+    def testWindowAndTrigger(self):
+        traceSignals.start = 10
+        traceSignals.trigger = "wintop.en"
+        try:
+            traceSignals(wintop)
+        except TraceSignalsError, e:
+            self.assertEqual(e.kind, _error.WindowAndTrigger)
+        else:
+            self.fail()
+
+    def testCompress(self):
+        plain = self._trace()
+        traceSignals.compress = True
+        self._trace()
+        compressed = gzip.open("wintop.vcd.gz").read()
+        self.assertEqual(compressed.split("$end", 2)[2], plain.split("$end", 2)[2])
+
+    def testCompressAtExit(self):
+        """ A suspended simulation leaves a complete compressed file """
+        script = "\n".join([
+            "from myhdl import Simulation, traceSignals",
+            "from test_traceSignals import wintop",
+            "traceSignals.compress = True",
+            "Simulation(traceSignals(wintop)).run(100, quiet=1)",
+            ])
+        env = dict(os.environ)
+        root = path.dirname(path.dirname(path.abspath(_simulator.__file__)))
+        here = path.dirname(path.abspath(__file__))
+        env["PYTHONPATH"] = os.pathsep.join([root, here])
+        subprocess.check_call([sys.executable, "-c", script], env=env)
+        vcd = gzip.open("wintop.vcd.gz").read()
+        self.assert_("#100" in vcd)
+
+    def testEnum(self):
+        dut = traceSignals(fsm)
+        Simulation(dut).run(45, quiet=QUIET)
+        _simulator._tf.close()
+        _simulator._tracing = 0
+        vcd = open("fsm.vcd").read()
+        code = vcd.split(" state $end")[0].split()[-1]
+        self.assert_("$var real 1 %s state $end" % code in vcd)
+        values = [l.split()[0] for l in vcd.splitlines() if l.endswith(" " + code)]
+        self.assertEqual(values, ["sIDLE", "sRUN", "sIDLE"])
 
 
 if __name__ == "__main__":
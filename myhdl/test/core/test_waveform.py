@@ -0,0 +1,171 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2013 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Run the unit tests for Waveform """
+
+
+import os
+path = os.path
+import glob
+
+import unittest
+from unittest import TestCase
+
+from myhdl import Signal, Simulation, StopSimulation, intbv, delay, \
+                  instance, always, traceSignals, Waveform, WaveformError, \
+                  _simulator
+from myhdl import _waveform
+from myhdl._waveform import _error
+
+QUIET=1
+
+def counter(clk, count):
+    @always(clk.posedge)
+    def logic():
+        count.next = (count + 1) % 16
+    return logic
+
+def wavetop():
+    clk = Signal(bool(0))
+    count = Signal(intbv(0)[4:])
+    mem = [Signal(intbv(0)[4:]) for i in range(2)]
+    dut = counter(clk, count)
+    @instance
+    def stimulus():
+        for i in range(20):
+            yield delay(10)
+            clk.next = not clk
+            mem[i % 2].next = i % 16
+        raise StopSimulation
+    return dut, stimulus
+
+
+class TestWaveform(TestCase):
+
+    def setUp(self):
+        self.cleanup()
+        dut = traceSignals(wavetop)
+        Simulation(dut).run(quiet=QUIET)
+        self.wave = Waveform("wavetop.vcd")
+
+    def tearDown(self):
+        self.wave.close()
+        self.cleanup()
+
+    def cleanup(self):
+        if _simulator._tracing:
+            _simulator._tf.close()
+            _simulator._tracing = 0
+        for p in glob.glob("wavetop.vcd*"):
+            os.remove(p)
+
+    def testNames(self):
+        names = self.wave.names()
+        self.assert_("wavetop.clk" in names)
+        self.assert_("wavetop.mem(1)" in names)
+        self.assert_("wavetop.dut.count" in names)
+        self.assertEqual(self.wave.width("wavetop.count"), 4)
+
+    def testValue(self):
+        w = self.wave
+        self.assertEqual(w.value("wavetop.clk", 0), 0)
+        self.assertEqual(w.value("wavetop.clk", 10), 1)
+        self.assertEqual(w.value("wavetop.clk", 15), 1)
+        self.assertEqual(w.value("wavetop.clk", 20), 0)
+        self.assertEqual(w.value("wavetop.count", 9), 0)
+        self.assertEqual(w.value("wavetop.count", 50), 3)
+        self.assertEqual(w.value("wavetop.mem(1)", 40), 3)
+
+    def testAlias(self):
+        w = self.wave
+        self.assertEqual(w.value("wavetop_dut_count", 50),
+                         w.value("wavetop.dut.count", 50))
+
+    def testChanges(self):
+        changes = self.wave.changes("wavetop.count", 20, 50)
+        self.assertEqual(changes, [(30, 2), (50, 3)])
+        changes = self.wave.changes("wavetop.count")
+        self.assertEqual(changes[:3], [(0, 0), (10, 1), (30, 2)])
+
+    def testEdges(self):
+        w = self.wave
+        self.assertEqual(w.edges("wavetop.clk", 10, 50), [10, 20, 30, 40, 50])
+        self.assertEqual(w.edges("wavetop.clk", 10, 50, "posedge"), [10, 30, 50])
+        self.assertEqual(w.edges("wavetop.clk", 11, 50, "negedge"), [20, 40])
+
+    def testReuseDb(self):
+        mtime = path.getmtime(self.wave.dbpath)
+        w = Waveform("wavetop.vcd")
+        self.assertEqual(path.getmtime(w.dbpath), mtime)
+        self.assertEqual(w.changes("wavetop.clk"), self.wave.changes("wavetop.clk"))
+        w.close()
+
+    def testChunks(self):
+        chunksize = _waveform._CHUNKSIZE
+        _waveform._CHUNKSIZE = 3
+        try:
+            w = Waveform("wavetop.vcd", "wavetop.vcd.chunks")
+        finally:
+            _waveform._CHUNKSIZE = chunksize
+        for name in self.wave.names():
+            self.assertEqual(w.changes(name), self.wave.changes(name))
+        w.close()
+
+    def testRebuildDb(self):
+        f = open(self.wave.dbpath, 'r+b')
+        f.write("garbage")
+        f.close()
+        # the invalid database is closed before it is rewritten
+        fds = len(os.listdir("/proc/self/fd"))
+        writeDb = _waveform._writeDb
+        written = []
+        def _writeDb(dbpath, *args):
+            written.append(len(os.listdir("/proc/self/fd")))
+            writeDb(dbpath, *args)
+        _waveform._writeDb = _writeDb
+        try:
+            w = Waveform("wavetop.vcd")
+        finally:
+            _waveform._writeDb = writeDb
+        # one more open file: the temporary file with the chunks
+        self.assertEqual(written, [fds + 1])
+        self.assertEqual(w.changes("wavetop.clk"), self.wave.changes("wavetop.clk"))
+        w.close()
+
+    def testCompressed(self):
+        traceSignals.compress = True
+        try:
+            Simulation(traceSignals(wavetop)).run(quiet=QUIET)
+        finally:
+            traceSignals.compress = False
+        w = Waveform("wavetop.vcd.gz")
+        self.assertEqual(w.changes("wavetop.count"), self.wave.changes("wavetop.count"))
+        w.close()
+
+    def testUndefinedName(self):
+        try:
+            self.wave.value("wavetop.nosuchsig", 0)
+        except WaveformError, e:
+            self.assertEqual(e.kind, _error.UndefinedName)
+        else:
+            self.fail()
+
+
+if __name__ == "__main__":
+    unittest.main()
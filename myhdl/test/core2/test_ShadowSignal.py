@@ -1,10 +1,13 @@
+import warnings
+
 from myhdl import *
+from myhdl._ShadowSignal import BusContentionWarning
 
-def bench_SliceSignal():
+def bench_SliceSignal(view=False):
     
     s = Signal(intbv(0)[8:])
-    a, b, c = s(7), s(5), s(0)
-    d, e, f, g = s(8,5), s(6,3), s(8,0), s(4,3)
+    a, b, c = s(7, view=view), s(5, view=view), s(0, view=view)
+    d, e, f, g = s(8,5,view), s(6,3,view), s(8,0,view), s(4,3,view)
 
     @instance
     def check():
@@ -25,15 +28,18 @@ def bench_SliceSignal():
 def test_SliceSignal():
     Simulation(bench_SliceSignal()).run()
 
+def test_SliceSignalView():
+    Simulation(bench_SliceSignal(view=True)).run()
+
 
-def bench_ConcatSignal():
+def bench_ConcatSignal(view=False):
     
     a = Signal(intbv(0)[5:])
     b = Signal(bool(0))
     c = Signal(intbv(0)[3:])
     d = Signal(intbv(0)[4:])
     
-    s = ConcatSignal(a, b, c, d)
+    s = ConcatSignal(a, b, c, d, view=view)
 
     @instance
     def check():
@@ -57,6 +63,43 @@ def bench_ConcatSignal():
 def test_ConcatSignal():
     Simulation(bench_ConcatSignal()).run()
 
+def test_ConcatSignalView():
+    Simulation(bench_ConcatSignal(view=True)).run()
+
+
+def bench_ViewDelta():
+    a = Signal(intbv(0)[4:])
+    b = Signal(bool(0))
+    hi = a(4, 2, view=True)
+    s = ConcatSignal(hi, b, view=True)
+    events = []
+
+    @instance
+    def stimulus():
+        for i, j in ((8, 1), (4, 0), (15, 1)):
+            a.next = i
+            b.next = j
+            yield delay(10)
+
+    @instance
+    def response():
+        while 1:
+            yield s
+            # the views change in the delta cycle of their parents
+            events.append((now(), int(s)))
+            assert s == (a[4:2] << 1) | b
+
+    @instance
+    def check():
+        yield delay(100)
+        assert events == [(0, 5), (10, 2), (20, 7)]
+
+    return stimulus, response, check
+
+
+def test_ViewDelta():
+    Simulation(bench_ViewDelta()).run()
+
 
 
 def bench_TristateSignal():
@@ -88,4 +131,52 @@ def bench_TristateSignal():
 
 def test_TristateSignal():
     Simulation(bench_TristateSignal()).run()
-    
+
+
+def bench_TristateContention():
+    s = TristateSignal(intbv(0)[8:])
+    drivers = [s.driver() for i in range(16)]
+    reports = []
+    s.onContention = lambda sig, active: reports.append(len(active))
+
+    @instance
+    def check():
+        drivers[3].next = 3
+        yield delay(10)
+        assert s == 3
+        drivers[5].next = 5
+        drivers[9].next = 9
+        yield delay(10)
+        assert s == None
+        assert s.contentions == 1
+        assert reports == [3]
+        drivers[3].next = None
+        drivers[5].next = None
+        yield delay(10)
+        assert s == 9
+        drivers[9].next = 10
+        yield delay(10)
+        assert s == 10
+        assert s.contentions == 1
+
+    return check
+
+
+def test_TristateContention():
+    Simulation(bench_TristateContention()).run()
+
+
+def test_TristateContentionWarning():
+    s = TristateSignal(intbv(0)[8:])
+    a, b = s.driver(), s.driver()
+
+    @instance
+    def check():
+        a.next = 1
+        b.next = 2
+        yield delay(10)
+        assert s == None
+
+    with warnings.catch_warnings(record=True) as w:
+        Simulation(check).run()
+    assert [x.category for x in w] == [BusContentionWarning]
@@ -0,0 +1,39 @@
+import tempfile
+
+from myhdl import *
+from myhdl import _tlog
+
+
+def bench_tlog():
+    a = Signal(intbv(0)[8:])
+    b = Signal(intbv(0, min=-8, max=8))
+    c = Signal(bool(0))
+
+    @instance
+    def stimulus():
+        v = intbv(0)[4:]
+        for i in range(4):
+            a.next = i * 3
+            b.next = -i
+            c.next = not c
+            v[:] = i
+            yield delay(10)
+            tlog(a, b, c, v, i)
+
+    return stimulus
+
+def test_tlog():
+    f = tempfile.TemporaryFile()
+    _tlog._setFile(f)
+    try:
+        Simulation(bench_tlog()).run()
+    finally:
+        _tlog._setFile(None)
+    f.seek(0)
+    assert list(_tlog._records(f)) == [(10, 0, 0, 1, 0, 0),
+                                       (20, 3, -1, 0, 1, 1),
+                                       (30, 6, -2, 1, 2, 2),
+                                       (40, 9, -3, 0, 3, 3)]
+
+def test_tlogNoFile():
+    Simulation(bench_tlog()).run()
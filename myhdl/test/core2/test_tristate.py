@@ -0,0 +1,58 @@
+import warnings
+
+from myhdl import *
+from myhdl._ShadowSignal import BusContentionWarning
+
+
+def bench_Tristate(delay_=None):
+    s = Tristate(intbv(0)[8:], delay_)
+    a = s.driver()
+    b = s.driver()
+    reports = []
+    s.onContention = lambda sig, drivers: reports.append(len(drivers))
+
+    @instance
+    def check():
+        assert s == None
+        a.next = 1
+        yield delay(10)
+        assert s == 1
+        b.next = 122
+        yield delay(10)
+        assert s == None
+        assert s.contentions == 1
+        assert reports == [2]
+        a.next = None
+        yield delay(10)
+        assert s == 122
+        b.next = 7
+        yield delay(10)
+        assert s == 7
+        b.next = None
+        yield delay(10)
+        assert s == None
+        assert s.contentions == 1
+
+    return check
+
+
+def test_Tristate():
+    Simulation(bench_Tristate()).run()
+
+def test_DelayedTristate():
+    Simulation(bench_Tristate(1)).run()
+
+def test_TristateContentionWarning():
+    s = Tristate(intbv(0)[8:])
+    a, b = s.driver(), s.driver()
+
+    @instance
+    def check():
+        a.next = 1
+        b.next = 2
+        yield delay(10)
+        assert s == None
+
+    with warnings.catch_warnings(record=True) as w:
+        Simulation(check).run()
+    assert [x.category for x in w] == [BusContentionWarning]
@@ -0,0 +1,50 @@
+from myhdl import *
+
+def bench_watch(changes, cond=None):
+    a = Signal(intbv(0)[8:])
+    b = Signal(intbv(0)[8:])
+
+    def record(sig):
+        # b changes in the same delta cycle: it has its new value
+        changes.append((now(), int(sig), int(b)))
+
+    a.watch(record, cond)
+
+    @instance
+    def stimulus():
+        for i in range(1, 8):
+            a.next = i
+            b.next = i
+            yield delay(10)
+        # no change, no callback
+        a.next = 7
+        yield delay(10)
+        a.unwatch(record)
+        a.next = 8
+        yield delay(10)
+
+    return stimulus
+
+def test_watch():
+    changes = []
+    Simulation(bench_watch(changes)).run()
+    assert changes == [(10*(i-1), i, i) for i in range(1, 8)]
+
+def test_watchCond():
+    changes = []
+    Simulation(bench_watch(changes, cond=lambda sig: sig % 2 == 0)).run()
+    assert [c[1] for c in changes] == [2, 4, 6]
+
+def test_watchBool():
+    edges = []
+    clk = Signal(bool(0))
+    clk.watch(lambda sig: edges.append(now()), cond=lambda sig: sig)
+
+    @instance
+    def clkgen():
+        for i in range(4):
+            yield delay(5)
+            clk.next = not clk
+
+    Simulation(clkgen).run()
+    assert edges == [5, 15]